@@ -2,6 +2,9 @@ from enum import Enum
 
 class LLMModel(Enum):
     GEMINI="gemini"
+    ONNX="onnx"
+    OPENAI="openai"
+    FAKE="fake"
 class GeminiEnums(Enum):
     SYSTEM = "system"
     USER = "user"
@@ -10,7 +13,16 @@ class GeminiEnums(Enum):
     DOCUMENT = "RETRIEVAL_DOCUMENT"
     QUERY = "RETRIEVAL_QUERY"
 
+class OpenAIEnums(Enum):
+    SYSTEM = "system"
+    USER = "user"
+    ASSISTANT = "assistant"
+
 class DocumentTypeEnum(Enum):
     DOCUMENT = "document"
     QUERY = "query"
 
+class PriorityEnum(Enum):
+    # Listed from highest to lowest priority
+    INTERACTIVE = "interactive"
+    BULK = "bulk"
@@ -1,9 +1,71 @@
 from .LLMEnums import LLMModel
-from AI.LLM import GeminiProvider
+from .RateLimiter import RateLimiter
+from AI.LLM import GeminiProvider, ONNXEmbeddingProvider, OpenAICompatibleProvider, FakeProvider
+import httpx
 
 class LLMProviderFactory:
     def __init__(self, config: dict):
         self.config = config
+        # One limiter per worker: the generation, embedding and summary clients draw from the same quota
+        self.rate_limiter = RateLimiter(
+            requests_per_minute=config.LLM_REQUESTS_PER_MINUTE,
+            tokens_per_minute=config.LLM_TOKENS_PER_MINUTE,
+            max_retries=config.LLM_MAX_RETRIES,
+            base_delay=config.LLM_RETRY_BASE_DELAY,
+            max_delay=config.LLM_RETRY_MAX_DELAY,
+            interactive_reserved_share=config.LLM_INTERACTIVE_RESERVED_SHARE,
+        )
+        # Self-hosted OpenAI compatible server: no remote quota, so no request or token buckets, but
+        # its capacity is bounded, so the calls in flight are, with the same priority classes and retries
+        self.openai_rate_limiter = RateLimiter(
+            requests_per_minute=None,
+            tokens_per_minute=None,
+            max_retries=config.LLM_MAX_RETRIES,
+            base_delay=config.LLM_RETRY_BASE_DELAY,
+            max_delay=config.LLM_RETRY_MAX_DELAY,
+            interactive_reserved_share=config.LLM_INTERACTIVE_RESERVED_SHARE,
+            max_in_flight=config.OPENAI_CONCURRENCY,
+        )
+        # Keep-alive connection pools, created with the first client that needs them
+        self.http_client = None
+        self.gemini_transport = None
+        self.gemini_client = None
+
+    def get_rate_limiter(self, provider: str):
+        """Limiter the clients of `provider` go through, None for local inference."""
+        if provider == LLMModel.OPENAI.value:
+            return self.openai_rate_limiter
+        if provider in (LLMModel.GEMINI.value, LLMModel.FAKE.value):
+            return self.rate_limiter
+        return None
+
+    def get_gemini_client(self):
+        """One Gemini client for the generation, embedding and summary providers, over one pooled transport."""
+        if self.gemini_client is None:
+            self.gemini_transport = GeminiProvider.create_transport(
+                max_connections=self.config.GEMINI_MAX_CONNECTIONS,
+                http2=self.config.GEMINI_HTTP2,
+            )
+            self.gemini_client = GeminiProvider.create_client(self.config.GEMINI_API_KEY, self.gemini_transport)
+        return self.gemini_client
+
+    def get_http_client(self) -> httpx.AsyncClient:
+        if self.http_client is None:
+            self.http_client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.config.OPENAI_TIMEOUT, connect=10.0),
+                limits=httpx.Limits(max_connections=self.config.OPENAI_MAX_CONNECTIONS,
+                                    max_keepalive_connections=self.config.OPENAI_MAX_CONNECTIONS),
+            )
+        return self.http_client
+
+    async def close(self):
+        if self.http_client is not None:
+            await self.http_client.aclose()
+            self.http_client = None
+        if self.gemini_transport is not None:
+            await self.gemini_transport.aclose()
+            self.gemini_transport = None
+            self.gemini_client = None
 
     def create(self, provider: str):
         if provider == LLMModel.GEMINI.value:
@@ -11,7 +73,58 @@ class LLMProviderFactory:
                 api_key=self.config.GEMINI_API_KEY,
                 default_max_input_characters=self.config.DEFAULT_MAX_INPUT_CHARACTERS,
                 default_max_output_tokens=self.config.DEFAULT_MAX_TOKENS,
-                default_temperature=self.config.DEFAULT_TEMPERATURE
+                default_temperature=self.config.DEFAULT_TEMPERATURE,
+                embedding_batch_size=self.config.EMBEDDING_BATCH_SIZE,
+                embedding_batch_max_bytes=self.config.EMBEDDING_BATCH_MAX_BYTES,
+                embedding_concurrency=self.config.EMBEDDING_CONCURRENCY,
+                rate_limiter=self.rate_limiter,
+                client=self.get_gemini_client(),
+                generation_timeout=self.config.GEMINI_GENERATION_TIMEOUT,
+                embedding_timeout=self.config.GEMINI_EMBEDDING_TIMEOUT,
+                summary_timeout=self.config.GEMINI_SUMMARY_TIMEOUT,
+            )
+
+        if provider == LLMModel.OPENAI.value:
+            return OpenAICompatibleProvider(
+                http_client=self.get_http_client(),
+                base_url=self.config.OPENAI_BASE_URL,
+                api_key=self.config.OPENAI_API_KEY,
+                default_max_input_characters=self.config.DEFAULT_MAX_INPUT_CHARACTERS,
+                default_max_output_tokens=self.config.DEFAULT_MAX_TOKENS,
+                default_temperature=self.config.DEFAULT_TEMPERATURE,
+                embedding_batch_size=self.config.EMBEDDING_BATCH_SIZE,
+                embedding_batch_max_bytes=self.config.EMBEDDING_BATCH_MAX_BYTES,
+                send_embedding_dimensions=self.config.OPENAI_EMBEDDING_DIMENSIONS,
+                rate_limiter=self.openai_rate_limiter,
+            )
+
+        if provider == LLMModel.FAKE.value:
+            return FakeProvider(
+                latency_ms=self.config.FAKE_LATENCY_MS,
+                latency_jitter=self.config.FAKE_LATENCY_JITTER,
+                per_text_latency_ms=self.config.FAKE_PER_TEXT_LATENCY_MS,
+                error_rate=self.config.FAKE_ERROR_RATE,
+                rate_limit_burst_rate=self.config.FAKE_RATE_LIMIT_BURST_RATE,
+                rate_limit_burst_length=self.config.FAKE_RATE_LIMIT_BURST_LENGTH,
+                requests_per_minute=self.config.FAKE_REQUESTS_PER_MINUTE,
+                seed=self.config.FAKE_SEED,
+                default_max_output_tokens=self.config.DEFAULT_MAX_TOKENS,
+                embedding_batch_size=self.config.EMBEDDING_BATCH_SIZE,
+                embedding_batch_max_bytes=self.config.EMBEDDING_BATCH_MAX_BYTES,
+                embedding_concurrency=self.config.EMBEDDING_CONCURRENCY,
+                rate_limiter=self.rate_limiter,
+            )
+
+        if provider == LLMModel.ONNX.value:
+            # Local inference: no remote quota, so no rate limiter
+            return ONNXEmbeddingProvider(
+                models_dir=self.config.ONNX_MODELS_DIR,
+                batch_size=self.config.ONNX_BATCH_SIZE,
+                max_sequence_length=self.config.ONNX_MAX_SEQUENCE_LENGTH,
+                intra_op_threads=self.config.ONNX_INTRA_OP_THREADS,
+                inference_concurrency=self.config.ONNX_INFERENCE_CONCURRENCY,
+                query_prefix=self.config.ONNX_QUERY_PREFIX,
+                document_prefix=self.config.ONNX_DOCUMENT_PREFIX,
             )
 
         return None
\ No newline at end of file
@@ -22,10 +22,19 @@ class LLMInterface(ABC):
     async def generate_text(self, user_prompt: str, system_prompt: str = "", temperature: float = None, max_output_tokens: int = None):
         pass
 
+    @abstractmethod
+    async def stream_text(self, user_prompt: str, system_prompt: str = "", temperature: float = None, max_output_tokens: int = None):
+        """Async generator of the generated text, piece by piece as the model produces it."""
+        pass
+
     @abstractmethod
     async def embed_text(self, text: str, document_type: str = None):
         pass
 
+    @abstractmethod
+    async def embed_texts(self, texts: list, document_type: str = None):
+        pass
+
     @abstractmethod
     async def summarize_text(self, user_prompt: str, system_prompt: str = "", temperature: float = None, max_output_tokens: int = None):
         pass
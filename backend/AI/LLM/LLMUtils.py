@@ -0,0 +1,103 @@
+import re
+from typing import Dict, List
+
+
+def pack_embedding_batches(texts: List[str], max_batch_size: int, max_batch_bytes: int) -> List[List[int]]:
+    """
+    Group the indexes of `texts` into request batches of at most `max_batch_size` texts
+    and `max_batch_bytes` bytes of utf-8 text, keeping the input order.
+    A text larger than `max_batch_bytes` on its own gets a batch of its own.
+    """
+    batches, batch, batch_bytes = [], [], 0
+    for i, text in enumerate(texts):
+        size = len(text.encode("utf-8"))
+        if batch and (len(batch) >= max_batch_size or batch_bytes + size > max_batch_bytes):
+            batches.append(batch)
+            batch, batch_bytes = [], 0
+        batch.append(i)
+        batch_bytes += size
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def unique_texts(texts: List[str]):
+    """Identical texts are embedded once: returns the distinct texts and, per input, the index of its distinct text."""
+    positions = {}
+    distinct = []
+    mapping = []
+    for text in texts:
+        if text not in positions:
+            positions[text] = len(distinct)
+            distinct.append(text)
+        mapping.append(positions[text])
+    return distinct, mapping
+
+
+def estimate_tokens(*texts) -> int:
+    """Rough token count of some text, about 4 characters per token."""
+    return max(1, sum(len(t or "") for t in texts) // 4)
+
+
+def group_by_tokens(texts: List[str], max_tokens: int) -> List[List[int]]:
+    """
+    Group the indexes of consecutive `texts` so that each group stays within `max_tokens`.
+    Every group but the last takes at least two texts, even past `max_tokens`, so merging
+    each group into one text about halves the count: repeated merging ends in O(log n) rounds.
+    The last group may hold a single text, which has nothing to be merged with.
+    """
+    groups, group, group_tokens = [], [], 0
+    for i, text in enumerate(texts):
+        tokens = estimate_tokens(text)
+        if len(group) >= 2 and group_tokens + tokens > max_tokens:
+            groups.append(group)
+            group, group_tokens = [], 0
+        group.append(i)
+        group_tokens += tokens
+    if group:
+        groups.append(group)
+    return groups
+
+
+def pack_small_texts(texts: List[str], max_tokens: int, small_tokens: int) -> List[List[int]]:
+    """
+    Group the indexes of consecutive `texts` of at most `small_tokens` into packs within `max_tokens`,
+    keeping the input order. Larger texts get a pack of their own.
+    """
+    packs, pack, pack_tokens = [], [], 0
+    for i, text in enumerate(texts):
+        tokens = estimate_tokens(text)
+        if tokens > small_tokens:
+            if pack:
+                packs.append(pack)
+                pack, pack_tokens = [], 0
+            packs.append([i])
+            continue
+        if pack and pack_tokens + tokens > max_tokens:
+            packs.append(pack)
+            pack, pack_tokens = [], 0
+        pack.append(i)
+        pack_tokens += tokens
+    if pack:
+        packs.append(pack)
+    return packs
+
+
+SECTION_MARKER = "=== SECTION {} ==="
+SECTION_MARKER_PATTERN = re.compile(r"^[ \t]*=== SECTION (\d+) ===[ \t]*$", re.MULTILINE)
+
+
+def mark_sections(texts: List[str]) -> str:
+    """Join texts under numbered section markers, from 1, for prompts asking for one answer per section."""
+    return "\n\n".join(f"{SECTION_MARKER.format(i)}\n{text}" for i, text in enumerate(texts, start=1))
+
+
+def split_marked_sections(text: str) -> Dict[int, str]:
+    """Answers of a marked text, keyed by section number; empty and repeated sections are left out."""
+    parts = SECTION_MARKER_PATTERN.split(text or "")
+    answers = {}
+    for number, answer in zip(parts[1::2], parts[2::2]):
+        number, answer = int(number), answer.strip()
+        if answer and number not in answers:
+            answers[number] = answer
+    return answers
@@ -0,0 +1,300 @@
+import asyncio
+import contextvars
+import httpx
+import random
+import time
+from collections import deque
+from contextlib import contextmanager
+from .LLMEnums import PriorityEnum
+from .LLMUtils import estimate_tokens
+from utils import get_logger
+logger = get_logger(__name__)
+
+# Priority class of the LLM calls made by the current request or task; unmarked work is bulk
+llm_priority = contextvars.ContextVar("llm_priority", default=PriorityEnum.BULK.value)
+
+
+@contextmanager
+def priority_scope(priority: str):
+    token = llm_priority.set(priority)
+    try:
+        yield
+    finally:
+        llm_priority.reset(token)
+
+
+async def interactive_priority():
+    """FastAPI dependency marking the LLM calls of an endpoint as interactive."""
+    llm_priority.set(PriorityEnum.INTERACTIVE.value)
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a call is still rate limited after every retry."""
+
+
+def status_code(error: Exception):
+    """HTTP status of a failed call: on the error itself (google-genai) or on its response (httpx)."""
+    return (getattr(error, "code", None) or getattr(error, "status_code", None)
+            or getattr(getattr(error, "response", None), "status_code", None))
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """429 / RESOURCE_EXHAUSTED, whatever the client library reporting it."""
+    code = status_code(error)
+    status = str(getattr(error, "status", "") or "")
+    return code == 429 or "RESOURCE_EXHAUSTED" in status or "RESOURCE_EXHAUSTED" in str(error)
+
+
+def is_transient_error(error: Exception) -> bool:
+    # httpx.TransportError: refused or reset connections, read timeouts
+    return status_code(error) in (500, 502, 503, 504) or isinstance(
+        error, (asyncio.TimeoutError, ConnectionError, httpx.TransportError))
+
+
+class TokenBucket:
+    """
+    Bucket refilled continuously up to `per_minute`, at `per_minute` per minute scaled by the limiter rate.
+    Without `per_minute` the bucket never runs out.
+    """
+
+    def __init__(self, per_minute: float = None):
+        self.unlimited = not per_minute
+        self.capacity = float("inf") if self.unlimited else float(per_minute)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, rate_factor: float):
+        if self.unlimited:
+            return
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.capacity / 60 * rate_factor)
+        self.updated = now
+
+    def wait_time(self, amount: float, rate_factor: float) -> float:
+        if self.unlimited or self.level >= amount:
+            return 0.0
+        return (amount - self.level) / (self.capacity / 60 * rate_factor)
+
+
+class RateLimiter:
+    """
+    Provider-level limiter and priority scheduler shared by every client of a worker.
+    - Token buckets for requests per minute and tokens per minute
+    - Priority classes: a waiting interactive call always goes before bulk work, and bulk work
+      cannot use the share of capacity reserved for interactive calls
+    - AIMD: the refill rate is halved on every 429 / RESOURCE_EXHAUSTED and grows back
+      additively with each successful call, so throughput settles on the real quota
+    - Optionally at most `max_in_flight` calls at once, for servers bounded by their capacity
+      rather than by a quota; bulk work leaves the reserved share of those slots to interactive calls
+    - Rate limited and transient failures are retried with jittered exponential backoff
+    """
+
+    def __init__(self, requests_per_minute: int = 300, tokens_per_minute: int = 1000000, max_retries: int = 5,
+                 base_delay: float = 1.0, max_delay: float = 60.0,
+                 min_rate_factor: float = 0.05, rate_increase: float = 0.02,
+                 interactive_reserved_share: float = 0.2, max_in_flight: int = None):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_in_flight = max(1, max_in_flight) if max_in_flight else None
+        self.in_flight = 0
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.min_rate_factor = min_rate_factor
+        self.rate_increase = rate_increase
+
+        self.rate_factor = 1.0
+        self._condition = asyncio.Condition()
+
+        self.priorities = [p.value for p in PriorityEnum]
+        # Share of the buckets each class must leave untouched for the classes above it
+        self.reserved_share = {
+            PriorityEnum.INTERACTIVE.value: 0.0,
+            PriorityEnum.BULK.value: min(max(interactive_reserved_share, 0.0), 0.9),
+        }
+        # Slots each class must leave free, bulk always keeping at least one
+        self.reserved_slots = {
+            p: min(int(share * self.max_in_flight), self.max_in_flight - 1) if self.max_in_flight else 0
+            for p, share in self.reserved_share.items()
+        }
+        self._queues = {p: deque() for p in self.priorities}
+        self._stats = {p: {"acquired": 0, "wait_seconds": 0.0, "max_queue_depth": 0, "rate_limited": 0}
+                       for p in self.priorities}
+
+    @staticmethod
+    def estimate_tokens(*texts) -> int:
+        """Rough token count of a request, about 4 characters per token."""
+        return estimate_tokens(*texts)
+
+    def _is_next(self, ticket, priority: str) -> bool:
+        for p in self.priorities:
+            if self._queues[p]:
+                return p == priority and self._queues[p][0] is ticket
+        return False
+
+    def _has_slot(self, priority: str) -> bool:
+        return not self.max_in_flight or self.in_flight < self.max_in_flight - self.reserved_slots[priority]
+
+    def _wait_time(self, tokens: float, priority: str) -> float:
+        reserved = self.reserved_share[priority]
+        return max(
+            self.requests.wait_time(1 + reserved * self.requests.capacity, self.rate_factor),
+            self.tokens.wait_time(tokens + reserved * self.tokens.capacity, self.rate_factor),
+        )
+
+    async def acquire(self, tokens: int = 1, priority: str = None):
+        """Wait for the turn of the call: after every waiting call of a higher class, then in arrival order."""
+        priority = priority if priority in self._queues else llm_priority.get()
+        tokens = min(tokens, self.tokens.capacity * (1 - self.reserved_share[priority]))
+        queue, stats = self._queues[priority], self._stats[priority]
+        ticket = object()
+        start = time.monotonic()
+
+        async with self._condition:
+            queue.append(ticket)
+            stats["max_queue_depth"] = max(stats["max_queue_depth"], len(queue))
+            try:
+                while True:
+                    timeout = None
+                    # Without a free slot, the call waits for release() to wake it
+                    if self._is_next(ticket, priority) and self._has_slot(priority):
+                        self.requests.refill(self.rate_factor)
+                        self.tokens.refill(self.rate_factor)
+                        timeout = self._wait_time(tokens, priority)
+                        if timeout <= 0:
+                            self.requests.level -= 1
+                            self.tokens.level -= tokens
+                            if self.max_in_flight:
+                                self.in_flight += 1
+                            break
+                    # Woken early when the queues change, e.g. when an interactive call arrives
+                    try:
+                        await asyncio.wait_for(self._condition.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                queue.remove(ticket)
+                self._condition.notify_all()
+
+        stats["acquired"] += 1
+        stats["wait_seconds"] += time.monotonic() - start
+
+    async def release(self):
+        """Free the slot of a finished call, when the limiter bounds the calls in flight."""
+        if not self.max_in_flight:
+            return
+        self.in_flight -= 1
+        async with self._condition:
+            self._condition.notify_all()
+
+    @staticmethod
+    def per_minute(bucket: TokenBucket, share: float):
+        """Usable share of a bucket per minute, None for an unlimited one."""
+        return None if bucket.unlimited else bucket.capacity * share
+
+    @staticmethod
+    def rounded(value, digits: int = None):
+        return None if value is None else round(value, digits)
+
+    def metrics(self) -> dict:
+        """Queue depth, waits and reserved capacity of every priority class."""
+        classes = {}
+        for p in self.priorities:
+            stats = self._stats[p]
+            # Capacity a class can use = the buckets minus what it leaves to the classes above it
+            usable = 1 - self.reserved_share[p]
+            classes[p] = {
+                "queue_depth": len(self._queues[p]),
+                "max_queue_depth": stats["max_queue_depth"],
+                "acquired": stats["acquired"],
+                "average_wait_seconds": round(stats["wait_seconds"] / stats["acquired"], 3) if stats["acquired"] else 0.0,
+                "rate_limited": stats["rate_limited"],
+                "reserved_for_higher_classes": self.reserved_share[p],
+                "usable_requests_per_minute": self.rounded(self.per_minute(self.requests, usable * self.rate_factor), 1),
+                "usable_tokens_per_minute": self.rounded(self.per_minute(self.tokens, usable * self.rate_factor)),
+                "usable_slots": self.max_in_flight - self.reserved_slots[p] if self.max_in_flight else None,
+            }
+        return {
+            "rate_factor": round(self.rate_factor, 3),
+            "requests_per_minute": self.rounded(self.per_minute(self.requests, self.rate_factor), 1),
+            "tokens_per_minute": self.rounded(self.per_minute(self.tokens, self.rate_factor)),
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "classes": classes,
+        }
+
+    def on_success(self):
+        if self.rate_factor < 1.0:
+            self.rate_factor = min(1.0, self.rate_factor + self.rate_increase)
+
+    def on_rate_limited(self):
+        self._stats[llm_priority.get()]["rate_limited"] += 1
+        self.rate_factor = max(self.min_rate_factor, self.rate_factor / 2)
+        # Stop sending at once: the next request waits for the slower refill
+        self.requests.level = min(self.requests.level, 0.0)
+        logger.warning(f"Rate limited by the provider, request rate reduced to {self.rate_factor:.0%} of the limit")
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    async def retry_after(self, error: Exception, attempt: int):
+        """Wait before retrying a failed attempt, or raise when the error is final or the retries are exhausted."""
+        rate_limited = is_rate_limit_error(error)
+        if not rate_limited and not is_transient_error(error):
+            raise error
+        if rate_limited:
+            self.on_rate_limited()
+        if attempt == self.max_retries:
+            if rate_limited:
+                raise RateLimitExceeded(f"Still rate limited after {self.max_retries} retries: {error}") from error
+            raise error
+        delay = self.backoff(attempt)
+        logger.info(f"Retrying provider call in {delay:.1f}s (attempt {attempt + 1}/{self.max_retries}): {error}")
+        await asyncio.sleep(delay)
+
+    async def call(self, request, tokens: int = 1):
+        """Run `request()` (a coroutine factory) within the limits, retrying rate limited and transient failures."""
+        for attempt in range(self.max_retries + 1):
+            await self.acquire(tokens)
+            try:
+                result = await request()
+            except Exception as e:
+                error = e
+            else:
+                self.on_success()
+                return result
+            finally:
+                await self.release()
+            await self.retry_after(error, attempt)
+
+    async def stream(self, request, tokens: int = 1):
+        """
+        Yield the items of `await request()` (a factory of async iterators) within the limits.
+        A failure is retried only before the first item: once items were yielded, it is raised.
+        """
+        for attempt in range(self.max_retries + 1):
+            await self.acquire(tokens)
+            started = False
+            items = None
+            error = None
+            try:
+                items = await request()
+                async for item in items:
+                    started = True
+                    yield item
+            except Exception as e:
+                if started:
+                    raise
+                error = e
+            finally:
+                # Closed at once when the consumer stops early, so the provider stream is released
+                try:
+                    if items is not None and hasattr(items, "aclose"):
+                        await items.aclose()
+                finally:
+                    await self.release()
+
+            if error is None:
+                self.on_success()
+                return
+            await self.retry_after(error, attempt)
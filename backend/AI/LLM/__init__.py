@@ -1,5 +1,11 @@
 from .LLMInterface import LLMInterface
-from .LLMEnums import LLMModel, DocumentTypeEnum, GeminiEnums
+from .LLMEnums import LLMModel, DocumentTypeEnum, GeminiEnums, OpenAIEnums, PriorityEnum
+from .LLMUtils import pack_embedding_batches, unique_texts, estimate_tokens, group_by_tokens, pack_small_texts, mark_sections, split_marked_sections
+from .RateLimiter import RateLimiter, RateLimitExceeded, llm_priority, priority_scope, interactive_priority
 from .providers.GeminiProvider import GeminiProvider
+from .providers.ONNXEmbeddingProvider import ONNXEmbeddingProvider
+from .providers.OpenAICompatibleProvider import OpenAICompatibleProvider
+from .providers.FakeProvider import FakeProvider, FakeProviderError
+from .providers.CachedEmbeddingProvider import CachedEmbeddingProvider
 from .LLMFactory import LLMProviderFactory
 from .templates.prompt_parser import TemplateParser
\ No newline at end of file
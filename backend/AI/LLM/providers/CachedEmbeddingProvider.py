@@ -0,0 +1,152 @@
+from ..LLMInterface import LLMInterface
+from ..LLMEnums import DocumentTypeEnum
+from models.db_schemas import Embedding
+from collections import OrderedDict
+from array import array
+import hashlib
+import struct
+from utils import get_logger
+logger = get_logger(__name__)
+
+class CachedEmbeddingProvider(LLMInterface):
+    """
+    Embedding cache in front of another provider.
+    Vectors are keyed by (embedding model, size, task type, sha256 of the text), kept in an
+    in-process LRU and persisted as packed float32/float16 bytes, so a text is embedded once
+    per model however many projects, re-indexes or repeated queries use it.
+    """
+
+    def __init__(self, provider: LLMInterface, cache_model, lru_size: int = 10000, dtype: str = "float32"):
+        if dtype not in ("float32", "float16"):
+            raise ValueError(f"Unsupported embedding cache dtype: {dtype}")
+
+        self.provider = provider
+        self.cache_model = cache_model
+        self.lru_size = lru_size
+        self.dtype = dtype
+        self.lru = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def embedding_model_id(self):
+        return self.provider.embedding_model_id
+
+    @property
+    def embedding_size(self):
+        return self.provider.embedding_size
+
+    async def set_generation_model(self, generation_model_id: str):
+        await self.provider.set_generation_model(generation_model_id)
+
+    async def set_summarization_model(self, model_id: str):
+        await self.provider.set_summarization_model(model_id)
+
+    async def set_embedding_model(self, embedding_model_id: str, embedding_size: int):
+        await self.provider.set_embedding_model(embedding_model_id, embedding_size)
+
+    async def process_text(self, text: str):
+        return await self.provider.process_text(text)
+
+    async def generate_text(self, user_prompt: str, system_prompt: str = "", temperature: float = None, max_output_tokens: int = None):
+        return await self.provider.generate_text(user_prompt, system_prompt, temperature, max_output_tokens)
+
+    async def stream_text(self, user_prompt: str, system_prompt: str = "", temperature: float = None, max_output_tokens: int = None):
+        pieces = self.provider.stream_text(user_prompt, system_prompt, temperature, max_output_tokens)
+        try:
+            async for piece in pieces:
+                yield piece
+        finally:
+            await pieces.aclose()
+
+    async def summarize_text(self, user_prompt: str, system_prompt: str = "", temperature: float = None, max_output_tokens: int = None):
+        return await self.provider.summarize_text(user_prompt, system_prompt, temperature, max_output_tokens)
+
+    async def construct_prompt(self, prompt: str, role: str):
+        return await self.provider.construct_prompt(prompt, role)
+
+    def encode(self, vector) -> bytes:
+        if self.dtype == "float16":
+            return struct.pack(f"<{len(vector)}e", *vector)
+        return array("f", vector).tobytes()
+
+    @staticmethod
+    def decode(data: bytes, dtype: str) -> list:
+        if dtype == "float16":
+            return list(struct.unpack(f"<{len(data) // 2}e", data))
+        return array("f", data).tolist()
+
+    def cache_key(self, text: str, document_type: str = None):
+        task = document_type or DocumentTypeEnum.DOCUMENT.value
+        return (self.embedding_model_id, self.embedding_size, task, hashlib.sha256(text.encode("utf-8")).hexdigest())
+
+    def remember(self, key, vector):
+        self.lru[key] = vector
+        self.lru.move_to_end(key)
+        while len(self.lru) > self.lru_size:
+            self.lru.popitem(last=False)
+
+    async def get_cached_embeddings(self, texts: list, document_type: str = None):
+        """Cached vectors of `texts` in input order, None where a text is not cached. Never calls the provider."""
+        keys = [self.cache_key(t, document_type) for t in texts]
+        vectors = {}
+        for key in keys:
+            if key in self.lru:
+                self.lru.move_to_end(key)
+                vectors[key] = self.lru[key]
+
+        missing = list({key for key in keys if key not in vectors})
+        if missing:
+            model_id, size, task, _ = missing[0]
+            stored = await self.cache_model.get_embeddings(model_id, size, task, [key[3] for key in missing])
+            for key in missing:
+                if key[3] in stored:
+                    embedding = stored[key[3]]
+                    vectors[key] = self.decode(embedding.embedding_vector, embedding.embedding_dtype)
+                    self.remember(key, vectors[key])
+
+        return [vectors.get(key) for key in keys]
+
+    async def embed_text(self, text: str, document_type: str = None):
+        vectors = await self.embed_texts([text], document_type=document_type)
+        return vectors[0] if vectors else None
+
+    async def embed_texts(self, texts: list, document_type: str = None):
+        if not texts:
+            return []
+
+        vectors = await self.get_cached_embeddings(texts, document_type)
+        missing = list(dict.fromkeys(t for t, v in zip(texts, vectors) if v is None))
+        cached_count = sum(1 for v in vectors if v is not None)
+        self.hits += cached_count
+        self.misses += len(missing)
+        if not missing:
+            return vectors
+
+        new_vectors = await self.provider.embed_texts(missing, document_type=document_type)
+        embedded = {}
+        to_store = []
+        for text, vector in zip(missing, new_vectors):
+            if not vector:
+                continue
+            key = self.cache_key(text, document_type)
+            embedded[text] = vector
+            self.remember(key, vector)
+            to_store.append(Embedding(
+                embedding_model_id=key[0],
+                embedding_size=key[1],
+                embedding_task=key[2],
+                embedding_text_hash=key[3],
+                embedding_dtype=self.dtype,
+                embedding_vector=self.encode(vector),
+            ))
+
+        try:
+            await self.cache_model.insert_embeddings(to_store)
+        except Exception as e:
+            # The vectors are still valid; they will simply be embedded again next time
+            logger.warning(f"Could not persist {len(to_store)} embeddings: {e}")
+
+        logger.info(f"Embedding cache: {cached_count} of {len(texts)} texts cached, {len(missing)} embedded")
+        return [v if v is not None else embedded.get(t) for t, v in zip(texts, vectors)]
@@ -0,0 +1,203 @@
+from ..LLMInterface import LLMInterface
+from ..LLMEnums import DocumentTypeEnum
+from ..LLMUtils import pack_embedding_batches, unique_texts, mark_sections, split_marked_sections
+from collections import deque
+import asyncio
+import hashlib
+import math
+import random
+import time
+from utils import get_logger
+logger = get_logger(__name__)
+
+
+class FakeProviderError(Exception):
+    """Simulated provider failure; `code` is 429 for quota errors and 503 for transient ones."""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+class FakeProvider(LLMInterface):
+    """
+    Offline provider for load tests and benchmarks, deterministic in its outputs.
+    - Embeddings are unit vectors seeded by the model, task and text, so equal inputs always
+      get equal vectors and similar runs index identically
+    - Generations and summaries are canned texts derived from the prompt; a prompt listing
+      sections under numbered markers gets one canned summary per section, under the same markers
+    - Every request waits a log-normal latency and may fail: transient errors at `error_rate`,
+      429 bursts starting at `rate_limit_burst_rate`, and 429s beyond `requests_per_minute`
+    Requests go through the shared rate limiter like a real provider, so its retries and
+    backoff are exercised too.
+    """
+
+    def __init__(self, latency_ms: float = 200, latency_jitter: float = 0.5, per_text_latency_ms: float = 1,
+                 error_rate: float = 0.0, rate_limit_burst_rate: float = 0.0, rate_limit_burst_length: int = 5,
+                 requests_per_minute: int = 0, seed: int = 0,
+                 default_max_output_tokens: int = 1000,
+                 embedding_batch_size: int = 100,
+                 embedding_batch_max_bytes: int = 500000,
+                 embedding_concurrency: int = 4,
+                 rate_limiter=None):
+
+        self.latency_ms = latency_ms
+        self.latency_jitter = latency_jitter
+        self.per_text_latency_ms = per_text_latency_ms
+        self.error_rate = error_rate
+        self.rate_limit_burst_rate = rate_limit_burst_rate
+        self.rate_limit_burst_length = rate_limit_burst_length
+        self.requests_per_minute = requests_per_minute
+        self.random = random.Random(seed)
+
+        self.default_max_output_tokens = default_max_output_tokens
+        self.embedding_batch_size = embedding_batch_size
+        self.embedding_batch_max_bytes = embedding_batch_max_bytes
+        self.embedding_concurrency = embedding_concurrency
+        self.rate_limiter = rate_limiter
+
+        self.generation_model_id = None
+        self.summarization_model_id = None
+        self.embedding_model_id = None
+        self.embedding_size = None
+
+        self.burst_remaining = 0
+        self.request_times = deque()
+        self.requests = 0
+        self.failures = 0
+
+    async def set_generation_model(self, generation_model_id: str):
+        self.generation_model_id = generation_model_id
+
+    async def set_summarization_model(self, summarization_model_id: str):
+        self.summarization_model_id = summarization_model_id
+
+    async def set_embedding_model(self, embedding_model_id: str, embedding_size: int):
+        self.embedding_model_id = embedding_model_id
+        self.embedding_size = embedding_size
+
+    async def process_text(self, text: str):
+        return text.strip()
+
+    def check_quota(self):
+        """Raise a simulated error if this request is over quota, in a 429 burst, or unlucky."""
+        if self.requests_per_minute:
+            now = time.monotonic()
+            while self.request_times and now - self.request_times[0] >= 60:
+                self.request_times.popleft()
+            if len(self.request_times) >= self.requests_per_minute:
+                raise FakeProviderError(429, "RESOURCE_EXHAUSTED: simulated requests per minute quota")
+            self.request_times.append(now)
+
+        if self.burst_remaining == 0 and self.random.random() < self.rate_limit_burst_rate:
+            self.burst_remaining = self.rate_limit_burst_length
+        if self.burst_remaining > 0:
+            self.burst_remaining -= 1
+            raise FakeProviderError(429, "RESOURCE_EXHAUSTED: simulated rate limit burst")
+
+        if self.random.random() < self.error_rate:
+            raise FakeProviderError(503, "UNAVAILABLE: simulated transient error")
+
+    async def respond(self, texts_count: int = 1):
+        self.requests += 1
+        # Log-normal around the median latency: mostly close to it, with a long tail
+        latency = self.latency_ms * math.exp(self.random.gauss(0, self.latency_jitter)) if self.latency_jitter else self.latency_ms
+        await asyncio.sleep((latency + self.per_text_latency_ms * texts_count) / 1000)
+        try:
+            self.check_quota()
+        except FakeProviderError:
+            self.failures += 1
+            raise
+
+    async def call(self, request, *texts, max_output_tokens: int = 0):
+        if not self.rate_limiter:
+            return await request()
+        tokens = self.rate_limiter.estimate_tokens(*texts) + (max_output_tokens or 0)
+        return await self.rate_limiter.call(request, tokens=tokens)
+
+    @staticmethod
+    def digest(*parts) -> bytes:
+        return hashlib.sha256("\x1f".join(str(p) for p in parts).encode("utf-8")).digest()
+
+    def canned_text(self, kind: str, model_id: str, user_prompt: str, max_output_tokens: int = None) -> str:
+        tag = self.digest(kind, model_id, user_prompt).hex()[:8]
+        words = user_prompt.split()
+        # Roughly 4 characters per token, as the rate limiter counts them
+        budget = (max_output_tokens or self.default_max_output_tokens) * 4
+        return f"[fake {kind} {tag}] {' '.join(words[:64])}"[:budget]
+
+    def fake_vector(self, text: str, document_type: str = None) -> list:
+        task = document_type or DocumentTypeEnum.DOCUMENT.value
+        rng = random.Random(self.digest(self.embedding_model_id, self.embedding_size, task, text))
+        vector = [rng.gauss(0, 1) for _ in range(self.embedding_size)]
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    async def generate_text(self, user_prompt: str, system_prompt: str = "", temperature: float = None, max_output_tokens: int = None):
+        if not self.generation_model_id:
+            raise Exception("Generation model for the fake provider was not set")
+
+        async def request():
+            await self.respond()
+            return self.canned_text("answer", self.generation_model_id, user_prompt, max_output_tokens)
+
+        return await self.call(request, system_prompt, user_prompt,
+                               max_output_tokens=max_output_tokens or self.default_max_output_tokens)
+
+    async def stream_text(self, user_prompt: str, system_prompt: str = "", temperature: float = None, max_output_tokens: int = None):
+        """Yield the canned answer word by word."""
+        text = await self.generate_text(user_prompt, system_prompt, temperature, max_output_tokens)
+        for i, word in enumerate(text.split(" ")):
+            await asyncio.sleep(0)
+            yield word if i == 0 else " " + word
+
+    async def summarize_text(self, user_prompt: str, system_prompt: str = "", temperature: float = None, max_output_tokens: int = None):
+        if not self.summarization_model_id:
+            raise Exception("summarization model for the fake provider was not set")
+
+        async def request():
+            await self.respond()
+            sections = split_marked_sections(user_prompt)
+            if sections:
+                return mark_sections([self.canned_text("summary", self.summarization_model_id, text, max_output_tokens)
+                                      for text in sections.values()])
+            return self.canned_text("summary", self.summarization_model_id, user_prompt, max_output_tokens)
+
+        return await self.call(request, system_prompt, user_prompt,
+                               max_output_tokens=max_output_tokens or self.default_max_output_tokens)
+
+    async def embed_text(self, text: str, document_type: str = None):
+        vectors = await self.embed_texts([text], document_type=document_type)
+        return vectors[0] if vectors else None
+
+    async def embed_texts(self, texts: list, document_type: str = None):
+        if not self.embedding_model_id:
+            raise Exception("Embedding model for the fake provider was not set")
+        if not texts:
+            return []
+
+        distinct, mapping = unique_texts(texts)
+        batches = pack_embedding_batches(distinct, self.embedding_batch_size, self.embedding_batch_max_bytes)
+        semaphore = asyncio.Semaphore(max(1, self.embedding_concurrency))
+
+        async def embed_batch(indexes):
+            contents = [distinct[i] for i in indexes]
+
+            async def request():
+                await self.respond(len(contents))
+                return [self.fake_vector(t, document_type) for t in contents]
+
+            async with semaphore:
+                return await self.call(request, *contents)
+
+        vectors = [None] * len(distinct)
+        for indexes, batch_vectors in zip(batches, await asyncio.gather(*[embed_batch(b) for b in batches])):
+            for i, vector in zip(indexes, batch_vectors):
+                vectors[i] = vector
+        return [vectors[i] for i in mapping]
+
+    async def construct_prompt(self, prompt: str, role: str):
+        return {
+            "role": role,
+            "parts": prompt
+        }
@@ -1,7 +1,12 @@
 from ..LLMInterface import LLMInterface
 from ..LLMEnums import GeminiEnums, DocumentTypeEnum
+from ..LLMUtils import pack_embedding_batches, unique_texts
 from google import genai
-from google.genai.types import EmbedContentConfig, GenerateContentConfig, GenerationConfig, Content, Part
+from google.genai.types import EmbedContentConfig, GenerateContentConfig, GenerationConfig, Content, Part, HttpOptions
+from collections import OrderedDict
+import asyncio
+import importlib.util
+import httpx
 from utils import get_logger
 logger = get_logger(__name__)
 
@@ -9,15 +14,41 @@ class GeminiProvider(LLMInterface):
     def __init__(self, api_key: str,
                 default_max_input_characters: int = 1000,
                 default_max_output_tokens: int = 1000,
-                default_temperature: float = 0.7):
+                default_temperature: float = 0.7,
+                embedding_batch_size: int = 100,
+                embedding_batch_max_bytes: int = 500000,
+                embedding_concurrency: int = 4,
+                rate_limiter=None,
+                client: genai.Client = None,
+                generation_timeout: float = 60,
+                embedding_timeout: float = 30,
+                summary_timeout: float = 120):
 
         self.api_key = api_key
-        self.client = genai.Client(api_key=self.api_key)
+        # The factory passes one client for every provider, over its shared pooled transport
+        self.client = client or genai.Client(api_key=self.api_key)
+
+        # Request timeouts per call type, in milliseconds as HttpOptions expects them
+        self.generation_http_options = HttpOptions(timeout=int(generation_timeout * 1000))
+        self.embedding_http_options = HttpOptions(timeout=int(embedding_timeout * 1000))
+        self.summary_http_options = HttpOptions(timeout=int(summary_timeout * 1000))
+
+        # Configs are immutable per (kind, system prompt, temperature, max tokens): built once, then reused
+        self.config_cache = OrderedDict()
+        self.config_cache_size = 256
 
         self.default_max_input_characters = default_max_input_characters
         self.default_max_output_tokens = default_max_output_tokens
         self.default_temperature = default_temperature
 
+        # Limits of one embed_content request, and how many of them run at once
+        self.embedding_batch_size = embedding_batch_size
+        self.embedding_batch_max_bytes = embedding_batch_max_bytes
+        self.embedding_concurrency = embedding_concurrency
+
+        # Shared with the other clients of the worker, see LLMProviderFactory
+        self.rate_limiter = rate_limiter
+
         self.generation_model_id = None
         self.summarization_model_id = None
         self.embedding_model_id = None
@@ -26,6 +57,27 @@ class GeminiProvider(LLMInterface):
         self.enums = GeminiEnums
         self.logger = get_logger(__name__)
 
+    @staticmethod
+    def create_transport(max_connections: int = 64, http2: bool = True) -> httpx.AsyncHTTPTransport:
+        """
+        Pooled keep-alive transport, HTTP/2 when the h2 package is installed.
+        Given to genai.Client it also makes the SDK use one httpx client for every request,
+        instead of opening an aiohttp session per request when aiohttp is installed.
+        """
+        return httpx.AsyncHTTPTransport(
+            http2=http2 and importlib.util.find_spec("h2") is not None,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections,
+                                keepalive_expiry=60),
+            retries=1,
+        )
+
+    @staticmethod
+    def create_client(api_key: str, transport: httpx.AsyncHTTPTransport, base_url: str = None) -> genai.Client:
+        return genai.Client(api_key=api_key, http_options=HttpOptions(
+            base_url=base_url,
+            async_client_args={"transport": transport},
+        ))
+
     async def set_generation_model(self, generation_model_id: str):
         self.generation_model_id = generation_model_id
 
@@ -39,6 +91,13 @@ class GeminiProvider(LLMInterface):
     async def process_text(self, text: str):
         return text[:self.default_max_input_characters].strip()
 
+    async def call(self, request, *texts, max_output_tokens: int = 0):
+        """Run a request factory through the rate limiter, if any, counting its input and output tokens."""
+        if not self.rate_limiter:
+            return await request()
+        tokens = self.rate_limiter.estimate_tokens(*texts) + (max_output_tokens or 0)
+        return await self.rate_limiter.call(request, tokens=tokens)
+
     async def generate_text(
         self,
         user_prompt: str,
@@ -52,16 +111,16 @@ class GeminiProvider(LLMInterface):
             raise Exception("Generation model for Gemini was not set")
 
         try:
-            config = GenerateContentConfig(
-                system_instruction=system_prompt,
-                temperature=temperature or self.default_temperature,
-                max_output_tokens=max_output_tokens or self.default_max_output_tokens,
+            config = self.generation_config(
+                "generation", system_prompt,
+                temperature or self.default_temperature,
+                max_output_tokens or self.default_max_output_tokens,
             )
-
-            chat = self.client.aio.chats.create(model=self.generation_model_id)
-            response=await chat.send_message(
-                message=user_prompt,
-                config=config
+            response = await self.call(
+                lambda: self.client.aio.models.generate_content(
+                    model=self.generation_model_id, contents=user_prompt, config=config
+                ),
+                system_prompt, user_prompt, max_output_tokens=config.max_output_tokens
             )
             if not response or not response.text:
                 self.logger.error("No response from Gemini chat completion")
@@ -74,23 +133,80 @@ class GeminiProvider(LLMInterface):
             self.logger.error(f"Error in chat completion with Gemini: {str(e)}")
             raise
 
+    async def stream_text(self, user_prompt: str, system_prompt: str = "", temperature: float = None, max_output_tokens: int = None):
+        if not self.generation_model_id:
+            self.logger.error("Generation model for Gemini was not set")
+            raise Exception("Generation model for Gemini was not set")
+
+        config = self.generation_config(
+            "generation", system_prompt,
+            temperature or self.default_temperature,
+            max_output_tokens or self.default_max_output_tokens,
+        )
+        request = lambda: self.client.aio.models.generate_content_stream(
+            model=self.generation_model_id, contents=user_prompt, config=config
+        )
+        chunks = None
+        try:
+            if self.rate_limiter:
+                tokens = self.rate_limiter.estimate_tokens(system_prompt, user_prompt) + config.max_output_tokens
+                chunks = self.rate_limiter.stream(request, tokens=tokens)
+            else:
+                chunks = await request()
+
+            async for chunk in chunks:
+                if chunk.text:
+                    yield chunk.text
+
+        except Exception as e:
+            self.logger.error(f"Error in streaming chat completion with Gemini: {str(e)}")
+            raise
+        finally:
+            # A consumer that stops early (client gone) closes the response stream with it
+            if chunks is not None:
+                await chunks.aclose()
+
+    def generation_config(self, kind: str, system_prompt: str, temperature: float, max_output_tokens: int):
+        key = (kind, system_prompt, temperature, max_output_tokens)
+        config = self.config_cache.get(key)
+        if config is None:
+            config = GenerateContentConfig(
+                system_instruction=system_prompt or None,
+                temperature=temperature,
+                max_output_tokens=max_output_tokens,
+                http_options=self.summary_http_options if kind == "summary" else self.generation_http_options,
+            )
+            self.config_cache[key] = config
+            if len(self.config_cache) > self.config_cache_size:
+                self.config_cache.popitem(last=False)
+        else:
+            self.config_cache.move_to_end(key)
+        return config
+
+    def embedding_config(self, document_type: str = None):
+        task_type = self.enums.DOCUMENT.value
+        if document_type == DocumentTypeEnum.QUERY.value:
+            task_type = self.enums.QUERY.value
+
+        key = ("embedding", task_type, self.embedding_size)
+        config = self.config_cache.get(key)
+        if config is None:
+            config = EmbedContentConfig(task_type=task_type,
+                                        output_dimensionality=self.embedding_size,
+                                        http_options=self.embedding_http_options)
+            self.config_cache[key] = config
+        return config
+
     async def embed_text(self, text: str, document_type: str = None):
         if not self.embedding_model_id:
             self.logger.error("Embedding model for Gemini was not set")
             raise Exception("Embedding model for Gemini was not set")
 
         try:
-            task_type = self.enums.DOCUMENT.value
-            if document_type == DocumentTypeEnum.QUERY.value:
-                task_type = self.enums.QUERY.value
-
-            config = EmbedContentConfig(task_type=task_type, 
-                                        output_dimensionality=self.embedding_size)
-            
-            results = await self.client.aio.models.embed_content(
-                model=self.embedding_model_id,
-                contents=text,
-                config=config
+            config = self.embedding_config(document_type)
+            results = await self.call(
+                lambda: self.client.aio.models.embed_content(model=self.embedding_model_id, contents=text, config=config),
+                text
             )
 
             if not results:
@@ -103,22 +219,61 @@ class GeminiProvider(LLMInterface):
             self.logger.error(f"Error embedding text with Gemini: {str(e)}")
             raise
 
+    async def embed_texts(self, texts: list, document_type: str = None):
+        """
+        Embed many texts with as few requests as possible.
+        Identical texts are embedded once, the rest is packed into requests within the batch
+        size and payload limits, and the vectors are returned in the order of `texts`.
+        """
+        if not self.embedding_model_id:
+            self.logger.error("Embedding model for Gemini was not set")
+            raise Exception("Embedding model for Gemini was not set")
+        if not texts:
+            return []
+
+        distinct, mapping = unique_texts(texts)
+        batches = pack_embedding_batches(distinct, self.embedding_batch_size, self.embedding_batch_max_bytes)
+        config = self.embedding_config(document_type)
+        semaphore = asyncio.Semaphore(max(1, self.embedding_concurrency))
+
+        async def embed_batch(indexes):
+            contents = [distinct[i] for i in indexes]
+            async with semaphore:
+                results = await self.call(
+                    lambda: self.client.aio.models.embed_content(model=self.embedding_model_id, contents=contents, config=config),
+                    *contents
+                )
+            if not results or len(results.embeddings) != len(indexes):
+                raise Exception(f"Gemini returned {len(results.embeddings) if results else 0} embeddings "
+                                f"for a batch of {len(indexes)} texts")
+            return [embedding.values for embedding in results.embeddings]
+
+        try:
+            vectors = [None] * len(distinct)
+            for indexes, batch_vectors in zip(batches, await asyncio.gather(*[embed_batch(b) for b in batches])):
+                for i, vector in zip(indexes, batch_vectors):
+                    vectors[i] = vector
+
+            self.logger.info(f"Embedded {len(texts)} texts ({len(distinct)} distinct) in {len(batches)} requests")
+            return [vectors[i] for i in mapping]
+
+        except Exception as e:
+            self.logger.error(f"Error embedding {len(texts)} texts with Gemini: {str(e)}")
+            raise
+
     async def summarize_text(self, user_prompt: str, system_prompt: str = "", temperature: float = None, max_output_tokens: int = None):
         if not self.summarization_model_id:
             self.logger.error("No model set for summarization with Gemini")
             raise Exception("summarization model for Gemini was not set")
         
         try:
-            config = GenerateContentConfig(
-                system_instruction=system_prompt,
-                temperature=temperature,
-                max_output_tokens=max_output_tokens
-            )
+            config = self.generation_config("summary", system_prompt, temperature, max_output_tokens)
 
-            summary = await self.client.aio.models.generate_content(
-                model=self.summarization_model_id,
-                contents=user_prompt,
-                config=config
+            summary = await self.call(
+                lambda: self.client.aio.models.generate_content(
+                    model=self.summarization_model_id, contents=user_prompt, config=config
+                ),
+                system_prompt, user_prompt, max_output_tokens=max_output_tokens or self.default_max_output_tokens
             )
             return summary.text
         
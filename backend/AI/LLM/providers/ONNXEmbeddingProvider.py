@@ -0,0 +1,177 @@
+from ..LLMInterface import LLMInterface
+from ..LLMEnums import DocumentTypeEnum
+from ..LLMUtils import unique_texts
+from pathlib import Path
+import asyncio
+import os
+from utils import get_logger
+logger = get_logger(__name__)
+
+class ONNXEmbeddingProvider(LLMInterface):
+    """
+    Local sentence-embedding provider running an exported model on CPU with ONNX Runtime.
+    - A model is a directory holding `model.onnx` and its `tokenizer.json`
+    - Texts are sorted by length and run in batches, so a batch carries little padding
+    - At most `inference_concurrency` batches run at once, each on `intra_op_threads` threads
+    - Vectors are mean pooled (unless the model is already pooled), truncated to the
+      configured embedding size and L2 normalized
+    Embedding only: it cannot generate or summarize text.
+    """
+
+    def __init__(self, models_dir: str,
+                 batch_size: int = 32,
+                 max_sequence_length: int = 512,
+                 intra_op_threads: int = 0,
+                 inference_concurrency: int = 1,
+                 query_prefix: str = "",
+                 document_prefix: str = ""):
+
+        self.models_dir = Path(models_dir)
+        self.batch_size = max(1, batch_size)
+        self.max_sequence_length = max_sequence_length
+        self.intra_op_threads = intra_op_threads
+        self.inference_concurrency = max(1, inference_concurrency)
+        # Some models (e5, bge, nomic) are trained with a marker in front of queries and passages
+        self.query_prefix = query_prefix
+        self.document_prefix = document_prefix
+
+        self.embedding_model_id = None
+        self.embedding_size = None
+
+        self.session = None
+        self.tokenizer = None
+        self.input_names = []
+        self.semaphore = asyncio.Semaphore(self.inference_concurrency)
+
+    async def set_generation_model(self, generation_model_id: str):
+        raise Exception("The ONNX provider only supports embeddings")
+
+    async def set_summarization_model(self, summarization_model_id: str):
+        raise Exception("The ONNX provider only supports embeddings")
+
+    def model_dir(self, embedding_model_id: str) -> Path:
+        model_dir = Path(embedding_model_id)
+        if not model_dir.is_absolute():
+            model_dir = self.models_dir / embedding_model_id
+        return model_dir
+
+    def load_model(self, model_dir: Path):
+        try:
+            import onnxruntime
+            from tokenizers import Tokenizer
+        except ImportError as e:
+            raise Exception(f"The ONNX embedding backend needs onnxruntime and tokenizers installed: {e}")
+
+        model_path = model_dir / "model.onnx"
+        tokenizer_path = model_dir / "tokenizer.json"
+        if not model_path.is_file() or not tokenizer_path.is_file():
+            raise Exception(f"No model.onnx and tokenizer.json found in {model_dir}")
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.intra_op_threads > 0:
+            options.intra_op_num_threads = self.intra_op_threads
+        options.inter_op_num_threads = 1
+        session = onnxruntime.InferenceSession(str(model_path), sess_options=options,
+                                               providers=["CPUExecutionProvider"])
+
+        tokenizer = Tokenizer.from_file(str(tokenizer_path))
+        tokenizer.enable_truncation(max_length=self.max_sequence_length)
+        tokenizer.enable_padding()
+        return session, tokenizer
+
+    async def set_embedding_model(self, embedding_model_id: str, embedding_size: int):
+        model_dir = self.model_dir(embedding_model_id)
+        self.session, self.tokenizer = await asyncio.to_thread(self.load_model, model_dir)
+        self.input_names = [i.name for i in self.session.get_inputs()]
+        self.embedding_size = None
+
+        # A size above the output of the model cannot be served; a smaller one truncates the vectors
+        model_size = len((await asyncio.to_thread(self.run_batch, ["size probe"]))[0])
+        if model_size < embedding_size:
+            raise Exception(f"ONNX model {embedding_model_id} outputs vectors of size {model_size}, "
+                            f"below EMBEDDING_SIZE {embedding_size}")
+        self.embedding_model_id = embedding_model_id
+        self.embedding_size = embedding_size
+        logger.info(f"Loaded ONNX embedding model {embedding_model_id} from {model_dir} "
+                    f"({os.cpu_count()} cores, {self.intra_op_threads or 'default'} threads per inference)")
+
+    async def process_text(self, text: str):
+        return text.strip()
+
+    async def generate_text(self, user_prompt: str, system_prompt: str = "", temperature: float = None, max_output_tokens: int = None):
+        raise Exception("The ONNX provider only supports embeddings")
+
+    async def stream_text(self, user_prompt: str, system_prompt: str = "", temperature: float = None, max_output_tokens: int = None):
+        raise Exception("The ONNX provider only supports embeddings")
+        yield
+
+    async def summarize_text(self, user_prompt: str, system_prompt: str = "", temperature: float = None, max_output_tokens: int = None):
+        raise Exception("The ONNX provider only supports embeddings")
+
+    def prefix(self, document_type: str = None) -> str:
+        if document_type == DocumentTypeEnum.QUERY.value:
+            return self.query_prefix
+        return self.document_prefix
+
+    def run_batch(self, texts: list) -> list:
+        """Embed one batch in the calling thread: tokenize, run the session, pool, truncate, normalize."""
+        import numpy as np
+
+        encodings = self.tokenizer.encode_batch(texts)
+        inputs = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        output = self.session.run(None, {name: inputs[name] for name in self.input_names if name in inputs})[0]
+
+        if output.ndim == 3:
+            # Token embeddings: mean over the tokens that are not padding
+            mask = inputs["attention_mask"][..., None].astype(output.dtype)
+            output = (output * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+        if self.embedding_size:
+            output = output[:, :self.embedding_size]
+        output = output / np.clip(np.linalg.norm(output, axis=1, keepdims=True), 1e-12, None)
+        return output.astype(np.float32).tolist()
+
+    async def embed_text(self, text: str, document_type: str = None):
+        vectors = await self.embed_texts([text], document_type=document_type)
+        return vectors[0] if vectors else None
+
+    async def embed_texts(self, texts: list, document_type: str = None):
+        if not self.session:
+            logger.error("Embedding model for ONNX was not set")
+            raise Exception("Embedding model for ONNX was not set")
+        if not texts:
+            return []
+
+        prefix = self.prefix(document_type)
+        distinct, mapping = unique_texts(texts)
+        # Similar lengths in a batch keep the padded tensor close to the real token count
+        order = sorted(range(len(distinct)), key=lambda i: len(distinct[i]))
+        batches = [order[i:i + self.batch_size] for i in range(0, len(order), self.batch_size)]
+
+        async def embed_batch(indexes):
+            async with self.semaphore:
+                return await asyncio.to_thread(self.run_batch, [prefix + distinct[i] for i in indexes])
+
+        try:
+            vectors = [None] * len(distinct)
+            for indexes, batch_vectors in zip(batches, await asyncio.gather(*[embed_batch(b) for b in batches])):
+                for i, vector in zip(indexes, batch_vectors):
+                    vectors[i] = vector
+
+            logger.info(f"Embedded {len(texts)} texts ({len(distinct)} distinct) locally in {len(batches)} batches")
+            return [vectors[i] for i in mapping]
+
+        except Exception as e:
+            logger.error(f"Error embedding {len(texts)} texts with ONNX: {str(e)}")
+            raise
+
+    async def construct_prompt(self, prompt: str, role: str):
+        return {
+            "role": role,
+            "parts": prompt
+        }
@@ -0,0 +1,207 @@
+from ..LLMInterface import LLMInterface
+from ..LLMEnums import OpenAIEnums
+from ..LLMUtils import pack_embedding_batches, unique_texts
+from ..RateLimiter import RateLimiter
+import asyncio
+import json
+import httpx
+from utils import get_logger
+logger = get_logger(__name__)
+
+class OpenAICompatibleProvider(LLMInterface):
+    """
+    Provider for any server exposing the OpenAI chat completions API (vLLM, llama.cpp, TGI...).
+    - Requests go through a pooled keep-alive httpx client, shared by the clients of the factory
+    - Requests go through `rate_limiter` (priority classes, retries of 429 / 5xx / dropped connections);
+      without one, a limiter of this client alone allows at most `concurrency` requests in flight
+    - generate_text and summarize_text use /chat/completions, stream_text its streaming mode,
+      and embeddings use /embeddings
+    - `dimensions` is only sent with `send_embedding_dimensions` (Matryoshka models): other models
+      reject it, so their vectors are checked against `embedding_size` instead
+    """
+
+    def __init__(self, http_client: httpx.AsyncClient, base_url: str,
+                 api_key: str = "",
+                 concurrency: int = 16,
+                 default_max_input_characters: int = 1000,
+                 default_max_output_tokens: int = 1000,
+                 default_temperature: float = 0.7,
+                 embedding_batch_size: int = 100,
+                 embedding_batch_max_bytes: int = 500000,
+                 send_embedding_dimensions: bool = False,
+                 rate_limiter: RateLimiter = None):
+
+        self.http_client = http_client
+        self.base_url = base_url.rstrip("/")
+        self.headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self.rate_limiter = rate_limiter or RateLimiter(
+            requests_per_minute=None, tokens_per_minute=None, max_in_flight=concurrency,
+        )
+
+        self.default_max_input_characters = default_max_input_characters
+        self.default_max_output_tokens = default_max_output_tokens
+        self.default_temperature = default_temperature
+
+        self.embedding_batch_size = embedding_batch_size
+        self.embedding_batch_max_bytes = embedding_batch_max_bytes
+        self.send_embedding_dimensions = send_embedding_dimensions
+
+        self.generation_model_id = None
+        self.summarization_model_id = None
+        self.embedding_model_id = None
+        self.embedding_size = None
+
+        self.enums = OpenAIEnums
+        self.logger = get_logger(__name__)
+
+    async def set_generation_model(self, generation_model_id: str):
+        self.generation_model_id = generation_model_id
+
+    async def set_summarization_model(self, summarization_model_id: str):
+        self.summarization_model_id = summarization_model_id
+
+    async def set_embedding_model(self, embedding_model_id: str, embedding_size: int):
+        self.embedding_model_id = embedding_model_id
+        self.embedding_size = embedding_size
+
+    async def process_text(self, text: str):
+        return text[:self.default_max_input_characters].strip()
+
+    def chat_payload(self, model_id: str, user_prompt: str, system_prompt: str = "",
+                     temperature: float = None, max_output_tokens: int = None, stream: bool = False):
+        messages = []
+        if system_prompt:
+            messages.append({"role": self.enums.SYSTEM.value, "content": system_prompt})
+        messages.append({"role": self.enums.USER.value, "content": user_prompt})
+        return {
+            "model": model_id,
+            "messages": messages,
+            "temperature": temperature if temperature is not None else self.default_temperature,
+            "max_tokens": max_output_tokens or self.default_max_output_tokens,
+            "stream": stream,
+        }
+
+    async def post(self, path: str, payload: dict, tokens: int = 1) -> dict:
+        async def request():
+            response = await self.http_client.post(f"{self.base_url}{path}", json=payload, headers=self.headers)
+            response.raise_for_status()
+            return response.json()
+
+        return await self.rate_limiter.call(request, tokens=tokens)
+
+    async def complete(self, model_id: str, user_prompt: str, system_prompt: str = "",
+                       temperature: float = None, max_output_tokens: int = None):
+        payload = self.chat_payload(model_id, user_prompt, system_prompt, temperature, max_output_tokens)
+        tokens = self.rate_limiter.estimate_tokens(system_prompt, user_prompt) + payload["max_tokens"]
+        result = await self.post("/chat/completions", payload, tokens=tokens)
+        choices = result.get("choices") or []
+        if not choices or not choices[0].get("message", {}).get("content"):
+            return None
+        return choices[0]["message"]["content"]
+
+    async def generate_text(self, user_prompt: str, system_prompt: str = "", temperature: float = None, max_output_tokens: int = None):
+        if not self.generation_model_id:
+            self.logger.error("Generation model for the OpenAI compatible server was not set")
+            raise Exception("Generation model for the OpenAI compatible server was not set")
+
+        try:
+            text = await self.complete(self.generation_model_id, user_prompt, system_prompt, temperature, max_output_tokens)
+            if not text:
+                self.logger.error("No response from the OpenAI compatible chat completion")
+                return None
+            return text
+
+        except Exception as e:
+            self.logger.error(f"Error in chat completion with the OpenAI compatible server: {str(e)}")
+            raise
+
+    async def stream_text(self, user_prompt: str, system_prompt: str = "", temperature: float = None, max_output_tokens: int = None):
+        """Yield the generated text piece by piece, as the server sends it."""
+        if not self.generation_model_id:
+            self.logger.error("Generation model for the OpenAI compatible server was not set")
+            raise Exception("Generation model for the OpenAI compatible server was not set")
+
+        payload = self.chat_payload(self.generation_model_id, user_prompt, system_prompt,
+                                    temperature, max_output_tokens, stream=True)
+
+        async def deltas():
+            async with self.http_client.stream("POST", f"{self.base_url}/chat/completions",
+                                               json=payload, headers=self.headers) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    choices = json.loads(data).get("choices") or []
+                    delta = choices[0].get("delta", {}).get("content") if choices else None
+                    if delta:
+                        yield delta
+
+        async def request():
+            return deltas()
+
+        # Retried while nothing was yielded yet, e.g. on a 503 or a refused connection
+        tokens = self.rate_limiter.estimate_tokens(system_prompt, user_prompt) + payload["max_tokens"]
+        async for delta in self.rate_limiter.stream(request, tokens=tokens):
+            yield delta
+
+    async def summarize_text(self, user_prompt: str, system_prompt: str = "", temperature: float = None, max_output_tokens: int = None):
+        if not self.summarization_model_id:
+            self.logger.error("No model set for summarization with the OpenAI compatible server")
+            raise Exception("summarization model for the OpenAI compatible server was not set")
+
+        try:
+            return await self.complete(self.summarization_model_id, user_prompt, system_prompt, temperature, max_output_tokens)
+
+        except Exception as e:
+            self.logger.error(f"Error summarizing text with the OpenAI compatible server: {str(e)}")
+            raise
+
+    async def embed_text(self, text: str, document_type: str = None):
+        vectors = await self.embed_texts([text], document_type=document_type)
+        return vectors[0] if vectors else None
+
+    async def embed_texts(self, texts: list, document_type: str = None):
+        if not self.embedding_model_id:
+            self.logger.error("Embedding model for the OpenAI compatible server was not set")
+            raise Exception("Embedding model for the OpenAI compatible server was not set")
+        if not texts:
+            return []
+
+        distinct, mapping = unique_texts(texts)
+        batches = pack_embedding_batches(distinct, self.embedding_batch_size, self.embedding_batch_max_bytes)
+
+        async def embed_batch(indexes):
+            inputs = [distinct[i] for i in indexes]
+            payload = {"model": self.embedding_model_id, "input": inputs}
+            if self.send_embedding_dimensions:
+                payload["dimensions"] = self.embedding_size
+            result = await self.post("/embeddings", payload, tokens=self.rate_limiter.estimate_tokens(*inputs))
+            data = sorted(result.get("data") or [], key=lambda d: d.get("index", 0))
+            if len(data) != len(indexes):
+                raise Exception(f"Server returned {len(data)} embeddings for a batch of {len(indexes)} texts")
+            for d in data:
+                if len(d["embedding"]) != self.embedding_size:
+                    raise Exception(f"Server returned embeddings of size {len(d['embedding'])}, "
+                                    f"expected EMBEDDING_SIZE={self.embedding_size} (OPENAI_EMBEDDING_DIMENSIONS asks "
+                                    f"a Matryoshka model for that size)")
+            return [d["embedding"] for d in data]
+
+        try:
+            vectors = [None] * len(distinct)
+            for indexes, batch_vectors in zip(batches, await asyncio.gather(*[embed_batch(b) for b in batches])):
+                for i, vector in zip(indexes, batch_vectors):
+                    vectors[i] = vector
+            return [vectors[i] for i in mapping]
+
+        except Exception as e:
+            self.logger.error(f"Error embedding {len(texts)} texts with the OpenAI compatible server: {str(e)}")
+            raise
+
+    async def construct_prompt(self, prompt: str, role: str):
+        return {
+            "role": role,
+            "content": prompt
+        }
@@ -1 +1,2 @@
-from .GeminiProvider import GeminiProvider
\ No newline at end of file
+from .GeminiProvider import GeminiProvider
+from .CachedEmbeddingProvider import CachedEmbeddingProvider
\ No newline at end of file
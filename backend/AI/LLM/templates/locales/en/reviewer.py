@@ -0,0 +1,43 @@
+from string import Template
+
+#### System ####
+system_prompt = Template(
+    "\n".join([
+        "You are a research assistant that writes literature reviews.",
+        "You will be provided with summaries of the research papers of a project.",
+        "Your task is to synthesize them accurately: compare the papers, do not just list them.",
+        "\n\n"
+    ])
+)
+
+#### Document ####
+combine_prompt = Template(
+    "\n".join([
+        "Synthesize the following paper summaries into a partial literature review of these papers.",
+        "Group the papers by theme, and keep their key methods, findings, numbers and disagreements.",
+        "Name the papers as in their headings, so they can be cited in the final review.",
+        "Do not add an introduction or a conclusion: other papers of the project are reviewed separately.",
+        "Avoid adding any information not present in the summaries.",
+        "\n\n",
+        "## summaries: $summaries"
+    ])
+)
+
+review_prompt = Template(
+    "\n".join([
+        "Write a literature review of the project from the following paper summaries or partial reviews.",
+        "Organize it by theme in markdown, with an overview, the main approaches and findings,",
+        "where the papers agree or disagree, and the open questions they leave.",
+        "Name the papers as in their headings whenever you rely on them.",
+        "Avoid adding any information not present in the summaries.",
+        "\n\n",
+        "## summaries: $summaries"
+    ])
+)
+
+#### Footer ####
+footer_prompt = Template(
+    "\n".join([
+        "## Literature review:",
+    ])
+)
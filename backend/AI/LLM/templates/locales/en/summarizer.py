@@ -22,6 +22,19 @@ map_prompt = Template(
     ])
 )
 
+packed_map_prompt = Template(
+    "\n".join([
+        "Summarize each of the following short sections separately, in a concise manner.",
+        "If a section content is very short to summarize, return it as is.",
+        "If a section contains researchers data, please restructure it in a clear format.",
+        "Avoid adding any information not present in the section content.",
+        "Answer with every section in the same order, each under its own marker line,",
+        "written exactly as in the input (for example: === SECTION 1 ===), and nothing else.",
+        "\n\n",
+        "## sections: $sections"
+    ])
+)
+
 reduce_prompt = Template(
     "\n".join([
         "Merge the following section summaries into a coherent paper summary.",
@@ -31,6 +44,16 @@ reduce_prompt = Template(
     ])
 )
 
+combine_prompt = Template(
+    "\n".join([
+        "Merge the following consecutive section summaries into one shorter summary of this part of the paper.",
+        "Keep the key findings, methods and numbers, and keep the section titles as markdown headings.",
+        "Do not add an introduction or a conclusion: other parts of the paper are summarized separately.",
+        "\n\n",
+        "## summarized_sections: $sections"
+    ])
+)
+
 #### Footer ####
 footer_prompt = Template(
     "\n".join([
@@ -42,4 +42,15 @@ class VectorDBInterface(ABC):
     @abstractmethod
     async def query_search(self, collection_name: str, vector: list, limit: int):
         pass
-    
\ No newline at end of file
+
+    @abstractmethod
+    async def get_paper_vectors(self, collection_name: str, paper_id: str):
+        pass
+
+    @abstractmethod
+    async def get_collection_embedding_size(self, collection_name: str):
+        pass
+
+    @abstractmethod
+    async def delete_chunk_embeddings(self, collection_name: str, chunk_ids: list):
+        pass
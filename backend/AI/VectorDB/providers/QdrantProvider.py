@@ -21,6 +21,15 @@ class QdrantProvider(VectorDBInterface):
         elif distance_metric == "dot":
             self.distance_metric = models.Distance.DOT
 
+    @staticmethod
+    def to_point_id(chunk_id: str) -> str:
+        """Qdrant only accepts integers or UUIDs as point ids: pad the 24-hex chunk ObjectId into a UUID."""
+        return str(uuid.UUID(hex=str(chunk_id).ljust(32, "0")))
+
+    @staticmethod
+    def to_chunk_id(point_id: str) -> str:
+        return uuid.UUID(str(point_id)).hex[:24]
+
     async def connect(self):
         self.client = AsyncQdrantClient(
                 host=self.host,
@@ -48,6 +57,13 @@ class QdrantProvider(VectorDBInterface):
             logger.warning(f"Cannot retrieve info for collection '{collection_name}': does not exist.")
             return None
 
+    async def get_collection_embedding_size(self, collection_name: str):
+        '''Vector size of an existing collection, or None when it does not exist'''
+        if not await self.client.collection_exists(collection_name):
+            return None
+        info = await self.client.get_collection(collection_name=collection_name)
+        return info.config.params.vectors.size
+
     async def delete_collection(self, collection_name):
         '''Delete the collection = Delete all project embedding chunks'''
         if await self.client.collection_exists(collection_name):
@@ -85,6 +101,20 @@ class QdrantProvider(VectorDBInterface):
             logger.error(f"Error deleting embeddings for paper_id '{paper_id}' in collection '{collection_name}': {e}")
             raise
 
+    async def delete_chunk_embeddings(self, collection_name: str, chunk_ids: list):
+        '''Delete the embeddings of specific chunks in a collection'''
+        if not chunk_ids:
+            return
+        try:
+            await self.client.delete(
+                collection_name=collection_name,
+                points_selector=models.PointIdsList(points=[self.to_point_id(chunk_id) for chunk_id in chunk_ids])
+            )
+            logger.info(f"Deleted embeddings of {len(chunk_ids)} chunks in collection '{collection_name}'.")
+        except Exception as e:
+            logger.error(f"Error deleting embeddings of {len(chunk_ids)} chunks in collection '{collection_name}': {e}")
+            raise
+
     async def create_collection(self, collection_name: str, embedding_size: int, do_reset: bool = False):
         try:
             if do_reset:
@@ -102,6 +132,10 @@ class QdrantProvider(VectorDBInterface):
             else:
                 logger.warning(f"Collection '{collection_name}' already exists.")
         except Exception as e:
+            # Another writer (e.g. an ingestion copying vectors) may have created it since the check
+            if not do_reset and await self.client.collection_exists(collection_name):
+                logger.warning(f"Collection '{collection_name}' was created concurrently.")
+                return
             logger.error(f"Error during create collection with name {collection_name}")
             raise
 
@@ -123,7 +157,7 @@ class QdrantProvider(VectorDBInterface):
                 collection_name=collection_name,
                 points=[
                     models.PointStruct(
-                        id=chunk_id,
+                        id=self.to_point_id(chunk_id),
                         vector=vector,
                         payload={"text": text, "paper_id": paper_id, **(metadata or {})}
                     )
@@ -158,7 +192,7 @@ class QdrantProvider(VectorDBInterface):
                     payload = {"text": texts[j], "paper_id": paper_ids[j], **metadatas[j]}
 
                     point = models.PointStruct(
-                        id=chunk_ids[j],
+                        id=self.to_point_id(chunk_ids[j]),
                         vector=vectors[j],
                         payload=payload
                     )
@@ -177,6 +211,37 @@ class QdrantProvider(VectorDBInterface):
             logger.error(f"Error inserting into collection '{collection_name}': {e}")
             raise
 
+    async def get_paper_vectors(self, collection_name: str, paper_id: str, batch_size: int = 256):
+        '''Stored vectors of a paper, keyed by chunk id'''
+        if not await self.client.collection_exists(collection_name):
+            logger.warning(f"Collection '{collection_name}' does not exist.")
+            return {}
+
+        try:
+            vectors = {}
+            offset = None
+            while True:
+                points, offset = await self.client.scroll(
+                    collection_name=collection_name,
+                    scroll_filter=models.Filter(
+                        must=[models.FieldCondition(key="paper_id", match=models.MatchValue(value=paper_id))]
+                    ),
+                    limit=batch_size,
+                    offset=offset,
+                    with_payload=False,
+                    with_vectors=True,
+                )
+                for point in points:
+                    vectors[self.to_chunk_id(point.id)] = point.vector
+                if offset is None:
+                    break
+
+            logger.info(f"Retrieved {len(vectors)} vectors for paper_id '{paper_id}' in collection '{collection_name}'.")
+            return vectors
+        except Exception as e:
+            logger.error(f"Error retrieving vectors for paper_id '{paper_id}' in collection '{collection_name}': {e}")
+            raise
+
     async def query_search(self, collection_name:str, query_vector:List[float],
             limit:int = 5, min_score:float = 0.7, return_metadata: bool = False
     ):
@@ -0,0 +1,118 @@
+"""
+Wall-clock comparison of serial and page-parallel PDF conversion.
+
+    cd backend
+    python -m benchmarks.bench_conversion --pages 200 --workers 4
+
+Without --pdf, a synthetic document with numbered sections is generated.
+The headers found by both conversions are compared, since chunking splits sections on them.
+"""
+import argparse
+import asyncio
+import os
+import re
+import tempfile
+import time
+from utils.conversion_pool import ConversionPool, count_pdf_pages
+
+HEADER_PATTERN = re.compile(r'^#{1,4}\s+(.+)$', re.M)
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_synthetic_pdf(path: str, num_pages: int, pages_per_section: int = 3):
+    """Minimal text-only PDF: a numbered section header every few pages, paragraphs on every page."""
+    lorem = ("The proposed method improves retrieval quality on long documents while keeping the "
+             "latency of the pipeline bounded by the slowest stage of the system.")
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, written once the page ids are known
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold >>",
+    ]
+    page_ids = []
+    for page in range(num_pages):
+        lines, y = [], 760
+        if page % pages_per_section == 0:
+            section = page // pages_per_section + 1
+            lines.append(f"BT /F2 16 Tf 60 {y} Td ({section} Section {section}) Tj ET")
+            y -= 36
+        for paragraph in range(6):
+            for line in range(5):
+                text = _escape(f"{lorem[:90]} [p{page + 1}.{paragraph + 1}.{line + 1}]")
+                lines.append(f"BT /F1 10 Tf 60 {y} Td ({text}) Tj ET")
+                y -= 13
+            y -= 12
+        stream = "\n".join(lines)
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        content_id = len(objects)
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents {content_id} 0 R >>")
+        page_ids.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {num_pages} >>"
+
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(f.tell())
+            f.write(f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1"))
+        xref = f.tell()
+        f.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+        for offset in offsets:
+            f.write(f"{offset:010d} 00000 n \n".encode())
+        f.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+
+
+async def run(pdf_path: str, workers: int, min_pages_per_range: int):
+    pool = ConversionPool(pool_size=workers, job_timeout=3600, min_pages_per_range=min_pages_per_range)
+    await pool.start()
+    try:
+        num_pages = count_pdf_pages(pdf_path)
+        # Warm every worker so model loading is excluded from both measurements
+        await asyncio.gather(*[w.wait_ready(pool.startup_timeout) for w in pool._workers])
+
+        pool.parallel_min_pages = float("inf")
+        start = time.perf_counter()
+        serial_md = await pool.convert(pdf_path)
+        serial_time = time.perf_counter() - start
+
+        pool.parallel_min_pages = 1
+        start = time.perf_counter()
+        parallel_md = await pool.convert(pdf_path)
+        parallel_time = time.perf_counter() - start
+
+        serial_headers = HEADER_PATTERN.findall(serial_md)
+        parallel_headers = HEADER_PATTERN.findall(parallel_md)
+        print(f"pages:               {num_pages}")
+        print(f"workers:             {workers} ({len(pool.page_ranges(num_pages))} page ranges)")
+        print(f"serial:              {serial_time:8.1f} s")
+        print(f"page-parallel:       {parallel_time:8.1f} s  (x{serial_time / parallel_time:.2f})")
+        print(f"headers (serial):    {len(serial_headers)}")
+        print(f"headers (parallel):  {len(parallel_headers)}  identical order: {serial_headers == parallel_headers}")
+    finally:
+        await pool.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdf", help="PDF to convert instead of a synthetic document")
+    parser.add_argument("--pages", type=int, default=200, help="pages of the synthetic document")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--min-pages-per-range", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.pdf:
+        asyncio.run(run(args.pdf, args.workers, args.min_pages_per_range))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = os.path.join(tmp, "synthetic.pdf")
+        write_synthetic_pdf(pdf_path, args.pages)
+        asyncio.run(run(pdf_path, args.workers, args.min_pages_per_range))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Request count and wall time of embedding chunks one by one versus with embed_texts.
+
+    cd backend
+    python -m benchmarks.bench_embedding --texts 2000 --latency 0.15
+
+The Gemini HTTP client is replaced by a simulated endpoint with a fixed round-trip latency
+and a small per-text cost, so the comparison runs offline and is reproducible.
+"""
+import argparse
+import asyncio
+import random
+import time
+from types import SimpleNamespace
+from AI.LLM.LLMEnums import DocumentTypeEnum
+from AI.LLM.providers.GeminiProvider import GeminiProvider
+
+
+class SimulatedEmbeddingEndpoint:
+    def __init__(self, latency: float, per_text: float, embedding_size: int):
+        self.latency = latency
+        self.per_text = per_text
+        self.embedding_size = embedding_size
+        self.requests = 0
+
+    async def embed_content(self, model, contents, config):
+        self.requests += 1
+        texts = contents if isinstance(contents, list) else [contents]
+        await asyncio.sleep(self.latency + self.per_text * len(texts))
+        return SimpleNamespace(embeddings=[
+            SimpleNamespace(values=[float(len(t) % 7)] * self.embedding_size) for t in texts
+        ])
+
+
+def make_provider(endpoint, batch_size: int, concurrency: int):
+    provider = GeminiProvider(api_key="benchmark", embedding_batch_size=batch_size, embedding_concurrency=concurrency)
+    provider.client = SimpleNamespace(aio=SimpleNamespace(models=endpoint))
+    provider.embedding_model_id = "simulated"
+    provider.embedding_size = endpoint.embedding_size
+    return provider
+
+
+def make_texts(count: int, duplicate_ratio: float):
+    rng = random.Random(0)
+    words = ["retrieval", "transformer", "latency", "corpus", "gradient", "attention", "benchmark", "token"]
+    texts = [" ".join(rng.choice(words) for _ in range(150)) + f" #{i}" for i in range(count)]
+    for i in range(int(count * duplicate_ratio)):
+        texts[rng.randrange(count)] = texts[i]   # repeated boilerplate chunks
+    return texts
+
+
+async def one_by_one(provider, texts):
+    # The previous indexing path: one request per chunk behind a semaphore of 8
+    semaphore = asyncio.Semaphore(8)
+
+    async def embed(text):
+        async with semaphore:
+            return await provider.embed_text(text=text, document_type=DocumentTypeEnum.DOCUMENT.value)
+
+    return await asyncio.gather(*[embed(t) for t in texts])
+
+
+async def run(args):
+    texts = make_texts(args.texts, args.duplicates)
+
+    results = {}
+    for name, embed in [("one request per text", lambda p: one_by_one(p, texts)),
+                        ("embed_texts", lambda p: p.embed_texts(texts, DocumentTypeEnum.DOCUMENT.value))]:
+        endpoint = SimulatedEmbeddingEndpoint(args.latency, args.per_text, embedding_size=8)
+        provider = make_provider(endpoint, args.batch_size, args.concurrency)
+        start = time.perf_counter()
+        vectors = await embed(provider)
+        results[name] = vectors
+        print(f"{name:22s} requests: {endpoint.requests:6d}   wall time: {time.perf_counter() - start:7.2f} s")
+
+    baseline, batched = results.values()
+    print(f"same vectors in the same order: {baseline == batched}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--duplicates", type=float, default=0.05, help="share of texts that repeat another one")
+    parser.add_argument("--latency", type=float, default=0.15, help="seconds per request")
+    parser.add_argument("--per-text", type=float, default=0.002, help="extra seconds per text in a request")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=4)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Client-side overhead of one Gemini generate_text call, before and after the stateless fast path.
+
+    cd backend
+    python -m benchmarks.bench_gemini_overhead --calls 300 --concurrency 16
+
+A local stub serves the generateContent endpoint with an instant canned answer, so the
+measured time is the client overhead plus a loopback round trip:
+- before: a chat object and a new GenerateContentConfig per call, default client (a new
+  aiohttp session, hence a new connection, per request when aiohttp is installed)
+- after: generate_content with a cached config over the shared pooled keep-alive transport
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import socket
+import statistics
+import time
+import uvicorn
+from fastapi import FastAPI
+from google import genai
+from google.genai.types import GenerateContentConfig, HttpOptions
+from AI.LLM.providers.GeminiProvider import GeminiProvider
+
+MODEL_ID = "gemini-2.0-flash"
+
+
+def create_stub_app():
+    app = FastAPI()
+
+    @app.post("/v1beta/models/{model_action}")
+    async def generate_content(model_action: str):
+        return {
+            "candidates": [{"content": {"role": "model", "parts": [{"text": "ok"}]}, "finishReason": "STOP"}],
+            "usageMetadata": {"promptTokenCount": 8, "candidatesTokenCount": 1, "totalTokenCount": 9},
+        }
+
+    return app
+
+
+def serve_stub(port: int):
+    uvicorn.run(create_stub_app(), host="127.0.0.1", port=port, log_level="warning")
+
+
+def start_stub_server():
+    """Serve the stub from another process, so it does not compete with the client for the GIL."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    process = multiprocessing.get_context("spawn").Process(target=serve_stub, args=(port,), daemon=True)
+    process.start()
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            break
+        except OSError:
+            time.sleep(0.1)
+    return process, f"http://127.0.0.1:{port}/"
+
+
+async def previous_generate_text(provider, user_prompt: str, system_prompt: str):
+    # generate_text as it was: a chat object and a config built for every single message
+    config = GenerateContentConfig(
+        system_instruction=system_prompt,
+        temperature=provider.default_temperature,
+        max_output_tokens=provider.default_max_output_tokens,
+    )
+    chat = provider.client.aio.chats.create(model=provider.generation_model_id)
+    response = await chat.send_message(message=user_prompt, config=config)
+    return response.text
+
+
+async def measure(call, calls: int, concurrency: int):
+    for _ in range(10):
+        await call()   # warm up connections and caches
+
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        await call()
+        latencies.append(time.perf_counter() - start)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited():
+        async with semaphore:
+            await call()
+
+    start = time.perf_counter()
+    await asyncio.gather(*[limited() for _ in range(calls)])
+    throughput = calls / (time.perf_counter() - start)
+
+    latencies.sort()
+    return {
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "calls_per_second": throughput,
+    }
+
+
+async def run(args, base_url: str):
+    user_prompt, system_prompt = "Explain retrieval augmented generation in one line.", "You are a research assistant."
+
+    before = GeminiProvider(api_key="benchmark",
+                            client=genai.Client(api_key="benchmark", http_options=HttpOptions(base_url=base_url)))
+    transport = GeminiProvider.create_transport(max_connections=args.concurrency, http2=True)
+    after = GeminiProvider(api_key="benchmark", client=GeminiProvider.create_client("benchmark", transport, base_url))
+    for provider in (before, after):
+        await provider.set_generation_model(MODEL_ID)
+
+    results = {
+        "before": await measure(lambda: previous_generate_text(before, user_prompt, system_prompt), args.calls, args.concurrency),
+        "after": await measure(lambda: after.generate_text(user_prompt, system_prompt), args.calls, args.concurrency),
+    }
+    await transport.aclose()
+
+    for name, r in results.items():
+        print(f"{name:7s} mean {r['mean_ms']:7.2f} ms   p50 {r['p50_ms']:7.2f} ms   p99 {r['p99_ms']:7.2f} ms   "
+              f"{r['calls_per_second']:8.1f} calls/s at concurrency {args.concurrency}")
+    print(f"per-call overhead reduced by {results['before']['mean_ms'] - results['after']['mean_ms']:.2f} ms "
+          f"({results['before']['mean_ms'] / results['after']['mean_ms']:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    # Only the client overhead is measured, not the per-call logging of the provider
+    logging.disable(logging.INFO)
+    process, base_url = start_stub_server()
+    try:
+        asyncio.run(run(args, base_url))
+    finally:
+        process.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Throughput of the LLM workloads of Inquiro against the fake provider, through the shared rate limiter.
+
+    cd backend
+    python -m benchmarks.bench_llm_throughput --chunks 5000 --queries 50 --summaries 40 --json results.json
+
+Runs offline with deterministic outputs: the latency, error rate, 429 bursts and quota are
+simulated, so runs can be compared across changes (e.g. in CI, with --json).
+- indexing: embed_texts over the chunks of a project (bulk)
+- rag: concurrent questions, each a query embedding and a generation (interactive)
+- summaries: concurrent section summaries (bulk)
+"""
+import argparse
+import asyncio
+import json
+import time
+from AI.LLM.LLMEnums import DocumentTypeEnum, PriorityEnum
+from AI.LLM.RateLimiter import RateLimiter, priority_scope
+from AI.LLM.providers.FakeProvider import FakeProvider
+
+
+def make_provider(args, rate_limiter):
+    return FakeProvider(
+        latency_ms=args.latency_ms,
+        latency_jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit_burst_rate=args.burst_rate,
+        requests_per_minute=args.quota,
+        seed=args.seed,
+        embedding_batch_size=args.batch_size,
+        embedding_concurrency=args.concurrency,
+        rate_limiter=rate_limiter,
+    )
+
+
+async def indexing(provider, args):
+    texts = [f"chunk {i} of a synthetic paper about retrieval " * 20 for i in range(args.chunks)]
+    await provider.embed_texts(texts, document_type=DocumentTypeEnum.DOCUMENT.value)
+    return len(texts)
+
+
+async def rag(provider, args):
+    async def answer(i):
+        with priority_scope(PriorityEnum.INTERACTIVE.value):
+            await provider.embed_text(f"question {i}", document_type=DocumentTypeEnum.QUERY.value)
+            await provider.generate_text(f"context and question {i} " * 50, "system prompt")
+
+    await asyncio.gather(*[answer(i) for i in range(args.queries)])
+    return args.queries
+
+
+async def summaries(provider, args):
+    await asyncio.gather(*[provider.summarize_text(f"section {i} " * 400, "summarize") for i in range(args.summaries)])
+    return args.summaries
+
+
+async def run(args):
+    results = {}
+    for name, workload in [("indexing", indexing), ("rag", rag), ("summaries", summaries)]:
+        rate_limiter = RateLimiter(requests_per_minute=args.rpm, tokens_per_minute=args.tpm,
+                                   base_delay=args.retry_delay, max_delay=args.retry_delay * 8)
+        provider = make_provider(args, rate_limiter)
+        await provider.set_embedding_model("fake-embedding", args.embedding_size)
+        await provider.set_generation_model("fake-generation")
+        await provider.set_summarization_model("fake-summary")
+
+        start = time.perf_counter()
+        items = await workload(provider, args)
+        elapsed = time.perf_counter() - start
+        results[name] = {
+            "items": items,
+            "seconds": round(elapsed, 3),
+            "items_per_second": round(items / elapsed, 2),
+            "requests": provider.requests,
+            "failed_requests": provider.failures,
+            "final_rate_factor": round(rate_limiter.rate_factor, 3),
+        }
+        print(f"{name:10s} items: {items:6d}   wall time: {elapsed:7.2f} s   {items / elapsed:9.1f} items/s   "
+              f"requests: {provider.requests:5d}   failed: {provider.failures:4d}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--summaries", type=int, default=40)
+    parser.add_argument("--embedding-size", type=int, default=256)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=4, help="embedding requests in flight")
+    parser.add_argument("--latency-ms", type=float, default=150)
+    parser.add_argument("--jitter", type=float, default=0.3)
+    parser.add_argument("--error-rate", type=float, default=0.01)
+    parser.add_argument("--burst-rate", type=float, default=0.0, help="chance a request starts a burst of 429s")
+    parser.add_argument("--quota", type=int, default=0, help="simulated provider requests per minute, 0 for none")
+    parser.add_argument("--rpm", type=int, default=600, help="requests per minute of the rate limiter")
+    parser.add_argument("--tpm", type=int, default=4000000, help="tokens per minute of the rate limiter")
+    parser.add_argument("--retry-delay", type=float, default=0.05, help="base retry delay in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write the results to this file")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
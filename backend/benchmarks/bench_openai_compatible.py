@@ -0,0 +1,188 @@
+"""
+OpenAI compatible provider against a local stub server: protocol, retries and priority scheduling.
+
+    cd backend
+    python -m benchmarks.bench_openai_compatible --bulk-texts 2000 --questions 20 --concurrency 8
+
+A local stub serves /v1/chat/completions (plain and streamed) and /v1/embeddings the way vLLM
+does for a model without Matryoshka support: a request carrying "dimensions" is rejected with
+a 400. Every `--fail-every`th request answers 503, so each call must survive through the retries.
+- protocol: generate_text, stream_text and embed_texts return what the stub sent
+- retries: the 503s served, every call still succeeding
+- priority: latency of interactive questions sent while bulk embeddings keep every slot busy,
+  marked interactive (they overtake the queued batches) and unmarked (they wait in arrival order)
+"""
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import socket
+import statistics
+import time
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from AI.LLM.LLMEnums import PriorityEnum
+from AI.LLM.RateLimiter import RateLimiter, priority_scope
+from AI.LLM.providers.OpenAICompatibleProvider import OpenAICompatibleProvider
+
+MODEL_ID = "stub-model"
+EMBEDDING_SIZE = 64
+ANSWER = "retrieval augmented generation grounds answers in retrieved passages"
+
+
+def create_stub_app(latency_ms: float, fail_every: int):
+    app = FastAPI()
+    stats = {"requests": 0, "failed": 0, "rejected_dimensions": 0}
+
+    def should_fail():
+        stats["requests"] += 1
+        if fail_every and stats["requests"] % fail_every == 0:
+            stats["failed"] += 1
+            return True
+        return False
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        if should_fail():
+            return JSONResponse(status_code=503, content={"error": "server overloaded"})
+        await asyncio.sleep(latency_ms / 1000)
+        if not body.get("stream"):
+            return {"choices": [{"index": 0, "message": {"role": "assistant", "content": ANSWER}}]}
+
+        async def events():
+            for word in ANSWER.split(" "):
+                yield f"data: {json.dumps({'choices': [{'index': 0, 'delta': {'content': word + ' '}}]})}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        if "dimensions" in body:
+            stats["rejected_dimensions"] += 1
+            return JSONResponse(status_code=400, content={"error": "model does not support matryoshka representation"})
+        if should_fail():
+            return JSONResponse(status_code=503, content={"error": "server overloaded"})
+        await asyncio.sleep(latency_ms / 1000)
+        return {"data": [{"index": i, "embedding": [float(len(text) % 7)] * EMBEDDING_SIZE}
+                         for i, text in enumerate(body["input"])]}
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    return app
+
+
+def serve_stub(port: int, latency_ms: float, fail_every: int):
+    uvicorn.run(create_stub_app(latency_ms, fail_every), host="127.0.0.1", port=port, log_level="warning")
+
+
+def start_stub_server(latency_ms: float, fail_every: int):
+    """Serve the stub from another process, so it does not compete with the client for the GIL."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    process = multiprocessing.get_context("spawn").Process(
+        target=serve_stub, args=(port, latency_ms, fail_every), daemon=True,
+    )
+    process.start()
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            break
+        except OSError:
+            time.sleep(0.1)
+    return process, f"http://127.0.0.1:{port}"
+
+
+async def make_provider(http_client, base_url: str, args):
+    rate_limiter = RateLimiter(requests_per_minute=None, tokens_per_minute=None, max_retries=5,
+                               base_delay=0.05, max_delay=0.5, max_in_flight=args.concurrency)
+    provider = OpenAICompatibleProvider(http_client=http_client, base_url=f"{base_url}/v1",
+                                        embedding_batch_size=args.batch_size, rate_limiter=rate_limiter)
+    await provider.set_generation_model(MODEL_ID)
+    await provider.set_embedding_model(MODEL_ID, EMBEDDING_SIZE)
+    return provider
+
+
+async def protocol(provider):
+    answer = await provider.generate_text("What is RAG?", "You are a research assistant.")
+    streamed = "".join([piece async for piece in provider.stream_text("What is RAG?")]).strip()
+    vectors = await provider.embed_texts([f"text {i}" for i in range(10)])
+    return {
+        "generate_text": answer == ANSWER,
+        "stream_text": streamed == ANSWER,
+        "embed_texts": len(vectors) == 10 and all(len(v) == EMBEDDING_SIZE for v in vectors),
+    }
+
+
+async def questions_under_bulk(provider, args, interactive: bool):
+    texts = [f"chunk {i} of a synthetic paper about retrieval" for i in range(args.bulk_texts)]
+    bulk = asyncio.create_task(provider.embed_texts(texts))
+    await asyncio.sleep(0.2)   # let the bulk batches fill the slots and the queue
+
+    async def question(i):
+        start = time.perf_counter()
+        if interactive:
+            with priority_scope(PriorityEnum.INTERACTIVE.value):
+                await provider.generate_text(f"question {i}")
+        else:
+            await provider.generate_text(f"question {i}")
+        return time.perf_counter() - start
+
+    latencies = sorted(await asyncio.gather(*[question(i) for i in range(args.questions)]))
+    await bulk
+    return {
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "max_ms": latencies[-1] * 1000,
+    }
+
+
+async def run(args, base_url: str):
+    async with httpx.AsyncClient(timeout=30) as http_client:
+        provider = await make_provider(http_client, base_url, args)
+        checks = await protocol(provider)
+        results = {
+            "interactive": await questions_under_bulk(await make_provider(http_client, base_url, args), args, True),
+            "unmarked": await questions_under_bulk(await make_provider(http_client, base_url, args), args, False),
+        }
+        stats = (await http_client.get(f"{base_url}/stats")).json()
+
+    for name, ok in checks.items():
+        print(f"{name:14s} {'ok' if ok else 'MISMATCH'}")
+    print(f"stub served {stats['requests']} requests, {stats['failed']} of them 503 (all retried), "
+          f"{stats['rejected_dimensions']} rejected for sending dimensions")
+    for name, r in results.items():
+        print(f"questions {name:11s} mean {r['mean_ms']:8.1f} ms   p50 {r['p50_ms']:8.1f} ms   max {r['max_ms']:8.1f} ms   "
+              f"behind {args.bulk_texts // args.batch_size} bulk batches at concurrency {args.concurrency}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bulk-texts", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--fail-every", type=int, default=10)
+    args = parser.parse_args()
+
+    # The retries are counted by the stub, not logged one by one
+    logging.disable(logging.INFO)
+    process, base_url = start_stub_server(args.latency_ms, args.fail_every)
+    try:
+        asyncio.run(run(args, base_url))
+    finally:
+        process.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Wall time of a paper summary as a function of its section count and of the map concurrency.
+
+    cd backend
+    python -m benchmarks.bench_summary --sections 10 20 40 --concurrency 1 4 8 16 --short-sections 30
+
+Runs SummaryController.generate_summary against the fake provider, behind the shared rate
+limiter, on synthetic papers: latency, errors and 429 bursts are simulated, nothing leaves
+the machine. Concurrency 1 is the previous sequential map step. Short sections (author
+blocks, captions) are spread among the long ones; --pack-small-tokens 0 disables packing.
+Each cell shows the wall time and the number of summary requests.
+"""
+import argparse
+import asyncio
+import os
+import time
+from types import SimpleNamespace
+
+# The controllers read the app settings; the benchmark needs none of the secrets
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+
+from AI.LLM.RateLimiter import RateLimiter
+from AI.LLM.providers.FakeProvider import FakeProvider
+from controllers.summary_controller import SummaryController
+
+
+class TemplateStub:
+    def get(self, group: str, key: str, vars: dict = None):
+        return f"{key}:\n" + " ".join(str(v) for v in (vars or {}).values())
+
+
+class SyntheticPaper:
+    """Stands in for ChunkModel: `sections` sections of a few chunks each, and `short_sections` one-line ones spread among them."""
+
+    def __init__(self, sections: int, chunks_per_section: int = 4, short_sections: int = 0):
+        total = sections + short_sections
+        self.sections = {}
+        for s in range(total):
+            if (s + 1) * short_sections // total > s * short_sections // total:
+                chunks = [SimpleNamespace(chunk_text=f"short section {s} " * 20,
+                                          chunk_metadata={"section_title": f"Section {s}"})]
+            else:
+                chunks = [SimpleNamespace(chunk_text=f"section {s} chunk {c} " * 150,
+                                          chunk_metadata={"section_title": f"Section {s}"})
+                          for c in range(chunks_per_section)]
+            self.sections[str(s)] = chunks
+
+    async def get_chunks_grouped_by_section(self, paper_id: str):
+        return self.sections
+
+
+async def summarize(args, sections: int, concurrency: int):
+    provider = FakeProvider(
+        latency_ms=args.latency_ms,
+        latency_jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit_burst_rate=args.burst_rate,
+        seed=args.seed,
+        rate_limiter=RateLimiter(requests_per_minute=args.rpm, tokens_per_minute=args.tpm,
+                                 base_delay=args.retry_delay, max_delay=args.retry_delay * 8),
+    )
+    await provider.set_summarization_model("fake-summary")
+
+    controller = SummaryController(summary_client=provider, template_parser=TemplateStub())
+    controller.app_settings.SUMMARY_MAP_CONCURRENCY = concurrency
+    controller.app_settings.SUMMARY_PACK_SMALL_TOKENS = args.pack_small_tokens
+
+    start = time.perf_counter()
+    paper = SyntheticPaper(sections, short_sections=args.short_sections)
+    summary = await controller.generate_summary(paper, paper_id="benchmark", paper_name="benchmark")
+    return time.perf_counter() - start, provider.requests, bool(summary)
+
+
+async def run(args):
+    print(f"{'sections':>8s} " + " ".join(f"{'c=' + str(c):>16s}" for c in args.concurrency))
+    for sections in args.sections:
+        cells = []
+        for concurrency in args.concurrency:
+            elapsed, requests, ok = await summarize(args, sections, concurrency)
+            cells.append(f"{elapsed:8.2f}s {requests:5d}r" if ok else f"{'failed':>16s}")
+        print(f"{sections:8d} " + " ".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sections", type=int, nargs="+", default=[10, 20, 40])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--short-sections", type=int, default=0, help="one-line sections added to each paper")
+    parser.add_argument("--pack-small-tokens", type=int, default=400, help="SUMMARY_PACK_SMALL_TOKENS, 0 to disable packing")
+    parser.add_argument("--latency-ms", type=float, default=400, help="median latency of a summary request")
+    parser.add_argument("--jitter", type=float, default=0.3)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--burst-rate", type=float, default=0.0, help="chance a request starts a burst of 429s")
+    parser.add_argument("--rpm", type=int, default=300, help="requests per minute of the rate limiter")
+    parser.add_argument("--tpm", type=int, default=4000000, help="tokens per minute of the rate limiter")
+    parser.add_argument("--retry-delay", type=float, default=0.2, help="base retry delay in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,4 +2,8 @@ from .paper_controller import PaperController
 from .summary_controller import SummaryController
 from .rag_controller import RAGController
 from .translator_controller import TranslatorController
-from .explain_controller import ExplainController
\ No newline at end of file
+from .explain_controller import ExplainController
+from .ingestion_controller import IngestionController
+from .bulk_upload_controller import BulkUploadController
+from .indexing_controller import IndexingController
+from .review_controller import ReviewController
\ No newline at end of file
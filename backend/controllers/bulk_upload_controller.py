@@ -0,0 +1,170 @@
+from fastapi import UploadFile
+from .base_controller import BaseController
+from .paper_controller import PaperController
+from models import PaperModel
+from models.db_schemas import Paper, Job
+from utils.enums import ResponseSignals, AssetTypeEnums, JobTypeEnums, JobStatusEnums
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import os
+from utils import get_logger
+logger = get_logger(__name__)
+
+class BulkUploadController(BaseController):
+    """
+    Registers many papers of a project in one request, from PDFs and zip/tar archives.
+    - Archives are extracted member by member, never fully loaded in memory
+    - Papers already in the project, by name or by content hash, are skipped before any ingestion
+    - Every accepted paper gets its own ingestion job; the ingestion queue runs them in parallel
+    """
+
+    def __init__(self, db_client, ingestion_queue, project):
+        super().__init__()
+        self.db_client = db_client
+        self.ingestion_queue = ingestion_queue
+        self.project = project
+        self.paper_controller = PaperController()
+        self.paper_model = None
+
+        self.known_names = {}
+        self.known_hashes = {}
+        self.accepted_count = 0
+
+    async def upload(self, files: list[UploadFile]):
+        """Process the uploaded files, a few at a time, and return one result per PDF."""
+        self.paper_model = await PaperModel.get_instance(db_client=self.db_client)
+        for paper in await self.paper_model.get_project_papers(papers_project_id=str(self.project.id)):
+            self.known_names[paper.paper_name] = paper
+            if paper.paper_hash:
+                self.known_hashes[paper.paper_hash] = paper
+
+        semaphore = asyncio.Semaphore(max(1, self.app_settings.BULK_UPLOAD_CONCURRENCY))
+
+        async def process(file: UploadFile):
+            async with semaphore:
+                if self.paper_controller.is_archive(file.filename):
+                    return await self.process_archive(file)
+                return [await self.process_pdf(file)]
+
+        results = await asyncio.gather(*[process(file) for file in files])
+        return [result for file_results in results for result in file_results]
+
+    async def process_pdf(self, file: UploadFile):
+        result = {"file_name": file.filename}
+        isvalid, message = await self.paper_controller.validfile(file=file)
+        if not isvalid:
+            return {**result, "signal": message}
+
+        paper_name = Path(file.filename).stem
+        if self.is_known_name(paper_name):
+            return {**result, **self.existing_paper(self.known_names[paper_name], ResponseSignals.PAPER_EXISTS)}
+
+        tmp_path = self.paper_controller.temp_paper_path(self.project.project_title)
+        try:
+            paper_hash = await self.paper_controller.save_paper_file(file, tmp_path, self.app_settings.CHUNK_SIZE)
+        except Exception as e:
+            logger.error(f"Error saving file {file.filename}: {e}")
+            Path(tmp_path).unlink(missing_ok=True)
+            return {**result, "signal": ResponseSignals.FAILED_SAVING.value}
+
+        return {**result, **await self.register_paper(paper_name, tmp_path, paper_hash)}
+
+    async def process_archive(self, file: UploadFile):
+        if file.size and file.size > self.app_settings.MAX_ARCHIVE_SIZE:
+            return [{"file_name": file.filename, "signal": ResponseSignals.INVALID_FILE_SIZE.value}]
+
+        # The upload is spooled to a temporary file by the multipart parser; members are read from it
+        # on one dedicated thread, which also closes the archive once any pending read is done
+        members = self.paper_controller.iter_archive_pdfs(
+            file.file, file.filename, self.project.project_title, skip_name=self.is_known_name
+        )
+        reader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="archive-reader")
+        loop = asyncio.get_running_loop()
+        results = []
+        try:
+            while True:
+                if self.accepted_count >= self.app_settings.BULK_UPLOAD_MAX_FILES:
+                    results.append({"file_name": file.filename, "signal": ResponseSignals.BULK_UPLOAD_LIMIT_REACHED.value})
+                    break
+                member = await loop.run_in_executor(reader, next, members, None)
+                if member is None:
+                    break
+
+                result = {"file_name": f"{file.filename}/{member['file_name']}"}
+                if member.get("signal") == ResponseSignals.PAPER_EXISTS.value:
+                    results.append({**result, **self.existing_paper(self.known_names[member["paper_name"]],
+                                                                   ResponseSignals.PAPER_EXISTS)})
+                elif "signal" in member:
+                    results.append({**result, "signal": member["signal"]})
+                else:
+                    results.append({**result, **await self.register_paper(
+                        member["paper_name"], member["tmp_path"], member["paper_hash"]
+                    )})
+        except Exception as e:
+            logger.error(f"Error extracting archive {file.filename}: {e}")
+            results.append({"file_name": file.filename, "signal": ResponseSignals.INVALID_ARCHIVE.value})
+        finally:
+            # Not awaited: when the request is cancelled mid-read the generator is still executing,
+            # and closing it from here would raise instead of closing the archive
+            reader.submit(members.close)
+            reader.shutdown(wait=False)
+        return results
+
+    def is_known_name(self, paper_name: str) -> bool:
+        return paper_name in self.known_names
+
+    def existing_paper(self, paper, signal: ResponseSignals):
+        return {"signal": signal.value, "paper_id": str(paper.id) if paper and paper.id else None}
+
+    async def register_paper(self, paper_name: str, tmp_path, paper_hash: str):
+        """Move a validated temporary file into place, create its paper and queue its ingestion."""
+        duplicate = self.known_hashes.get(paper_hash)
+        if duplicate or self.is_known_name(paper_name) or self.accepted_count >= self.app_settings.BULK_UPLOAD_MAX_FILES:
+            Path(tmp_path).unlink(missing_ok=True)
+            if duplicate:
+                return self.existing_paper(duplicate, ResponseSignals.DUPLICATE_PAPER_CONTENT)
+            if self.is_known_name(paper_name):
+                return self.existing_paper(self.known_names[paper_name], ResponseSignals.PAPER_EXISTS)
+            return {"signal": ResponseSignals.BULK_UPLOAD_LIMIT_REACHED.value}
+
+        # Reserve the name and hash before the first await, so concurrent files cannot both claim them
+        paper = Paper(
+            paper_project_id=self.project.id,
+            paper_name=paper_name,
+            paper_type=AssetTypeEnums.PDF.value,
+            paper_size=os.path.getsize(tmp_path),
+            paper_hash=paper_hash
+        )
+        self.known_names[paper_name] = paper
+        self.known_hashes[paper_hash] = paper
+        self.accepted_count += 1
+
+        paper_path = await self.paper_controller.paper_path(self.project.project_title, paper_name)
+        try:
+            os.replace(tmp_path, paper_path)
+            paper = await self.paper_model.create_paper(paper)
+            job = await self.ingestion_queue.submit(
+                Job(
+                    job_type=JobTypeEnums.INGESTION.value,
+                    job_project_id=self.project.id,
+                    job_paper_id=paper.id,
+                    job_status=JobStatusEnums.QUEUED.value,
+                    job_max_attempts=self.app_settings.INGESTION_MAX_ATTEMPTS,
+                    job_payload={"chunk_size": self.app_settings.PAPER_CHUNK_SIZE,
+                                 "chunk_overlap": self.app_settings.PAPER_CHUNK_OVERLAP},
+                )
+            )
+        except Exception as e:
+            logger.error(f"Error registering paper {paper_name}: {e}")
+            Path(tmp_path).unlink(missing_ok=True)
+            if not paper.id:
+                # Nothing references the file yet: release the name and hash for a later upload
+                Path(paper_path).unlink(missing_ok=True)
+                self.known_names.pop(paper_name, None)
+                self.known_hashes.pop(paper_hash, None)
+                self.accepted_count -= 1
+            return {"signal": ResponseSignals.FAILED_UPLOAD.value, "paper_id": str(paper.id) if paper.id else None}
+
+        logger.info(f"Bulk upload accepted paper {paper_name} with job {str(job.id)}")
+        return {"signal": ResponseSignals.UPLOAD_ACCEPTED.value, "paper_id": str(paper.id), "job_id": str(job.id)}
@@ -1,5 +1,6 @@
 from .base_controller import BaseController
 from utils import get_logger
+from utils.enums import ResponseSignals, StreamEventEnums
 logger = get_logger(__name__)
 
 class ExplainController(BaseController):
@@ -8,20 +9,23 @@ class ExplainController(BaseController):
         self.generation_client = generation_client
         self.template_parser = template_parser
 
+    def build_prompt(self, text: str, context: str = None):
+        system_prompt = self.template_parser.get("explainer", "system_prompt")
+
+        if context:
+            document_prompt = self.template_parser.get(
+                "explainer", "document_prompt_with_context", {"text": text, "context": context}
+            )
+        else:
+            document_prompt = self.template_parser.get(
+                "explainer", "document_prompt", {"text": text}
+            )
+        footer_prompt = self.template_parser.get("explainer", "footer_prompt")
+        return system_prompt, "\n\n".join([document_prompt, footer_prompt])
+
     async def explain_text(self, text: str, context: str = None):
         try:
-            system_prompt = self.template_parser.get("explainer", "system_prompt")
-            
-            if context:
-                document_prompt = self.template_parser.get(
-                    "explainer", "document_prompt_with_context", {"text": text, "context": context}
-                )
-            else:
-                document_prompt = self.template_parser.get(
-                    "explainer", "document_prompt", {"text": text}
-                )
-            footer_prompt = self.template_parser.get("explainer", "footer_prompt")
-            user_prompt = "\n\n".join([document_prompt, footer_prompt])
+            system_prompt, user_prompt = self.build_prompt(text, context)
 
             explanation = await self.generation_client.generate_text(
                 user_prompt=user_prompt,
@@ -39,4 +43,26 @@ class ExplainController(BaseController):
         except Exception as e:
             logger.error(f"Error explaining text: {e}")
             raise
-        
\ No newline at end of file
+
+    async def explain_text_stream(self, text: str, context: str = None):
+        """Events of a streamed explanation: the text piece by piece as it is generated, then `done`."""
+        system_prompt, user_prompt = self.build_prompt(text, context)
+        pieces = self.generation_client.stream_text(
+            user_prompt=user_prompt,
+            system_prompt=system_prompt,
+            temperature=0.6
+        )
+        explained = False
+        try:
+            async for piece in pieces:
+                explained = True
+                yield StreamEventEnums.TOKEN.value, piece
+        finally:
+            await pieces.aclose()
+
+        if not explained:
+            logger.error("Failed to stream explanation")
+            yield StreamEventEnums.ERROR.value, {"signal": ResponseSignals.EXPLANATION_ERROR.value}
+            return
+        logger.info(f"Successfully streamed explanation")
+        yield StreamEventEnums.DONE.value, {"signal": ResponseSignals.EXPLANATION_SUCCESS.value}
@@ -0,0 +1,167 @@
+from .base_controller import BaseController
+from models import ProjectModel, ChunkModel
+from models.db_schemas import Chunk
+from AI.LLM.LLMEnums import DocumentTypeEnum
+from utils.enums import IndexingStageEnums, ResponseSignals
+from typing import List
+import asyncio
+from utils import get_logger
+logger = get_logger(__name__)
+
+class IndexingController(BaseController):
+    """
+    Keeps the vector db in sync with the chunks, incrementally.
+    Every indexed chunk records the embedding model and size of its vector, so only chunks
+    that are missing or were embedded with another model are embedded again.
+    """
+
+    # Shared by every controller instance: concurrent jobs of a project check and create its collection in turn
+    collection_locks = {}
+
+    def __init__(self, db_client, vectordb_client, embedding_client):
+        super().__init__()
+        self.db_client = db_client
+        self.vectordb_client = vectordb_client
+        self.embedding_client = embedding_client
+
+    def create_collection_name(self, project_id: str):
+        return f"collection_{project_id}".strip()
+
+    @property
+    def embedding_model(self) -> str:
+        return self.embedding_client.embedding_model_id
+
+    @property
+    def embedding_size(self) -> int:
+        return self.embedding_client.embedding_size
+
+    async def run(self, job, context):
+        project_model = await ProjectModel.get_instance(db_client=self.db_client)
+        project = await project_model.get_project_by_id(project_id=str(job.job_project_id))
+        if not project:
+            raise ValueError(ResponseSignals.PROJECT_NOT_FOUND.value)
+
+        async with context.stage(IndexingStageEnums.EMBED.value, progress_after=1.0):
+            indexed_count = await self.index_stale_chunks(
+                project_id=str(project.id),
+                paper_id=str(job.job_paper_id) if job.job_paper_id else None,
+            )
+        return {"indexed_chunks_count": indexed_count}
+
+    async def ensure_collection(self, project_id: str, do_reset: bool = False):
+        """
+        Create the project collection if needed. A collection of another vector size cannot
+        hold the current embeddings: it is recreated, and every chunk must be indexed again.
+        """
+        chunk_model = await ChunkModel.get_instance(db_client=self.db_client)
+        collection_name = self.create_collection_name(project_id)
+
+        async with self.collection_locks.setdefault(collection_name, asyncio.Lock()):
+            collection_size = await self.vectordb_client.get_collection_embedding_size(collection_name)
+            if collection_size is not None and collection_size != self.embedding_size:
+                logger.warning(f"Collection {collection_name} has vectors of size {collection_size}, "
+                               f"recreating it for size {self.embedding_size}")
+                do_reset = True
+
+            await self.vectordb_client.create_collection(
+                collection_name=collection_name,
+                embedding_size=self.embedding_size,
+                do_reset=do_reset,
+            )
+            if do_reset:
+                await chunk_model.clear_project_index(chunks_project_id=project_id)
+        return collection_name
+
+    async def index_stale_chunks(self, project_id: str, paper_id: str = None, do_reset: bool = False):
+        """Embed and upsert the chunks of a project (or of one of its papers) that are missing or stale."""
+        chunk_model = await ChunkModel.get_instance(db_client=self.db_client)
+        collection_name = await self.ensure_collection(project_id, do_reset=do_reset)
+
+        # A page holds enough chunks to keep every concurrent embedding request busy
+        page_size = self.app_settings.EMBEDDING_BATCH_SIZE * self.app_settings.EMBEDDING_CONCURRENCY
+        indexed_count = 0
+        async for chunks in chunk_model.iter_stale_chunks(
+            chunks_project_id=project_id,
+            embedding_model=self.embedding_model,
+            embedding_size=self.embedding_size,
+            chunks_paper_id=paper_id,
+            batch_size=page_size,
+        ):
+            await self.index_into_vdb(collection_name=collection_name, chunks=chunks)
+            await chunk_model.mark_chunks_indexed(
+                chunk_ids=[c.id for c in chunks],
+                embedding_model=self.embedding_model,
+                embedding_size=self.embedding_size,
+            )
+            indexed_count += len(chunks)
+
+        logger.info(f"Indexed {indexed_count} missing or stale chunks into {collection_name}")
+        return indexed_count
+
+    async def rebuild_from_cache(self, project_id: str):
+        """
+        Recreate the project collection from the embedding cache only, without embedding calls.
+        Returns the number of restored chunks and of chunks without a cached vector; the latter
+        stay unindexed until the next index_stale_chunks.
+        """
+        chunk_model = await ChunkModel.get_instance(db_client=self.db_client)
+        collection_name = await self.ensure_collection(project_id, do_reset=True)
+
+        restored_count, missing_count = 0, 0
+        async for chunks in chunk_model.iter_stale_chunks(
+            chunks_project_id=project_id,
+            embedding_model=self.embedding_model,
+            embedding_size=self.embedding_size,
+            batch_size=self.app_settings.EMBEDDING_BATCH_SIZE * self.app_settings.EMBEDDING_CONCURRENCY,
+        ):
+            vectors = await self.embedding_client.get_cached_embeddings(
+                texts=[c.chunk_text for c in chunks], document_type=DocumentTypeEnum.DOCUMENT.value
+            )
+            cached = [(c, v) for c, v in zip(chunks, vectors) if v]
+            missing_count += len(chunks) - len(cached)
+            if not cached:
+                continue
+
+            await self.vectordb_client.insert_many(
+                collection_name=collection_name,
+                chunk_ids=[str(c.id) for c, _ in cached],
+                paper_ids=[str(c.chunk_paper_id) for c, _ in cached],
+                texts=[c.chunk_text for c, _ in cached],
+                metadatas=[c.chunk_metadata for c, _ in cached],
+                vectors=[v for _, v in cached],
+            )
+            await chunk_model.mark_chunks_indexed(
+                chunk_ids=[c.id for c, _ in cached],
+                embedding_model=self.embedding_model,
+                embedding_size=self.embedding_size,
+            )
+            restored_count += len(cached)
+
+        logger.info(f"Rebuilt {collection_name} from the embedding cache: {restored_count} chunks restored, "
+                    f"{missing_count} without a cached vector")
+        return restored_count, missing_count
+
+    async def index_into_vdb(self, collection_name: str, chunks: List[Chunk]):
+        try:
+            chunk_ids = [str(c.id) for c in chunks]
+            paper_ids = [str(c.chunk_paper_id) for c in chunks]
+            texts = [c.chunk_text for c in chunks]
+            metadatas = [c.chunk_metadata for c in chunks]
+
+            # The provider packs the texts into as few requests as its limits allow
+            vectors = await self.embedding_client.embed_texts(texts=texts, document_type=DocumentTypeEnum.DOCUMENT.value)
+            if not vectors or any(not v for v in vectors):
+                raise ValueError(f"Error embedding the text of chunks of collection {collection_name}")
+
+            await self.vectordb_client.insert_many(
+                collection_name=collection_name,
+                chunk_ids=chunk_ids,
+                paper_ids=paper_ids,
+                texts=texts,
+                metadatas=metadatas,
+                vectors=vectors,
+            )
+
+        except Exception as e:
+            logger.error(f"Error indexing into VDB for collection {collection_name}: {e}")
+            raise
@@ -0,0 +1,329 @@
+from .base_controller import BaseController
+from .paper_controller import PaperController
+from models import ProjectModel, PaperModel, ChunkModel, ArtifactModel
+from models.db_schemas import Chunk, Artifact, Job
+from utils.enums import IngestionStageEnums, JobTypeEnums, JobStatusEnums, ResponseSignals
+from utils.text_utils import MinHasher
+from utils import converter_version
+from bson import ObjectId
+from pathlib import Path
+import aiofiles
+import asyncio
+from utils import get_logger
+logger = get_logger(__name__)
+
+class IngestionController(BaseController):
+    """
+    Runs the convert → clean → chunk → insert pipeline of an ingestion job.
+    - The converter output is cached per (file hash, converter version), so docling runs once per file
+    - Files already seen (same sha256, or a near-duplicate text) reuse the chunks and vectors
+      of the paper they duplicate instead of being chunked and embedded again
+    - New chunks are embedded by a follow-up indexing job of the paper, when an indexing queue is given
+    """
+
+    def __init__(self, db_client, conversion_pool, vectordb_client, indexing_queue=None):
+        super().__init__()
+        self.db_client = db_client
+        self.vectordb_client = vectordb_client
+        self.indexing_queue = indexing_queue
+        self.paper_controller = PaperController(conversion_pool=conversion_pool)
+        self.minhasher = MinHasher(num_hashes=self.app_settings.MINHASH_NUM_HASHES)
+        self.converter_version = converter_version()
+
+    def create_collection_name(self, project_id: str):
+        return f"collection_{project_id}".strip()
+
+    async def run(self, job, context):
+        project_model = await ProjectModel.get_instance(db_client=self.db_client)
+        paper_model = await PaperModel.get_instance(db_client=self.db_client)
+        chunk_model = await ChunkModel.get_instance(db_client=self.db_client)
+        artifact_model = await ArtifactModel.get_instance(db_client=self.db_client)
+
+        project_id, paper_id = str(job.job_project_id), str(job.job_paper_id)
+        project = await project_model.get_project_by_id(project_id=project_id)
+        if not project:
+            raise ValueError(ResponseSignals.PROJECT_NOT_FOUND.value)
+        paper = await paper_model.get_paper_by_id(paper_project_id=project_id, paper_id=paper_id)
+        if not paper:
+            raise ValueError(ResponseSignals.PAPER_NOT_FOUND.value)
+
+        chunk_size = job.job_payload.get("chunk_size", self.app_settings.PAPER_CHUNK_SIZE)
+        chunk_overlap = job.job_payload.get("chunk_overlap", self.app_settings.PAPER_CHUNK_OVERLAP)
+
+        paper_path = await self.paper_controller.paper_path(project.project_title, paper.paper_name)
+        if not paper.paper_hash:
+            paper.paper_hash = await self.paper_controller.hash_file(paper_path)
+
+        # Exact duplicate first, found by hash alone so it is never converted; then a
+        # near-duplicate re-export of the same paper, which needs the parse of this file
+        artifact = None
+        source_paper = await paper_model.get_ingested_paper_by_hash(
+            paper.paper_hash, chunk_size, chunk_overlap, exclude_paper_id=paper_id
+        )
+        if not source_paper:
+            async with context.stage(IngestionStageEnums.CONVERT.value, progress_after=0.6):
+                artifact = await self.get_or_create_artifact(artifact_model, paper.paper_hash, paper_path)
+            source_paper = await self.find_near_duplicate_paper(
+                artifact_model, paper_model, artifact, paper_id, chunk_size, chunk_overlap
+            )
+
+        if source_paper:
+            async with context.stage(IngestionStageEnums.REUSE.value, progress_after=1.0):
+                inserted_count = await self.reuse_paper_chunks(chunk_model, source_paper, project, paper)
+            if inserted_count:
+                await self.save_chunking(paper_model, paper, inserted_count, chunk_size, chunk_overlap)
+                await self.queue_indexing(project, paper)
+                logger.info(f"Ingested paper {paper.paper_name} by reusing {inserted_count} chunks "
+                            f"of paper {str(source_paper.id)}")
+                return {"inserted_chunks_count": inserted_count, "reused_from_paper_id": str(source_paper.id)}
+
+        if artifact is None:
+            async with context.stage(IngestionStageEnums.CONVERT.value, progress_after=0.6):
+                artifact = await self.get_or_create_artifact(artifact_model, paper.paper_hash, paper_path)
+
+        async with context.stage(IngestionStageEnums.CLEAN.value, progress_after=0.65):
+            paper_content = self.paper_controller.cleaner.text_cleaner(await self.load_markdown(artifact))
+
+        # Sections are split and their chunks inserted batch by batch, so the first chunks
+        # are persisted while the rest of the paper is still being split
+        async with context.stage(IngestionStageEnums.CHUNK.value, progress_after=1.0):
+            chunks = self.paper_controller.stream_chunks(
+                project.project_title, paper.paper_name, paper_content, chunk_size, chunk_overlap
+            )
+            inserted_count, replaced_ids = await self.insert_paper_chunks(chunk_model, project, paper, chunks)
+            if not inserted_count:
+                raise ValueError(ResponseSignals.NO_CHUNKS_CREATED.value)
+            await self.delete_chunk_vectors(project, replaced_ids)
+            await self.save_chunking(paper_model, paper, inserted_count, chunk_size, chunk_overlap)
+
+        await self.queue_indexing(project, paper)
+        logger.info(f"Ingested paper {paper.paper_name}: {inserted_count} chunks")
+        return {"inserted_chunks_count": inserted_count}
+
+    async def rechunk_paper(self, project, paper, chunk_size: int, chunk_overlap: int):
+        """
+        Rebuild the chunks of an ingested paper from its cached parse, without running the converter.
+        Returns the number of chunks, or None when no cached parse exists for the paper.
+        """
+        paper_model = await PaperModel.get_instance(db_client=self.db_client)
+        chunk_model = await ChunkModel.get_instance(db_client=self.db_client)
+        artifact_model = await ArtifactModel.get_instance(db_client=self.db_client)
+
+        if not paper.paper_hash:
+            return None
+        # Prefer the parse of the installed converter, but an older one still avoids a conversion
+        artifact = await artifact_model.get_artifact_by_hash(paper.paper_hash, self.converter_version)
+        if not artifact:
+            artifact = await artifact_model.get_artifact_by_hash(paper.paper_hash)
+        if not artifact or not Path(artifact.artifact_markdown_path).exists():
+            return None
+
+        paper_content = self.paper_controller.cleaner.text_cleaner(await self.load_markdown(artifact))
+
+        # The old chunks and their vectors stay until the new chunks are in
+        chunks = self.paper_controller.stream_chunks(
+            project.project_title, paper.paper_name, paper_content, chunk_size, chunk_overlap
+        )
+        inserted_count, replaced_ids = await self.insert_paper_chunks(chunk_model, project, paper, chunks)
+        if not inserted_count:
+            raise ValueError(ResponseSignals.NO_CHUNKS_CREATED.value)
+        await self.delete_chunk_vectors(project, replaced_ids)
+        await self.save_chunking(paper_model, paper, inserted_count, chunk_size, chunk_overlap)
+        await self.queue_indexing(project, paper)
+        logger.info(f"Rechunked paper {paper.paper_name}: {inserted_count} chunks")
+        return inserted_count
+
+    async def insert_paper_chunks(self, chunk_model, project, paper, chunks):
+        """
+        Insert a stream of chunk dicts (see PaperController.stream_chunks) as `Chunk` documents,
+        replacing the previous chunks of the paper.
+        The new chunks are inserted as a fresh generation, and the previous ones are deleted only once
+        at least one new chunk is in: a split that yields nothing or fails midway keeps them, and its
+        own chunks are rolled back. Returns the number of new chunks and the ids of the replaced ones.
+        """
+        generation = ObjectId()
+
+        async def to_documents():
+            index = 0
+            async for chunk in chunks:
+                yield Chunk(
+                    chunk_project_id=project.id,
+                    chunk_paper_id=paper.id,
+                    chunk_section_id=ObjectId(chunk['chunk_section_id']),
+                    chunk_text=chunk['chunk'],
+                    chunk_metadata=chunk['chunk_metadata'],
+                    chunk_index_in_paper=index,
+                    chunk_generation=generation,
+                )
+                index += 1
+
+        try:
+            inserted_count = await chunk_model.insert_chunk_stream(to_documents())
+        except BaseException:
+            await chunk_model.delete_chunk_generation(chunks_paper_id=str(paper.id), chunk_generation=generation)
+            raise
+        if not inserted_count:
+            return 0, []
+        return inserted_count, await self.delete_previous_chunks(chunk_model, paper, generation)
+
+    async def delete_previous_chunks(self, chunk_model, paper, generation: ObjectId):
+        """Delete the chunks of a paper left by other generations than `generation`; returns their ids."""
+        replaced_ids = await chunk_model.get_previous_chunk_ids(chunks_paper_id=str(paper.id), chunk_generation=generation)
+        if replaced_ids:
+            await chunk_model.delete_chunks_by_ids(replaced_ids)
+        return replaced_ids
+
+    async def delete_chunk_vectors(self, project, chunk_ids):
+        """Vectors of replaced chunks no longer match any chunk."""
+        collection_name = self.create_collection_name(str(project.id))
+        if chunk_ids and await self.vectordb_client.is_collection_exist(collection_name):
+            await self.vectordb_client.delete_chunk_embeddings(
+                collection_name=collection_name, chunk_ids=[str(chunk_id) for chunk_id in chunk_ids]
+            )
+
+    async def queue_indexing(self, project, paper):
+        """Embed the chunks of the paper that are not indexed yet, in a follow-up job."""
+        if not self.indexing_queue:
+            return None
+        return await self.indexing_queue.submit(
+            Job(
+                job_type=JobTypeEnums.INDEXING.value,
+                job_project_id=project.id,
+                job_paper_id=paper.id,
+                job_status=JobStatusEnums.QUEUED.value,
+                job_max_attempts=self.app_settings.INDEXING_MAX_ATTEMPTS,
+            )
+        )
+
+    async def save_chunking(self, paper_model, paper, chunks_count: int, chunk_size: int, chunk_overlap: int):
+        paper.paper_chunks_count = chunks_count
+        paper.paper_chunk_size = chunk_size
+        paper.paper_chunk_overlap = chunk_overlap
+        await paper_model.update_paper(paper)
+
+    async def load_markdown(self, artifact):
+        async with aiofiles.open(artifact.artifact_markdown_path, "r", encoding="utf-8") as f:
+            return await f.read()
+
+    async def get_or_create_artifact(self, artifact_model, paper_hash: str, paper_path: str):
+        """Return the cached parse of this content, converting the PDF only if none exists."""
+        artifact = await artifact_model.get_artifact_by_hash(paper_hash, self.converter_version)
+        if artifact and Path(artifact.artifact_markdown_path).exists():
+            logger.info(f"Reusing parsed document for hash {paper_hash}, skipping conversion")
+            return artifact
+
+        md_text = await self.paper_controller.get_pdf_content(paper_path)
+        if not md_text:
+            raise ValueError(f"No content extracted from PDF: {paper_path}")
+
+        markdown_path = self.path_utils.get_artifact_dir(paper_hash, self.converter_version) / "document.md"
+        async with aiofiles.open(markdown_path, "w", encoding="utf-8") as f:
+            await f.write(md_text)
+
+        signature = await asyncio.to_thread(self.minhasher.signature, md_text)
+        return await artifact_model.upsert_artifact(
+            Artifact(
+                artifact_hash=paper_hash,
+                artifact_converter_version=self.converter_version,
+                artifact_markdown_path=str(markdown_path),
+                artifact_minhash=signature,
+            )
+        )
+
+    async def find_near_duplicate_paper(self, artifact_model, paper_model, artifact, paper_id: str,
+                                        chunk_size: int, chunk_overlap: int):
+        if not artifact.artifact_minhash:
+            return None
+
+        candidates = await artifact_model.get_near_duplicate_candidates(
+            signature=artifact.artifact_minhash, exclude_hash=artifact.artifact_hash
+        )
+        scored = sorted(
+            ((self.minhasher.similarity(artifact.artifact_minhash, c.artifact_minhash), c) for c in candidates),
+            key=lambda pair: pair[0], reverse=True
+        )
+        for similarity, candidate in scored:
+            if similarity < self.app_settings.DEDUP_NEAR_DUPLICATE_THRESHOLD:
+                break
+            paper = await paper_model.get_ingested_paper_by_hash(
+                candidate.artifact_hash, chunk_size, chunk_overlap, exclude_paper_id=paper_id
+            )
+            if paper:
+                logger.info(f"Near-duplicate of paper {str(paper.id)} found (similarity {similarity:.2f})")
+                return paper
+        return None
+
+    async def reuse_paper_chunks(self, chunk_model, source_paper, project, paper):
+        """
+        Copy the chunks (and their vectors, when indexed) of an already ingested paper.
+        Like insert_paper_chunks, the copies are a fresh generation that replaces the previous chunks
+        of the paper, and their vectors, only once it is complete; a failed copy is rolled back.
+        """
+        source_chunks = await chunk_model.get_paper_chunks(chunks_paper_id=str(source_paper.id))
+        if not source_chunks:
+            return 0
+
+        generation = ObjectId()
+        section_ids = {}
+        new_chunks = []
+        for chunk in source_chunks:
+            section_id = section_ids.setdefault(chunk.chunk_section_id, ObjectId())
+            new_chunks.append(Chunk(
+                id=ObjectId(),
+                chunk_project_id=project.id,
+                chunk_paper_id=paper.id,
+                chunk_section_id=section_id,
+                chunk_text=chunk.chunk_text,
+                chunk_metadata={**chunk.chunk_metadata, "project_title": project.project_title,
+                                "paper_name": paper.paper_name},
+                chunk_index_in_paper=chunk.chunk_index_in_paper,
+                chunk_generation=generation,
+            ))
+        try:
+            await chunk_model.insert_chunks(new_chunks)
+            copied = await self.copy_paper_vectors(source_paper, source_chunks, project, paper, new_chunks)
+            # Copied vectors keep the embedding model of the source chunks, so they are not embedded again
+            embeddings = {}
+            for old, new in copied:
+                if old.chunk_embedding_model:
+                    embeddings.setdefault((old.chunk_embedding_model, old.chunk_embedding_size), []).append(new.id)
+            for (embedding_model, embedding_size), chunk_ids in embeddings.items():
+                await chunk_model.mark_chunks_indexed(chunk_ids, embedding_model, embedding_size)
+        except BaseException:
+            await chunk_model.delete_chunk_generation(chunks_paper_id=str(paper.id), chunk_generation=generation)
+            await self.delete_chunk_vectors(project, [chunk.id for chunk in new_chunks])
+            raise
+
+        replaced_ids = await self.delete_previous_chunks(chunk_model, paper, generation)
+        await self.delete_chunk_vectors(project, replaced_ids)
+        return len(new_chunks)
+
+    async def copy_paper_vectors(self, source_paper, source_chunks, project, paper, new_chunks):
+        """Copy the vectors of the source chunks to the new chunks; returns the (source, new) pairs copied."""
+        source_vectors = await self.vectordb_client.get_paper_vectors(
+            collection_name=self.create_collection_name(str(source_paper.paper_project_id)),
+            paper_id=str(source_paper.id),
+        )
+        pairs = [(old, new, source_vectors[str(old.id)]) for old, new in zip(source_chunks, new_chunks)
+                 if str(old.id) in source_vectors]
+        if not pairs:
+            return []
+
+        collection_name = self.create_collection_name(str(project.id))
+        embedding_size = len(pairs[0][2])
+        collection_size = await self.vectordb_client.get_collection_embedding_size(collection_name)
+        if collection_size is not None and collection_size != embedding_size:
+            logger.warning(f"Not copying vectors of size {embedding_size} into {collection_name} (size {collection_size})")
+            return []
+
+        await self.vectordb_client.create_collection(collection_name=collection_name, embedding_size=embedding_size)
+        await self.vectordb_client.insert_many(
+            collection_name=collection_name,
+            chunk_ids=[str(new.id) for _, new, _ in pairs],
+            paper_ids=[str(paper.id)] * len(pairs),
+            texts=[new.chunk_text for _, new, _ in pairs],
+            metadatas=[new.chunk_metadata for _, new, _ in pairs],
+            vectors=[vector for _, _, vector in pairs],
+        )
+        logger.info(f"Copied {len(pairs)} vectors from paper {str(source_paper.id)} to paper {str(paper.id)}")
+        return [(old, new) for old, new, _ in pairs]
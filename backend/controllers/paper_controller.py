@@ -6,13 +6,24 @@ from utils.text_utils import Cleaner
 from bson import ObjectId
 from utils.enums import ResponseSignals
 import os
+import io
+import uuid
+import asyncio
+import hashlib
+import tarfile
+import zipfile
+from pathlib import Path, PurePosixPath
+import aiofiles
 from utils import get_logger
 logger = get_logger(__name__)
 
 class PaperController(BaseController):
-    def __init__(self):
+    ARCHIVE_EXTENSIONS = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+
+    def __init__(self, conversion_pool=None):
         super().__init__()
         self.cleaner = Cleaner()
+        self.conversion_pool = conversion_pool
 
     async def validfile(self, file: UploadFile):
         """Validate the uploaded file type and size"""
@@ -27,102 +38,202 @@ class PaperController(BaseController):
         file_path = self.path_utils.get_paper_path(project_title, paper_filename)
         return file_path
 
+    async def save_paper_file(self, file: UploadFile, paper_path: str, chunk_size: int) -> str:
+        """Stream the upload to disk and return the sha256 of its content, computed on the way."""
+        hasher = hashlib.sha256()
+        async with aiofiles.open(paper_path, "wb") as f:
+            while chunk := await file.read(chunk_size):
+                hasher.update(chunk)
+                await f.write(chunk)
+        return hasher.hexdigest()
+
+    async def hash_file(self, file_path: str, chunk_size: int = 1024 * 1024) -> str:
+        def sha256():
+            hasher = hashlib.sha256()
+            with open(file_path, "rb") as f:
+                while chunk := f.read(chunk_size):
+                    hasher.update(chunk)
+            return hasher.hexdigest()
+
+        return await asyncio.to_thread(sha256)
+
+    def is_archive(self, filename: str) -> bool:
+        return (filename or "").lower().endswith(self.ARCHIVE_EXTENSIONS)
+
+    def temp_paper_path(self, project_title: str) -> Path:
+        """Hidden file next to the papers, so it can be moved into place atomically once validated."""
+        return self.path_utils.get_paper_path(project_title, f".upload-{uuid.uuid4().hex}.part")
+
+    def copy_pdf_stream(self, src, dest_path, chunk_size: int) -> str:
+        """
+        Copy a PDF from a binary stream to `dest_path` and return its sha256.
+        Raises ValueError with the response signal when the content is not a PDF or is too large.
+        """
+        hasher = hashlib.sha256()
+        written = 0
+        try:
+            with open(dest_path, "wb") as dst:
+                while chunk := src.read(chunk_size):
+                    if not written and not chunk.startswith(b"%PDF-"):
+                        raise ValueError(ResponseSignals.INVALID_FILE_TYPE.value)
+                    written += len(chunk)
+                    # Archive headers can lie about sizes, so the limit is enforced on the bytes read
+                    if written > self.app_settings.MAX_FILE_SIZE:
+                        raise ValueError(ResponseSignals.INVALID_FILE_SIZE.value)
+                    hasher.update(chunk)
+                    dst.write(chunk)
+            if not written:
+                raise ValueError(ResponseSignals.INVALID_FILE_TYPE.value)
+            return hasher.hexdigest()
+        except BaseException:
+            Path(dest_path).unlink(missing_ok=True)
+            raise
+
+    def iter_archive_pdfs(self, fileobj, archive_name: str, project_title: str, skip_name):
+        """
+        Extract the PDFs of a zip or tar archive one member at a time, streaming each to a temporary file.
+        Yields one dict per PDF member: `paper_name` and either `tmp_path` + `paper_hash`, or a rejection `signal`.
+        `skip_name(paper_name)` is checked before a member is read, so already known papers cost nothing.
+        """
+        if archive_name.lower().endswith(".zip"):
+            with zipfile.ZipFile(fileobj) as archive:
+                for info in archive.infolist():
+                    if not info.is_dir():
+                        yield from self._extract_archive_member(
+                            info.filename, info.file_size, lambda: archive.open(info), project_title, skip_name
+                        )
+        else:
+            # Stream mode reads the tar (optionally compressed) strictly forward, without seeking
+            with tarfile.open(fileobj=fileobj, mode="r|*") as archive:
+                for member in archive:
+                    if member.isfile():
+                        yield from self._extract_archive_member(
+                            member.name, member.size, lambda: archive.extractfile(member), project_title, skip_name
+                        )
+
+    def _extract_archive_member(self, member_name: str, member_size: int, open_member, project_title: str, skip_name):
+        file_name = PurePosixPath(member_name).name
+        if (not file_name.lower().endswith(".pdf") or file_name.startswith(".")
+                or "__MACOSX" in PurePosixPath(member_name).parts):
+            return
+
+        result = {"file_name": file_name, "paper_name": Path(file_name).stem}
+        if skip_name(result["paper_name"]):
+            yield {**result, "signal": ResponseSignals.PAPER_EXISTS.value}
+            return
+        if member_size > self.app_settings.MAX_FILE_SIZE:
+            yield {**result, "signal": ResponseSignals.INVALID_FILE_SIZE.value}
+            return
+
+        tmp_path = self.temp_paper_path(project_title)
+        try:
+            with open_member() as src:
+                paper_hash = self.copy_pdf_stream(src, tmp_path, self.app_settings.CHUNK_SIZE)
+        except ValueError as e:
+            yield {**result, "signal": str(e)}
+            return
+        yield {**result, "tmp_path": tmp_path, "paper_hash": paper_hash}
+
     async def get_pdf_content(self, file_path: str):
         """
         Convert the PDF to markdown text.
         We use docling instead of pymupdf4llm for better handling of complex PDFs including tables.
+        The conversion runs in the warm worker pool when one is given, otherwise in a thread.
+        """
+        if self.conversion_pool:
+            return await self.conversion_pool.convert(file_path)
+
+        def convert():
+            converter = DocumentConverter()
+            return converter.convert(file_path).document.export_to_markdown()
+
+        return await asyncio.to_thread(convert)
+
+    def iter_sections(self, paper_content: str):
+        """Yield the sections of cleaned markdown content one at a time, splitting on markdown headers."""
+        current_section = None
+        buffer = []
+
+        # StringIO walks the lines lazily instead of materializing splitlines()
+        for raw_line in io.StringIO(paper_content):
+            raw_line = raw_line.rstrip("\r\n")
+            # get headers
+            match = self.cleaner.HEADER_PATTERN.match(raw_line)
+
+            if match:
+                title = match.group(2).strip()
+                level = len(match.group(1))
+
+                # skip unwanted sections
+                if self.cleaner.REMOVE_HEADER_PATTERN.match(title):
+                    current_section = None
+                    buffer.clear()
+                    continue
+
+                if current_section:
+                    current_section["content"] = "".join(buffer).strip()
+                    if current_section["content"]:
+                        yield current_section
+                    buffer.clear()
+
+                current_section = {
+                    "section_title": title,
+                    "section_level": level,
+                    "content": ""
+                }
+            else:
+                if current_section:
+                    buffer.append(raw_line + "\n")
+
+        if current_section:
+            current_section["content"] = "".join(buffer).strip()
+            if current_section["content"]:
+                yield current_section
+
+    def split_section(self, splitter, project_title: str, paper_name: str, section: dict):
+        """Chunks of one section, all sharing a fresh section id."""
+        section_id = str(ObjectId())    # Unique ID for the section
+        return [
+            {
+                "chunk": chunk,
+                "chunk_section_id": section_id,
+                "chunk_metadata": {
+                    "project_title": project_title,
+                    "paper_name": paper_name,
+                    "section_title": section["section_title"],
+                    "section_level": section["section_level"],
+                    "chunk_index_in_section": i,
+                },
+            }
+            for i, chunk in enumerate(splitter.split_text(section["content"]), start=1)
+        ]
+
+    def create_splitter(self, chunk_size: int, chunk_overlap: int):
+        return RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            length_function=len
+        )
+
+    async def stream_chunks(self, project_title: str, paper_name: str, paper_content: str, chunk_size: int=500, chunk_overlap: int=75):
         """
-        converter = DocumentConverter()
-        doc = converter.convert(file_path).document
-        md_text = doc.export_to_markdown()
-        return md_text
-
-    async def create_chunks(self, project_title: str, paper_name: str, paper_path: str, chunk_size: int=500, chunk_overlap: int=75):
-        """Generate text chunks from the PDF content.
-        - Extract text from PDF
-        - Clean the text
-        - Split text into sections based on markdown headers
-        - Split sections into chunks
+        Yield the chunks of cleaned markdown content section by section; only one section is held in memory at a time.
+        Each section is split in a worker thread, so the event loop stays free and the
+        chunks of a section can be inserted while the next one is split.
         """
-        try:
-            # Extract text from PDF
-            paper_content = await self.get_pdf_content(paper_path)
-            if not paper_content or len(paper_content) == 0:
-                logger.warning(f"No content extracted from PDF: {paper_name} in project {project_title}")
-                return []
-            
-            # Clean the text
-            paper_content = self.cleaner.text_cleaner(paper_content)
-    
-            # Split content into sections based on markdown headers
-            sections = []
-            current_section = None
-            buffer = []
-
-            for raw_line in paper_content.splitlines():
-                # get headers
-                match = self.cleaner.HEADER_PATTERN.match(raw_line)
-                
-                if match:
-                    title = match.group(2).strip()
-                    level = len(match.group(1))
-
-                    # skip unwanted sections
-                    if self.cleaner.REMOVE_HEADER_PATTERN.match(title):
-                        current_section = None
-                        buffer.clear()
-                        continue
-
-                    if current_section:
-                        current_section["content"] = "".join(buffer).strip()
-                        if current_section["content"]:
-                            sections.append(current_section)
-                        buffer.clear()
-
-                    current_section = {
-                        "section_title": title,
-                        "section_level": level,
-                        "content": ""
-                    }
-                else:
-                    if current_section:
-                        buffer.append(raw_line + "\n")
-            
-            if current_section:
-                current_section["content"] = "".join(buffer).strip()
-                if current_section["content"]:
-                    sections.append(current_section)
-
-            # Now split sections into chunks
-            splitter = RecursiveCharacterTextSplitter(
-                chunk_size=chunk_size,
-                chunk_overlap=chunk_overlap,
-                length_function=len
-            )
-
-            all_docs = []
+        splitter = self.create_splitter(chunk_size, chunk_overlap)
+        sections = self.iter_sections(paper_content)
+
+        def next_section_chunks():
             for section in sections:
-                section_id = str(ObjectId())    # Unique ID for the section
-                chunks = splitter.split_text(section["content"])
-
-                for i, chunk in enumerate(chunks, start=1):
-                    metadata = {
-                        "project_title": project_title,
-                        "paper_name": paper_name,
-                        "section_title": section["section_title"],
-                        "section_level": section["section_level"],
-                        "chunk_index_in_section": i,
-                    }
-                    all_docs.append({
-                        "chunk": chunk,
-                        "chunk_section_id": section_id,
-                        "chunk_metadata": metadata
-                    })
-
-            return all_docs
-        except Exception as e:
-            logger.error(f"Error generating chunks for paper '{paper_name}': {e}")
-            raise
+                chunks = self.split_section(splitter, project_title, paper_name, section)
+                if chunks:
+                    return chunks
+            return None
+
+        while (chunks := await asyncio.to_thread(next_section_chunks)) is not None:
+            for chunk in chunks:
+                yield chunk
 
     async def rename_paper_file(self, project_title: str, old_name: str, new_name: str):
         try:
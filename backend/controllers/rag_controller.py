@@ -1,9 +1,10 @@
 from .base_controller import BaseController
-from models.db_schemas import Project, Chunk
-from AI.LLM.LLMEnums import DocumentTypeEnum
-from typing import List
+from models.db_schemas import Project
+from AI.LLM.LLMEnums import DocumentTypeEnum, PriorityEnum
+from AI.LLM.RateLimiter import priority_scope
+from utils.enums import StreamEventEnums, ResponseSignals
 import json
-import asyncio
+import time
 from utils import get_logger
 logger = get_logger(__name__)
 
@@ -31,37 +32,6 @@ class RAGController(BaseController):
             logger.error(f"Error retrieving collection info for project {str(project.id)}: {e}")
             raise
 
-    async def index_into_vdb(self, collection_name: str, chunks: List[Chunk]):
-        try:
-            chunk_ids = [str(c.id) for c in chunks]
-            paper_ids = [str(c.chunk_paper_id) for c in chunks]
-            texts = [c.chunk_text for c in chunks]
-            metadatas = [c.chunk_metadata for c in chunks]
-            
-            # Limit concurrency for embedding requests to avoid quota issues
-            sem = asyncio.Semaphore(8)
-            async def embed_with_limit(t):
-                async with sem:
-                    return await self.embedding_client.embed_text(text=t, document_type=DocumentTypeEnum.DOCUMENT.value)
-
-            vectors = await asyncio.gather(*[embed_with_limit(t) for t in texts])
-            if not vectors or len(vectors) == 0:
-                logger.error(f"Error embedding the text of chunks of collection {collection_name} ")
-                return
-
-            await self.vectordb_client.insert_many(
-                collection_name=collection_name,
-                chunk_ids=chunk_ids,
-                paper_ids=paper_ids,
-                texts=texts,
-                metadatas=metadatas,
-                vectors=vectors,
-            )
-
-        except Exception as e:
-            logger.error(f"Error indexing into VDB for collection {collection_name}: {e}")
-            raise
-
     async def generate_mutli_queries(self, query: str, num_queries: int = 3):
         try:
             system_prompt = self.template_parser.get("rag", "multi_query_system_prompt")
@@ -98,9 +68,12 @@ class RAGController(BaseController):
                 # Generate multiple queries for RAGFusion
                 queries = await self.generate_mutli_queries(query=query, num_queries=3)
 
+            # All query variations are embedded in a single request; a query always has a user waiting on it
+            with priority_scope(PriorityEnum.INTERACTIVE.value):
+                vectors = await self.embedding_client.embed_texts(texts=queries, document_type=DocumentTypeEnum.QUERY.value)
+
             all_results = []
-            for q in queries:
-                vector = await self.embedding_client.embed_text(text=q, document_type=DocumentTypeEnum.QUERY.value)
+            for q, vector in zip(queries, vectors):
                 if not vector or len(vector) == 0:
                     logger.warning(f"Error embedding query variation: {q}")
                     continue
@@ -137,23 +110,26 @@ class RAGController(BaseController):
             logger.error(f"Error searching VDB for project {str(project.id)}: {e}")
             raise
     
+    def build_answer_prompt(self, retrieved_documents: list):
+        system_prompt = self.template_parser.get("rag", "system_prompt")
+        documents_prompts = "\n".join([
+            self.template_parser.get("rag", "document_prompt", {
+                    "doc_num": idx + 1,
+                    "chunk_text": doc.text,
+                    "chunk_metadata": json.dumps(doc.metadata or {}, ensure_ascii=False)
+            })
+            for idx, doc in enumerate(retrieved_documents)
+        ])
+        footer_prompt = self.template_parser.get("rag", "footer_prompt")
+        return system_prompt, "\n\n".join([documents_prompts, footer_prompt])
+
     async def answer(self, project: Project, query: str, limit: int = 10, RAGFusion: bool = True):
         try:
             # Retrieve related documents
             retrieved_documents = await self.search(project=project, query=query, limit=limit, RAGFusion=RAGFusion)        
             
             # Construct LLM prompt
-            system_prompt = self.template_parser.get("rag", "system_prompt")
-            documents_prompts = "\n".join([
-                self.template_parser.get("rag", "document_prompt", {
-                        "doc_num": idx + 1,
-                        "chunk_text": doc.text,
-                        "chunk_metadata": json.dumps(doc.metadata or {}, ensure_ascii=False)
-                })
-                for idx, doc in enumerate(retrieved_documents)
-            ])
-            footer_prompt = self.template_parser.get("rag", "footer_prompt")
-            full_prompt = "\n\n".join([documents_prompts, footer_prompt])
+            system_prompt, full_prompt = self.build_answer_prompt(retrieved_documents)
 
             # Retrieve the Answer
             answer = await self.generation_client.generate_text(
@@ -170,4 +146,46 @@ class RAGController(BaseController):
         
         except Exception as e:
             logger.error(f"Error generating answer for project with id {str(project.id)}: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    async def answer_stream(self, project: Project, query: str, limit: int = 10, RAGFusion: bool = True):
+        """
+        Events of a streamed answer, as (event, data) pairs: the retrieved documents as soon as the
+        search is done, then the answer text piece by piece, then a summary with the timings.
+        """
+        start = time.perf_counter()
+        retrieved_documents = await self.search(project=project, query=query, limit=limit, RAGFusion=RAGFusion)
+        yield StreamEventEnums.DOCUMENTS.value, [doc.dict() for doc in retrieved_documents]
+        search_time = time.perf_counter() - start
+
+        system_prompt, full_prompt = self.build_answer_prompt(retrieved_documents)
+        first_token_time = None
+        answer_length = 0
+        pieces = self.generation_client.stream_text(
+            user_prompt=full_prompt,
+            system_prompt=system_prompt,
+            temperature=0.5
+        )
+        try:
+            async for piece in pieces:
+                if first_token_time is None:
+                    first_token_time = time.perf_counter() - start
+                answer_length += len(piece)
+                yield StreamEventEnums.TOKEN.value, piece
+        finally:
+            await pieces.aclose()
+
+        total_time = time.perf_counter() - start
+        if not answer_length:
+            logger.error(f"No RAG answer streamed for project {str(project.id)}")
+            yield StreamEventEnums.ERROR.value, {"signal": ResponseSignals.RAG_NO_ANSWER.value}
+            return
+
+        logger.info(f"RAG answer streamed for project {str(project.id)}: search {search_time:.2f}s, "
+                    f"first token {first_token_time:.2f}s, total {total_time:.2f}s")
+        yield StreamEventEnums.DONE.value, {
+            "signal": ResponseSignals.RAG_ANSWER_SUCCESS.value,
+            "search_ms": round(search_time * 1000),
+            "time_to_first_token_ms": round(first_token_time * 1000),
+            "total_ms": round(total_time * 1000),
+        }
@@ -0,0 +1,203 @@
+from .base_controller import BaseController
+from models import ProjectModel, PaperModel, SummaryModel, ReviewNodeModel
+from models.db_schemas import ReviewNode
+from utils.enums import ResponseSignals, ReviewStageEnums
+from pathlib import Path
+import aiofiles
+import asyncio
+import hashlib
+import math
+import os
+from utils import get_logger
+logger = get_logger(__name__)
+
+class ReviewController(BaseController):
+    """
+    Literature review of a project, built from the summaries of its papers instead of their chunks.
+    - Paper summaries are reduced as a tree of at most REVIEW_FANOUT children per node, in paper
+      order, and the nodes of a level are merged in parallel
+    - Group boundaries are anchored on paper ids, not positions (see group_by_anchors): adding,
+      deleting or editing a paper only changes the groups around it, not every later group
+    - Every node is cached by (summary model, prompt version, sha256 of its inputs): when a paper
+      summary changes, or a paper is added or deleted, mostly the nodes on its path to the root are
+      generated again, and an unchanged project costs no request at all
+    """
+
+    def __init__(self, summary_client, template_parser, db_client, request_semaphore: asyncio.Semaphore = None):
+        super().__init__()
+        self.summary_client = summary_client
+        self.template_parser = template_parser
+        self.db_client = db_client
+        # Shared with the summary jobs, so reviews and summaries stay within one concurrency budget
+        self.request_semaphore = request_semaphore
+
+    async def run(self, job, context):
+        project_model = await ProjectModel.get_instance(db_client=self.db_client)
+        project = await project_model.get_project_by_id(project_id=str(job.job_project_id))
+        if not project:
+            raise ValueError(ResponseSignals.PROJECT_NOT_FOUND.value)
+
+        async with context.stage(ReviewStageEnums.LOAD.value, progress_after=0.05):
+            paper_summaries = await self.load_paper_summaries(project)
+        if not paper_summaries:
+            raise ValueError(ResponseSignals.NO_PROJECT_SUMMARIES.value)
+
+        async with context.stage(ReviewStageEnums.REDUCE.value, progress_after=0.95):
+            review, stats = await self.reduce_paper_summaries(paper_summaries, context)
+
+        async with context.stage(ReviewStageEnums.SAVE.value):
+            review_path = self.review_path(project.project_title)
+            async with aiofiles.open(review_path, 'w', encoding='utf-8') as f:
+                await f.write(review)
+
+        logger.info(f"Review of project {project.project_title} written from {len(paper_summaries)} paper summaries: "
+                    f"{stats['nodes_generated']} nodes generated, {stats['nodes_cached']} from the cache")
+        return {"papers_count": len(paper_summaries), **stats}
+
+    def review_path(self, project_title: str) -> Path:
+        return self.path_utils.get_review_path(project_title)
+
+    async def load_paper_summaries(self, project):
+        """(paper id, markdown of its summary under the paper name) of the summarized papers of a project, in paper order."""
+        paper_model = await PaperModel.get_instance(db_client=self.db_client)
+        summary_model = await SummaryModel.get_instance(db_client=self.db_client)
+
+        paper_names = {str(paper.id): paper.paper_name
+                       for paper in await paper_model.get_project_papers(papers_project_id=str(project.id))}
+        summaries = await summary_model.get_project_summaries(summaries_project_id=str(project.id))
+
+        # Papers ids grow with their upload: new papers land at the end of the tree
+        paper_summaries = []
+        for summary in sorted(summaries, key=lambda s: s.summary_paper_id):
+            summary_path = self.path_utils.get_summary_path(project.project_title, f"{summary.summary_name}.md")
+            if not os.path.exists(summary_path):
+                logger.warning(f"Summary file not found at {summary_path}, leaving it out of the review")
+                continue
+            async with aiofiles.open(summary_path, 'r', encoding='utf-8') as f:
+                content = (await f.read()).strip()
+            if content:
+                paper_name = paper_names.get(str(summary.summary_paper_id), summary.summary_name)
+                paper_summaries.append((str(summary.summary_paper_id), f"## {paper_name}\n\n{content}"))
+        return paper_summaries
+
+    @staticmethod
+    def estimate_nodes(leaves_count: int, fanout: int) -> int:
+        """Expected number of nodes of the review tree, whose groups hold about fanout / 2 items."""
+        branching = max(2, fanout // 2)
+        nodes_count = 1
+        while leaves_count > fanout:
+            leaves_count = math.ceil(leaves_count / branching)
+            nodes_count += leaves_count
+        return nodes_count
+
+    @staticmethod
+    def is_anchor(key: str, level: int, fanout: int) -> bool:
+        """Whether a group may end after the item of this key: about one item in fanout / 2 is an anchor."""
+        digest = hashlib.sha256(f"{level}\x1f{key}".encode("utf-8")).digest()
+        return int.from_bytes(digest[:8], "big") % max(2, fanout // 2) == 0
+
+    @classmethod
+    def group_by_anchors(cls, keys: list, level: int, fanout: int):
+        """
+        Group the indexes of consecutive items into groups of 2 to `fanout` items, ending a group after an
+        anchor item, or once it is full. Anchors depend on the item keys only, so inserting or removing an
+        item shifts the groups around it and not the later ones. The last group may hold a single item.
+        """
+        groups, group = [], []
+        for i, key in enumerate(keys):
+            group.append(i)
+            if len(group) >= fanout or (len(group) >= 2 and cls.is_anchor(key, level, fanout)):
+                groups.append(group)
+                group = []
+        if group:
+            groups.append(group)
+        return groups
+
+    def prompt_hash(self, template_key: str, system_prompt: str, footer_prompt: str):
+        template = self.template_parser.get("reviewer", template_key, {"summaries": "$summaries"})
+        return hashlib.sha256("\x1f".join([system_prompt, template, footer_prompt]).encode("utf-8")).hexdigest()
+
+    async def merge_group(self, texts: list, template_key: str, system_prompt: str, footer_prompt: str):
+        prompt = self.template_parser.get("reviewer", template_key, {"summaries": "\n\n".join(texts)})
+        review = await self.summary_client.summarize_text(
+            user_prompt="\n\n".join([prompt, footer_prompt]),
+            system_prompt=system_prompt,
+            temperature=0.2,
+        )
+        if not review:
+            raise ValueError(f"No review generated for a group of {len(texts)} summaries")
+        return review.strip()
+
+    async def reduce_paper_summaries(self, paper_summaries: list, context=None):
+        """
+        The review of the (paper id, summary) pairs, and how many tree nodes were generated or found in the cache.
+        A node is keyed by the paper id of its last child, so the boundaries of every level follow the papers.
+        """
+        model_id = getattr(self.summary_client, "summarization_model_id", None)
+        review_node_model = None
+        if self.db_client and model_id:
+            review_node_model = await ReviewNodeModel.get_instance(db_client=self.db_client)
+
+        system_prompt = self.template_parser.get("reviewer", "system_prompt")
+        footer_prompt = self.template_parser.get("reviewer", "footer_prompt")
+        fanout = max(2, self.app_settings.REVIEW_FANOUT)
+        semaphore = self.request_semaphore or asyncio.Semaphore(max(1, self.app_settings.SUMMARY_MAP_CONCURRENCY))
+        stats = {"nodes_generated": 0, "nodes_cached": 0}
+        # The tree takes its shape level by level: progress is measured against its expected size
+        nodes_estimate = self.estimate_nodes(len(paper_summaries), fanout)
+
+        keys = [key for key, _ in paper_summaries]
+        texts = [text for _, text in paper_summaries]
+        level = 0
+        while True:
+            final = len(texts) <= fanout
+            template_key = "review_prompt" if final else "combine_prompt"
+            groups = [list(range(len(texts)))] if final else self.group_by_anchors(keys, level, fanout)
+            # A group of one has nothing to be merged with: it goes up a level as is
+            merged_groups = [group for group in groups if final or len(group) > 1]
+
+            prompt_hash = self.prompt_hash(template_key, system_prompt, footer_prompt)
+            input_hashes = {
+                tuple(group): hashlib.sha256("\x1f".join(texts[i] for i in group).encode("utf-8")).hexdigest()
+                for group in merged_groups
+            }
+            cached = {}
+            if review_node_model:
+                cached = await review_node_model.get_review_nodes(model_id, prompt_hash, set(input_hashes.values()))
+            logger.info(f"Review level {level}: {len(merged_groups)} nodes over {len(texts)} inputs, "
+                        f"{sum(1 for h in input_hashes.values() if h in cached)} cached")
+
+            async def merge(group):
+                if len(group) == 1 and not final:
+                    return texts[group[0]]
+                input_hash = input_hashes[tuple(group)]
+                if input_hash in cached:
+                    stats["nodes_cached"] += 1
+                    review = cached[input_hash]
+                else:
+                    async with semaphore:
+                        review = await self.merge_group([texts[i] for i in group], template_key,
+                                                        system_prompt, footer_prompt)
+                    stats["nodes_generated"] += 1
+                    if review_node_model:
+                        try:
+                            await review_node_model.save_review_node(ReviewNode(
+                                review_node_model_id=model_id,
+                                review_node_prompt_hash=prompt_hash,
+                                review_node_input_hash=input_hash,
+                                review_node_text=review,
+                            ))
+                        except Exception as e:
+                            logger.warning(f"Could not cache a review node: {e}")
+                if context:
+                    nodes_done = stats["nodes_generated"] + stats["nodes_cached"]
+                    await context.set_progress(0.05 + 0.9 * nodes_done / max(nodes_done, nodes_estimate),
+                                               partial_result=dict(stats))
+                return review
+
+            merged = await asyncio.gather(*[merge(group) for group in groups])
+            if final:
+                return merged[0], stats
+            keys = [keys[group[-1]] for group in groups]
+            texts = list(merged)
+            level += 1
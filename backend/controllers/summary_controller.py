@@ -1,15 +1,96 @@
 from .base_controller import BaseController
+from AI.LLM.LLMUtils import group_by_tokens, pack_small_texts, mark_sections, split_marked_sections
+from models import ProjectModel, PaperModel, ChunkModel, SummaryModel, SectionSummaryModel
+from models.db_schemas import Summary, SectionSummary
+from utils.enums import AssetTypeEnums, ResponseSignals, SummaryStageEnums
 import aiofiles
-import os
 import asyncio
+import hashlib
+import os
 from utils import get_logger
 logger = get_logger(__name__)
 class SummaryController(BaseController):
-    def __init__(self, summary_client, template_parser):
+    def __init__(self, summary_client, template_parser, db_client=None, request_semaphore: asyncio.Semaphore = None):
         super().__init__()
 
         self.summary_client = summary_client
         self.template_parser = template_parser 
+        self.db_client = db_client
+        # Shared by every summary job, so papers summarized together stay within one concurrency budget
+        self.request_semaphore = request_semaphore
+
+    async def run(self, job, context):
+        """
+        Summary job of a paper. Every section summary is cached as soon as it is done (see
+        map_sections), so a retried or restarted job only summarizes the sections still missing.
+        """
+        project_model = await ProjectModel.get_instance(db_client=self.db_client)
+        paper_model = await PaperModel.get_instance(db_client=self.db_client)
+        chunk_model = await ChunkModel.get_instance(db_client=self.db_client)
+        summary_model = await SummaryModel.get_instance(db_client=self.db_client)
+
+        project_id, paper_id = str(job.job_project_id), str(job.job_paper_id)
+        project = await project_model.get_project_by_id(project_id=project_id)
+        if not project:
+            raise ValueError(ResponseSignals.PROJECT_NOT_FOUND.value)
+        paper = await paper_model.get_paper_by_id(paper_project_id=project_id, paper_id=paper_id)
+        if not paper:
+            raise ValueError(ResponseSignals.PAPER_NOT_FOUND.value)
+
+        summary_name = job.job_payload["summary_name"]
+        system_prompt = self.template_parser.get("summarizer", "system_prompt")
+        footer_prompt = self.template_parser.get("summarizer", "footer_prompt")
+
+        sections = await chunk_model.get_chunks_grouped_by_section(paper_id=paper_id)
+        if not sections:
+            raise ValueError(ResponseSignals.NO_PAPER_CHUNKS.value)
+        done = {}
+
+        async def on_summary(section_id, section_summary):
+            done[section_id] = section_summary
+            await self.report_sections(context, len(done), len(sections))
+
+        async with context.stage(SummaryStageEnums.MAP.value, progress_after=0.9):
+            await self.report_sections(context, 0, len(sections))
+            await self.map_sections(sections, system_prompt, footer_prompt, on_summary=on_summary)
+            # Concurrent checkpoints may report out of order: settle on the final count
+            await self.report_sections(context, len(done), len(sections))
+
+        # Failed sections are retried with the job; the last attempt makes do with the others
+        missing_count = len(sections) - len(done)
+        if missing_count and job.job_attempts < job.job_max_attempts:
+            raise ValueError(f"{missing_count} of {len(sections)} sections could not be summarized")
+        if not done:
+            raise ValueError(ResponseSignals.SUMMARY_GENERATION_FAILED.value)
+
+        # A failed reduce is retried with the job, the section summaries coming from the cache;
+        # only the last attempt falls back to the last completed level of the reduce
+        async with context.stage(SummaryStageEnums.REDUCE.value, progress_after=0.98):
+            section_summaries = [done[section_id] for section_id in sections if section_id in done]
+            summary_content = await self.combine_section_summaries(
+                section_summaries, system_prompt, footer_prompt, paper.paper_name,
+                fallback=job.job_attempts >= job.job_max_attempts,
+            )
+
+        async with context.stage(SummaryStageEnums.SAVE.value):
+            summary_path = await self.summary_path(project.project_title, summary_name)
+            await self.save_summary(summary_path, summary_content)
+            summary = await summary_model.get_or_create_summary(
+                Summary(
+                    summary_project_id=project.id,
+                    summary_paper_id=paper.id,
+                    summary_name=summary_name,
+                    summary_type=AssetTypeEnums.MD.value,
+                    summary_size=os.path.getsize(summary_path),
+                )
+            )
+
+        logger.info(f"Summary created successfully for paper: {paper.paper_name}")
+        return {"summary_id": str(summary.id), "sections_done": len(done), "sections_total": len(sections)}
+
+    async def report_sections(self, context, sections_done: int, sections_total: int):
+        await context.set_progress(0.9 * sections_done / max(sections_total, 1),
+                                   partial_result={"sections_done": sections_done, "sections_total": sections_total})
 
     async def generate_summary(self, chunk_model, paper_id: str, paper_name: str):
         try:
@@ -18,85 +99,232 @@ class SummaryController(BaseController):
             system_prompt = self.template_parser.get("summarizer", "system_prompt")
             footer_prompt = self.template_parser.get("summarizer", "footer_prompt")
 
-            # Map Step (summarize each section separately)
-            section_summaries = []
+            # Map Step (summarize each section separately, several at once)
             sections = await chunk_model.get_chunks_grouped_by_section(paper_id=paper_id)
+            logger.info(f"Processing {len(sections)} sections for paper {paper_name}")
 
-            total_sections = len(sections)
-            logger.info(f"Processing {total_sections} sections for paper {paper_name}")
+            section_summaries = await self.map_sections(sections, system_prompt, footer_prompt)
+            logger.info(f"Completed map step for {len(section_summaries)} sections")
 
-            for i, (section_id, section_chunks) in enumerate(sections.items(), 1):
-                try:
-                    section_title = section_chunks[0].chunk_metadata.get("section_title", f"Section {section_id}")
-                    logger.info(f"Processing section {i}/{total_sections}: {section_title}")
+            if not section_summaries:
+                logger.error(f"No section summaries were generated for paper {paper_name}")
+                raise
 
-                    section_text = "\n\n".join([c.chunk_text for c in section_chunks])
-                    section_prompt = self.template_parser.get(
-                        "summarizer", "map_prompt", {"text": section_text}
-                    )
-                    full_prompt = "\n\n".join([section_prompt, footer_prompt])
+            return await self.combine_section_summaries(section_summaries, system_prompt, footer_prompt, paper_name)
 
-                    section_summary = await self.summary_client.summarize_text(
-                        user_prompt=full_prompt,
-                        system_prompt=system_prompt,
-                        temperature=0.2,
-                    )
-                    if section_summary:
-                        section_summaries.append(
-                            f"### {section_title}\n\n{section_summary.strip()}"
-                        )
-                        logger.info(f"Successfully processed section {i}/{total_sections}: {section_title}")
-                    else:
-                        logger.warning(f"No summary generated for section: {section_title}")
-
-                    # Add delay between sections because of rate limits issue
-                    if i < total_sections:
-                        delay = 0.7  # 0.7 second delay
-                        await asyncio.sleep(delay)
+        except Exception as e:
+            logger.error(f"Failed section-based summarization for {paper_name}: {e}")
+            raise
 
-                except Exception as e:
-                    logger.error(f"Failed to process section {section_title}: {str(e)}")
-                    # Continue with other sections
-                    continue
+    async def combine_section_summaries(self, section_summaries: list, system_prompt: str, footer_prompt: str,
+                                        paper_name: str, fallback: bool = True):
+        # Reduce Step (combine the section summaries, level by level for long papers)
+        logger.info("Starting reduce step to combine section summaries")
+        final_summary = await self.reduce_summaries(section_summaries, system_prompt, footer_prompt, fallback=fallback)
+        logger.info(f"Successfully generated hierarchical summary for {paper_name}")
+        return final_summary
 
-            logger.info(f"Completed map step for {len(section_summaries)} sections")
+    @staticmethod
+    def section_title(section_id: str, section_chunks: list):
+        return section_chunks[0].chunk_metadata.get("section_title", f"Section {section_id}")
 
-            if not section_summaries:
-                logger.error(f"No section summaries were generated for paper {paper_name}")
-                raise
+    @staticmethod
+    def section_text(section_chunks: list):
+        return "\n\n".join([c.chunk_text for c in section_chunks])
 
-            # Reduce Step (combine all section summaries)
-            logger.info("Starting reduce step to combine section summaries")
-            combined_sections_text = "\n\n".join(section_summaries)
-            reduce_prompt = self.template_parser.get(
-                "summarizer", "reduce_prompt", {"sections": combined_sections_text}
+    def section_prompt_hash(self, system_prompt: str, footer_prompt: str):
+        """Version of the map prompts: the map templates with their placeholders left in, and the system and footer prompts."""
+        map_template = self.template_parser.get("summarizer", "map_prompt", {"text": "$text"})
+        packed_map_template = self.template_parser.get("summarizer", "packed_map_prompt", {"sections": "$sections"})
+        return hashlib.sha256("\x1f".join([system_prompt, map_template, packed_map_template, footer_prompt]).encode("utf-8")).hexdigest()
+
+    async def summarize_section(self, section_id: str, section_chunks: list, system_prompt: str, footer_prompt: str):
+        """Summary of the text of one section, or None when it could not be summarized."""
+        section_title = self.section_title(section_id, section_chunks)
+        try:
+            section_text = self.section_text(section_chunks)
+            section_prompt = self.template_parser.get(
+                "summarizer", "map_prompt", {"text": section_text}
             )
-            full_prompt = "\n\n".join([reduce_prompt, footer_prompt])
+            full_prompt = "\n\n".join([section_prompt, footer_prompt])
 
-            try:
-                final_summary = await self.summary_client.summarize_text(
-                    user_prompt=full_prompt,
-                    system_prompt=system_prompt,
-                    temperature=0.2,
-                )
-                if not final_summary:
-                    logger.error(f"Failed to generate final summary for {paper_name}")
-                    raise
+            section_summary = await self.summary_client.summarize_text(
+                user_prompt=full_prompt,
+                system_prompt=system_prompt,
+                temperature=0.2,
+            )
+            if not section_summary:
+                logger.warning(f"No summary generated for section: {section_title}")
+                return None
 
-                logger.info(f"Successfully generated hierarchical summary for {paper_name}")
-                return final_summary
-                
-            except Exception as e:
-                logger.error(f"Failed to generate final summary for {paper_name}: {str(e)}")
+            logger.info(f"Successfully processed section: {section_title}")
+            return section_summary.strip()
+
+        except Exception as e:
+            logger.error(f"Failed to process section {section_title}: {str(e)}")
+            # The other sections still make a summary
+            return None
 
-                # If final summary fails, return the combined section summaries as fallback
-                logger.info("Returning combined section summaries as fallback")
-                return combined_sections_text
+    async def summarize_packed_sections(self, sections: dict, system_prompt: str):
+        """
+        Summaries of several short sections from a single request, keyed by section id. The sections
+        are sent under numbered markers and answered under the same markers; sections missing from
+        the answer are left out, for the caller to summarize on their own.
+        """
+        section_ids = list(sections)
+        try:
+            packed_prompt = self.template_parser.get(
+                "summarizer", "packed_map_prompt",
+                {"sections": mark_sections([self.section_text(sections[section_id]) for section_id in section_ids])}
+            )
+            answer = await self.summary_client.summarize_text(
+                user_prompt=packed_prompt,
+                system_prompt=system_prompt,
+                temperature=0.2,
+            )
+            summaries = {
+                section_ids[number - 1]: summary
+                for number, summary in split_marked_sections(answer).items() if 1 <= number <= len(section_ids)
+            }
+            logger.info(f"Packed request summarized {len(summaries)} of {len(section_ids)} short sections")
+            return summaries
 
         except Exception as e:
-            logger.error(f"Failed section-based summarization for {paper_name}: {e}")
-            raise
-                
+            logger.error(f"Failed to summarize a pack of {len(section_ids)} short sections: {str(e)}")
+            return {}
+
+    async def map_sections(self, sections: dict, system_prompt: str, footer_prompt: str, on_summary=None):
+        """
+        Summarize the sections concurrently, at most SUMMARY_MAP_CONCURRENCY requests at once, and
+        return the summaries in section order. The pace is set by the shared rate limiter of the
+        client, which slows down on 429s, not by fixed sleeps.
+        - With a db client, section summaries are cached by (summary model, prompt version, sha256 of
+          the section text): only new or changed sections are sent to the model, and every fresh
+          summary is cached as soon as it is done, which also checkpoints interrupted summary jobs
+        - Adjacent sections of at most SUMMARY_PACK_SMALL_TOKENS (author blocks, captions, short
+          headers) share one request, within SUMMARY_PACK_MAX_TOKENS of section text
+        `on_summary(section_id, summary)` is awaited as soon as each section is summarized or found.
+        """
+        model_id = getattr(self.summary_client, "summarization_model_id", None)
+        section_summary_model = None
+        if self.db_client and model_id:
+            section_summary_model = await SectionSummaryModel.get_instance(db_client=self.db_client)
+
+        prompt_hash = self.section_prompt_hash(system_prompt, footer_prompt)
+        section_texts = {section_id: self.section_text(section_chunks) for section_id, section_chunks in sections.items()}
+        text_hashes = {
+            section_id: hashlib.sha256(section_text.encode("utf-8")).hexdigest()
+            for section_id, section_text in section_texts.items()
+        }
+        cached = {}
+        if section_summary_model:
+            cached = await section_summary_model.get_section_summaries(model_id, prompt_hash, set(text_hashes.values()))
+            logger.info(f"{sum(1 for h in text_hashes.values() if h in cached)} of {len(sections)} "
+                        f"section summaries found in the cache")
+
+        summaries = {}
+
+        async def add_summary(section_id, summary, fresh: bool = True):
+            if fresh and section_summary_model:
+                try:
+                    await section_summary_model.save_section_summary(SectionSummary(
+                        section_summary_model_id=model_id,
+                        section_summary_prompt_hash=prompt_hash,
+                        section_summary_text_hash=text_hashes[section_id],
+                        section_summary_text=summary,
+                    ))
+                except Exception as e:
+                    # The summary is still used, it will only be paid for again next time
+                    logger.warning(f"Could not cache the summary of section {section_id}: {e}")
+
+            summaries[section_id] = f"### {self.section_title(section_id, sections[section_id])}\n\n{summary}"
+            if on_summary:
+                await on_summary(section_id, summaries[section_id])
+
+        for section_id, text_hash in text_hashes.items():
+            if text_hash in cached:
+                await add_summary(section_id, cached[text_hash], fresh=False)
+
+        pending = [section_id for section_id in sections if section_id not in summaries]
+        packs = pack_small_texts([section_texts[section_id] for section_id in pending],
+                                 self.app_settings.SUMMARY_PACK_MAX_TOKENS, self.app_settings.SUMMARY_PACK_SMALL_TOKENS)
+        semaphore = self.request_semaphore or asyncio.Semaphore(max(1, self.app_settings.SUMMARY_MAP_CONCURRENCY))
+
+        async def summarize(section_id):
+            async with semaphore:
+                summary = await self.summarize_section(section_id, sections[section_id], system_prompt, footer_prompt)
+            if summary:
+                await add_summary(section_id, summary)
+
+        async def summarize_pack(pack):
+            section_ids = [pending[i] for i in pack]
+            if len(section_ids) > 1:
+                async with semaphore:
+                    packed = await self.summarize_packed_sections(
+                        {section_id: sections[section_id] for section_id in section_ids}, system_prompt
+                    )
+                for section_id, summary in packed.items():
+                    await add_summary(section_id, summary)
+            # Sections left out of a packed answer, and large sections, get a request of their own
+            await asyncio.gather(*[summarize(section_id) for section_id in section_ids if section_id not in summaries])
+
+        if packs:
+            logger.info(f"Summarizing {len(pending)} sections in {len(packs)} map requests")
+        await asyncio.gather(*[summarize_pack(pack) for pack in packs])
+        return [summaries[section_id] for section_id in sections if section_id in summaries]
+
+    async def reduce_group(self, summaries: list, template_key: str, system_prompt: str, footer_prompt: str):
+        reduce_prompt = self.template_parser.get(
+            "summarizer", template_key, {"sections": "\n\n".join(summaries)}
+        )
+        full_prompt = "\n\n".join([reduce_prompt, footer_prompt])
+
+        summary = await self.summary_client.summarize_text(
+            user_prompt=full_prompt,
+            system_prompt=system_prompt,
+            temperature=0.2,
+        )
+        if not summary:
+            raise ValueError(f"No summary generated for a group of {len(summaries)} summaries")
+        return summary.strip()
+
+    async def reduce_summaries(self, summaries: list, system_prompt: str, footer_prompt: str, fallback: bool = False):
+        """
+        Tree reduce: consecutive summaries are grouped within SUMMARY_REDUCE_MAX_TOKENS, each group is
+        merged in parallel, and the merged summaries are grouped again until a single group is left,
+        which makes the final summary. Every level at least halves the count: O(log n) rounds.
+        A trailing group of one summary is carried to the next level as is, not merged on its own.
+        When a merge fails, the error is raised, or with `fallback` the summaries of the last
+        completed level are returned joined, keeping the merges that already succeeded.
+        """
+        semaphore = self.request_semaphore or asyncio.Semaphore(max(1, self.app_settings.SUMMARY_MAP_CONCURRENCY))
+        level = 0
+        try:
+            while True:
+                groups = group_by_tokens(summaries, self.app_settings.SUMMARY_REDUCE_MAX_TOKENS)
+                if len(groups) == 1:
+                    logger.info(f"Final reduce of {len(summaries)} summaries after {level} intermediate levels")
+                    async with semaphore:
+                        return await self.reduce_group(summaries, "reduce_prompt", system_prompt, footer_prompt)
+
+                level += 1
+                logger.info(f"Reduce level {level}: merging {len(summaries)} summaries in {len(groups)} groups")
+
+                async def combine(group):
+                    if len(group) == 1:
+                        return summaries[group[0]]
+                    async with semaphore:
+                        return await self.reduce_group([summaries[i] for i in group], "combine_prompt",
+                                                       system_prompt, footer_prompt)
+
+                summaries = await asyncio.gather(*[combine(group) for group in groups])
+        except Exception as e:
+            if not fallback:
+                raise
+            logger.error(f"Reduce failed after {level} levels, returning the {len(summaries)} summaries "
+                         f"of the last completed level: {e}")
+            return "\n\n".join(summaries)
+
     async def save_summary(self, summary_path, summary_content):        
         try:
             os.makedirs(os.path.dirname(summary_path), exist_ok=True)
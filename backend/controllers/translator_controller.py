@@ -1,6 +1,6 @@
 from .base_controller import BaseController
 from utils import get_logger
-from utils.enums import ResponseSignals
+from utils.enums import ResponseSignals, StreamEventEnums
 
 logger = get_logger(__name__)
 class TranslatorController(BaseController):
@@ -21,14 +21,17 @@ class TranslatorController(BaseController):
         
         return True, ResponseSignals.VALID_TEXT.value
 
+    def build_prompt(self, text: str, target_language: str):
+        system_prompt = self.template_parser.get("translator", "system_prompt")
+        document_prompt = self.template_parser.get(
+            "translator", "document_prompt", {"text": text, "target_language": target_language}
+        )
+        footer_prompt = self.template_parser.get("translator", "footer_prompt")
+        return system_prompt, "\n\n".join([document_prompt, footer_prompt])
+
     async def translate_text(self, text: str, target_language: str):
         try:
-            system_prompt = self.template_parser.get("translator", "system_prompt")
-            document_prompt = self.template_parser.get(
-                "translator", "document_prompt", {"text": text, "target_language": target_language}
-            )
-            footer_prompt = self.template_parser.get("translator", "footer_prompt")
-            user_prompt = "\n\n".join([document_prompt, footer_prompt])
+            system_prompt, user_prompt = self.build_prompt(text, target_language)
 
             translation = await self.generation_client.generate_text(
                 user_prompt=user_prompt,
@@ -46,6 +49,29 @@ class TranslatorController(BaseController):
             logger.error(f"Error translating text: {e}")
             raise
 
+    async def translate_text_stream(self, text: str, target_language: str):
+        """Events of a streamed translation: the text piece by piece as it is generated, then `done`."""
+        system_prompt, user_prompt = self.build_prompt(text, target_language)
+        pieces = self.generation_client.stream_text(
+            user_prompt=user_prompt,
+            system_prompt=system_prompt,
+            temperature=0.1
+        )
+        translated = False
+        try:
+            async for piece in pieces:
+                translated = True
+                yield StreamEventEnums.TOKEN.value, piece
+        finally:
+            await pieces.aclose()
+
+        if not translated:
+            logger.error("Failed to stream translation")
+            yield StreamEventEnums.ERROR.value, {"signal": ResponseSignals.TRANSLATION_ERROR.value}
+            return
+        logger.info(f"Successfully streamed translation to {target_language}")
+        yield StreamEventEnums.DONE.value, {"signal": ResponseSignals.TRANSLATION_SUCCESS.value}
+
     def map_languages(self, lang_code: str) -> str:
         language_map = {
             "en": "English",
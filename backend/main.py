@@ -1,11 +1,15 @@
-from AI.LLM import LLMProviderFactory, TemplateParser
+import asyncio
+from AI.LLM import LLMProviderFactory, TemplateParser, CachedEmbeddingProvider
 from AI.VectorDB import VDBProviderFactory
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
 
 from routes import welcome, paper, projects, rag, summary, translator, explainer, auth
-from utils import get_settings, get_logger
+from controllers import IngestionController, IndexingController, SummaryController, ReviewController
+from models import JobModel, EmbeddingCacheModel
+from utils import get_settings, get_logger, ConversionPool, JobQueue
+from utils.enums import JobTypeEnums
 logger = get_logger(__name__)
 
 app = FastAPI(
@@ -29,16 +33,25 @@ async def startup_db():
     app.mongodb_client = app.mongodb_conn[settings.MONGO_DB]
 
     llm_provider_factory = LLMProviderFactory(settings)
+    app.llm_provider_factory = llm_provider_factory
+    # /metrics/llm reports the limiter of the generation backend, where the interactive calls wait
+    app.llm_rate_limiter = llm_provider_factory.get_rate_limiter(settings.GENERATION_BACKEND) or llm_provider_factory.rate_limiter
     vdb_provider_factory = VDBProviderFactory(settings) 
 
     # generation client
     app.generation_client = llm_provider_factory.create(provider=settings.GENERATION_BACKEND)
     await app.generation_client.set_generation_model(generation_model_id = settings.GENERATION_MODEL_ID)
 
-    # embedding client
-    app.embedding_client = llm_provider_factory.create(provider=settings.EMBEDDING_BACKEND)
-    await app.embedding_client.set_embedding_model(embedding_model_id=settings.EMBEDDING_MODEL_ID,
+    # embedding client, behind the persistent embedding cache
+    embedding_provider = llm_provider_factory.create(provider=settings.EMBEDDING_BACKEND)
+    await embedding_provider.set_embedding_model(embedding_model_id=settings.EMBEDDING_MODEL_ID,
                                              embedding_size=settings.EMBEDDING_SIZE)
+    app.embedding_client = CachedEmbeddingProvider(
+        provider=embedding_provider,
+        cache_model=await EmbeddingCacheModel.get_instance(db_client=app.mongodb_client),
+        lru_size=settings.EMBEDDING_CACHE_LRU_SIZE,
+        dtype=settings.EMBEDDING_CACHE_DTYPE,
+    )
     
     # summary client
     app.summary_client = llm_provider_factory.create(provider=settings.SUMMARY_BACKEND)
@@ -50,10 +63,94 @@ async def startup_db():
     app.vectordb_client = vdb_provider_factory.create(provider=settings.VECTOR_DB_BACKEND)
     await app.vectordb_client.connect()
 
+    # pdf conversion workers
+    app.conversion_pool = ConversionPool(
+        pool_size=settings.CONVERSION_POOL_SIZE,
+        job_timeout=settings.CONVERSION_TIMEOUT,
+        max_worker_rss_mb=settings.CONVERSION_MAX_WORKER_RSS_MB,
+        parallel_min_pages=settings.CONVERSION_PARALLEL_MIN_PAGES,
+        min_pages_per_range=settings.CONVERSION_MIN_PAGES_PER_RANGE,
+    )
+    await app.conversion_pool.start()
+
+    # background indexing jobs, queued once the chunks of a paper change
+    job_model = await JobModel.get_instance(db_client=app.mongodb_client)
+    indexing_controller = IndexingController(
+        db_client=app.mongodb_client,
+        vectordb_client=app.vectordb_client,
+        embedding_client=app.embedding_client,
+    )
+    app.indexing_queue = JobQueue(
+        job_model=job_model,
+        job_type=JobTypeEnums.INDEXING.value,
+        handler=indexing_controller.run,
+        concurrency=settings.INDEXING_CONCURRENCY,
+        retry_delay=settings.INGESTION_RETRY_DELAY,
+    )
+    await app.indexing_queue.start()
+
+    # background ingestion jobs
+    ingestion_controller = IngestionController(
+        db_client=app.mongodb_client,
+        conversion_pool=app.conversion_pool,
+        vectordb_client=app.vectordb_client,
+        indexing_queue=app.indexing_queue,
+    )
+    app.ingestion_queue = JobQueue(
+        job_model=job_model,
+        job_type=JobTypeEnums.INGESTION.value,
+        handler=ingestion_controller.run,
+        concurrency=settings.INGESTION_CONCURRENCY,
+        retry_delay=settings.INGESTION_RETRY_DELAY,
+    )
+    await app.ingestion_queue.start()
+
+    # background summary jobs, checkpointed section by section; the map and reduce requests of
+    # all the papers being summarized share one concurrency budget, and the rate limiter
+    summary_request_semaphore = asyncio.Semaphore(max(1, settings.SUMMARY_MAP_CONCURRENCY))
+    summary_controller = SummaryController(
+        summary_client=app.summary_client,
+        template_parser=app.template_parser,
+        db_client=app.mongodb_client,
+        request_semaphore=summary_request_semaphore,
+    )
+    app.summary_queue = JobQueue(
+        job_model=job_model,
+        job_type=JobTypeEnums.SUMMARY.value,
+        handler=summary_controller.run,
+        concurrency=settings.SUMMARY_JOB_CONCURRENCY,
+        retry_delay=settings.INGESTION_RETRY_DELAY,
+    )
+    await app.summary_queue.start()
+
+    # background literature reviews of projects, on the same request budget as the summaries
+    review_controller = ReviewController(
+        summary_client=app.summary_client,
+        template_parser=app.template_parser,
+        db_client=app.mongodb_client,
+        request_semaphore=summary_request_semaphore,
+    )
+    app.review_queue = JobQueue(
+        job_model=job_model,
+        job_type=JobTypeEnums.REVIEW.value,
+        handler=review_controller.run,
+        concurrency=1,
+        retry_delay=settings.INGESTION_RETRY_DELAY,
+    )
+    await app.review_queue.start()
+
 @app.on_event("shutdown")
 async def shutdown_db():
+    # Conversions cancelled by the queues below must not start new workers
+    app.conversion_pool.close()
+    await app.review_queue.stop()
+    await app.summary_queue.stop()
+    await app.ingestion_queue.stop()
+    await app.indexing_queue.stop()
     app.mongodb_conn.close()
+    await app.llm_provider_factory.close()
     await app.vectordb_client.disconnect()
+    await app.conversion_pool.shutdown()
 
 
 app.include_router(auth.auth_router, prefix="/auth", tags=["authentication"])
@@ -61,6 +158,7 @@ app.include_router(welcome.welcome_router, prefix="", tags=["welcome"])
 app.include_router(projects.project_router, prefix="/projects", tags=["projects"])
 app.include_router(paper.paper_router, prefix="/projects/{project_id}/papers", tags=["papers"])
 app.include_router(summary.summary_router, prefix="/projects/{project_id}/papers/{paper_id}/summaries", tags=["summaries"])
+app.include_router(summary.project_summary_router, prefix="/projects/{project_id}/summaries", tags=["summaries"])
 app.include_router(rag.rag_router, prefix="/projects/{project_id}", tags=["chat"])
 app.include_router(translator.translator_router, prefix="/translator", tags=["translator"])
 app.include_router(explainer.explainer_router, prefix="/explainer", tags=["explainer"])
@@ -1,4 +1,9 @@
 from .project_model import ProjectModel
 from .paper_model import PaperModel
 from .summary_model import SummaryModel
-from .chunk_model import ChunkModel
\ No newline at end of file
+from .chunk_model import ChunkModel
+from .job_model import JobModel
+from .artifact_model import ArtifactModel
+from .embedding_cache_model import EmbeddingCacheModel
+from .section_summary_model import SectionSummaryModel
+from .review_node_model import ReviewNodeModel
\ No newline at end of file
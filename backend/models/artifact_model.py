@@ -0,0 +1,74 @@
+from .base_model import BaseModel
+from .db_schemas import Artifact
+from utils.enums import DatabaseEnums
+from utils import get_logger
+logger = get_logger(__name__)
+
+class ArtifactModel(BaseModel):
+    def __init__(self, db_client):
+        super().__init__(db_client=db_client)
+        self.collection = self.db_client[DatabaseEnums.ARTIFACT_COLLECTION_NAME.value]
+
+    @classmethod
+    async def get_instance(cls, db_client: object):
+        instance = cls(db_client=db_client)
+        await instance.ensure_indexes()
+        logger.info("ArtifactModel instance created and indexes ensured.")
+        return instance
+
+    async def ensure_indexes(self):
+        await self.create_indexes(self.collection, Artifact.get_indexes())
+
+    async def get_artifact_by_hash(self, artifact_hash: str, converter_version: str = None):
+        """Get the parse of a file made by the given converter version, or the latest one if no version is given"""
+        try:
+            query = {"artifact_hash": artifact_hash}
+            if converter_version:
+                query["artifact_converter_version"] = converter_version
+            record = await self.collection.find_one(query, sort=[("artifact_created_at", -1)])
+            if not record:
+                return None
+            return Artifact(**record)
+        except Exception as e:
+            logger.error(f"Error retrieving artifact {artifact_hash}: {e}")
+            raise
+
+    async def upsert_artifact(self, artifact: Artifact) -> Artifact:
+        try:
+            record = artifact.dict(by_alias=True, exclude={"id"}, exclude_none=True)
+            await self.collection.update_one(
+                {"artifact_hash": artifact.artifact_hash,
+                 "artifact_converter_version": artifact.artifact_converter_version},
+                {"$set": record},
+                upsert=True
+            )
+            logger.info(f"Artifact registered for hash {artifact.artifact_hash} ({artifact.artifact_converter_version})")
+            return await self.get_artifact_by_hash(artifact.artifact_hash, artifact.artifact_converter_version)
+        except Exception as e:
+            logger.error(f"Error registering artifact {artifact.artifact_hash}: {e}")
+            raise
+
+    async def get_near_duplicate_candidates(self, signature: list, exclude_hash: str,
+                                            probe_size: int = 16, limit: int = 20):
+        """
+        Artifacts sharing at least one of the smallest `probe_size` signature values.
+        Near-duplicate texts share most of their smallest hashes, so this multikey lookup
+        narrows the search before the similarity is estimated.
+        """
+        try:
+            records = await self.collection.find({
+                "artifact_minhash": {"$in": signature[:probe_size]},
+                "artifact_hash": {"$ne": exclude_hash}
+            }).limit(limit).to_list(length=None)
+            return [Artifact(**record) for record in records]
+        except Exception as e:
+            logger.error(f"Error searching near-duplicate artifacts: {e}")
+            raise
+
+    async def delete_all_artifacts(self):
+        try:
+            result = await self.collection.delete_many({})
+            logger.info(f"All artifacts deleted successfully. Count: {result.deleted_count}")
+        except Exception as e:
+            logger.error(f"Error deleting all artifacts: {e}")
+            raise
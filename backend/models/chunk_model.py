@@ -1,7 +1,8 @@
 from .base_model import BaseModel
 from .db_schemas import Chunk
 from bson import ObjectId
-from typing import List
+from datetime import datetime
+from typing import List, AsyncIterable
 from utils.enums import DatabaseEnums
 from utils import get_logger
 logger = get_logger(__name__)
@@ -57,6 +58,37 @@ class ChunkModel(BaseModel):
             logger.error(f"Error inserting chunks: {e}")
             raise
     
+    async def insert_chunk_stream(self, chunks: AsyncIterable[Chunk], batch_size: int=100):
+        """
+        Insert chunks from an async iterable as they arrive, one batch at a time.
+        Returns the number of inserted chunks.
+        """
+        try:
+            inserted_count = 0
+            batch = []
+
+            async def flush():
+                await self.collection.insert_many(
+                    [chunk.dict(by_alias=True, exclude_unset=True) for chunk in batch]
+                )
+                logger.info(f"Inserted batch of {len(batch)} chunks.")
+
+            async for chunk in chunks:
+                batch.append(chunk)
+                if len(batch) >= batch_size:
+                    await flush()
+                    inserted_count += len(batch)
+                    batch = []
+            if batch:
+                await flush()
+                inserted_count += len(batch)
+
+            logger.info(f"Total inserted chunks: {inserted_count}")
+            return inserted_count
+        except Exception as e:
+            logger.error(f"Error inserting chunk stream: {e}")
+            raise
+
     async def get_project_chunks(self, chunks_project_id: str, page_no: int=1, page_size: int=50):
         try:
             records = await self.collection.find({
@@ -77,7 +109,7 @@ class ChunkModel(BaseModel):
         try:
             records = await self.collection.find({
                     "chunk_paper_id": ObjectId(chunks_paper_id)
-                }).to_list(length=None)
+                }).sort("chunk_index_in_paper", 1).to_list(length=None)
             if not records or len(records) == 0:
                 logger.info(f"No chunks found for paper {chunks_paper_id}")
                 return []
@@ -87,6 +119,57 @@ class ChunkModel(BaseModel):
             logger.error(f"Error fetching chunks for paper {chunks_paper_id}: {e}")
             raise
 
+    async def iter_stale_chunks(self, chunks_project_id: str, embedding_model: str, embedding_size: int,
+                                chunks_paper_id: str = None, batch_size: int = 100):
+        """
+        Yield batches of chunks that are not indexed, or were indexed with another embedding model or size.
+        Paginates on _id rather than skip, so chunks marked as indexed meanwhile do not shift the pages.
+        """
+        query = {
+            "chunk_project_id": ObjectId(chunks_project_id),
+            "$or": [{"chunk_embedding_model": {"$ne": embedding_model}},
+                    {"chunk_embedding_size": {"$ne": embedding_size}}]
+        }
+        if chunks_paper_id:
+            query["chunk_paper_id"] = ObjectId(chunks_paper_id)
+
+        last_id = None
+        while True:
+            try:
+                page_query = {**query, "_id": {"$gt": last_id}} if last_id else query
+                records = await self.collection.find(page_query).sort("_id", 1).limit(batch_size).to_list(length=None)
+            except Exception as e:
+                logger.error(f"Error fetching stale chunks for project {chunks_project_id}: {e}")
+                raise
+            if not records:
+                return
+            last_id = records[-1]["_id"]
+            yield [Chunk(**record) for record in records]
+
+    async def mark_chunks_indexed(self, chunk_ids: List[ObjectId], embedding_model: str, embedding_size: int):
+        try:
+            await self.collection.update_many(
+                {"_id": {"$in": chunk_ids}},
+                {"$set": {"chunk_embedding_model": embedding_model,
+                          "chunk_embedding_size": embedding_size,
+                          "chunk_indexed_at": datetime.utcnow()}}
+            )
+        except Exception as e:
+            logger.error(f"Error marking {len(chunk_ids)} chunks as indexed: {e}")
+            raise
+
+    async def clear_project_index(self, chunks_project_id: str):
+        """Forget which chunks are indexed, after the project vectors were dropped."""
+        try:
+            result = await self.collection.update_many(
+                {"chunk_project_id": ObjectId(chunks_project_id)},
+                {"$unset": {"chunk_embedding_model": "", "chunk_embedding_size": "", "chunk_indexed_at": ""}}
+            )
+            logger.info(f"Cleared index marks of {result.modified_count} chunks for project {chunks_project_id}")
+        except Exception as e:
+            logger.error(f"Error clearing index marks for project {chunks_project_id}: {e}")
+            raise
+
     async def get_chunks_grouped_by_section(self, paper_id: str):
 
         try:
@@ -141,6 +224,39 @@ class ChunkModel(BaseModel):
             logger.error(f"Error deleting chunks for paper {chunks_paper_id} in project {chunks_project_id}")
             raise
 
+    async def get_previous_chunk_ids(self, chunks_paper_id: str, chunk_generation: ObjectId):
+        """Ids of the chunks of a paper left by chunking runs other than `chunk_generation`."""
+        try:
+            records = await self.collection.find(
+                {"chunk_paper_id": ObjectId(chunks_paper_id), "chunk_generation": {"$ne": chunk_generation}},
+                {"_id": 1}
+            ).to_list(length=None)
+            return [record["_id"] for record in records]
+        except Exception as e:
+            logger.error(f"Error fetching previous chunks of paper {chunks_paper_id}: {e}")
+            raise
+
+    async def delete_chunks_by_ids(self, chunk_ids: List[ObjectId]):
+        try:
+            result = await self.collection.delete_many({"_id": {"$in": chunk_ids}})
+            logger.info(f"Deleted {result.deleted_count} chunks by id")
+        except Exception as e:
+            logger.error(f"Error deleting {len(chunk_ids)} chunks by id: {e}")
+            raise
+
+    async def delete_chunk_generation(self, chunks_paper_id: str, chunk_generation: ObjectId):
+        """Roll back the chunks of a paper inserted by the chunking run `chunk_generation`."""
+        try:
+            result = await self.collection.delete_many({
+                "chunk_paper_id": ObjectId(chunks_paper_id),
+                "chunk_generation": chunk_generation
+            })
+            logger.info(f"Deleted {result.deleted_count} chunks of generation {str(chunk_generation)} "
+                        f"for paper {chunks_paper_id}")
+        except Exception as e:
+            logger.error(f"Error deleting chunks of generation {str(chunk_generation)} for paper {chunks_paper_id}: {e}")
+            raise
+
     async def delete_all_chunks(self):
         try:
             result = await self.collection.delete_many({})
@@ -2,4 +2,9 @@ from .project import Project
 from .paper import Paper
 from .summary import Summary
 from .chunk import Chunk, RetrievedChunks
-from .user import User
\ No newline at end of file
+from .user import User
+from .job import Job
+from .artifact import Artifact
+from .embedding import Embedding
+from .section_summary import SectionSummary
+from .review_node import ReviewNode
\ No newline at end of file
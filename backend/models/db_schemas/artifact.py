@@ -0,0 +1,31 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from bson.objectid import ObjectId
+from datetime import datetime
+
+class Artifact(BaseModel):
+    """Parsed output of a PDF, shared by every paper with the same content hash."""
+    id: Optional[ObjectId] = Field(None, alias="_id")
+    artifact_hash: str = Field(..., min_length=64, max_length=64)     # sha256 of the PDF bytes
+    artifact_converter_version: str = Field(..., min_length=1)        # converter that produced the markdown
+    artifact_markdown_path: str = Field(..., min_length=1)
+    artifact_minhash: List[int] = Field(default_factory=list)        # bottom-k signature of the text
+    artifact_created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    @classmethod
+    def get_indexes(cls):
+        return [
+            {
+                "key": [("artifact_hash", 1), ("artifact_converter_version", 1)],
+                "name": "artifact_hash_converter_version_index_1_1",
+                "unique": True
+            },
+            {
+                "key": [("artifact_minhash", 1)],
+                "name": "artifact_minhash_index_1",
+                "unique": False
+            }
+        ]
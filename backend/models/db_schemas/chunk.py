@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 from bson.objectid import ObjectId
+from datetime import datetime
 
 class Chunk(BaseModel):
     id: Optional[ObjectId] = Field(None, alias="_id")
@@ -10,7 +11,13 @@ class Chunk(BaseModel):
     chunk_text: str = Field(..., min_length=1)
     chunk_metadata: dict
     chunk_index_in_paper: int = Field(..., ge=0)
-    
+    # Chunks inserted together by one chunking run, so a run replaces the previous one only once it succeeded
+    chunk_generation: Optional[ObjectId] = None
+    # Set once the chunk vector is in the vector db, to find chunks missing or embedded with another model
+    chunk_embedding_model: Optional[str] = None
+    chunk_embedding_size: Optional[int] = None
+    chunk_indexed_at: Optional[datetime] = None
+
     class Config:
         arbitrary_types_allowed = True
 
@@ -47,6 +54,11 @@ class Chunk(BaseModel):
                 "key": [("chunk_project_id", 1), ("chunk_paper_id", 1), ("chunk_section_id", 1)],
                 "name": "chunk_project_paper_section_index_1_1_1",
                 "unique": False
+            },
+            {
+                "key": [("chunk_project_id", 1), ("chunk_embedding_model", 1), ("chunk_embedding_size", 1)],
+                "name": "chunk_project_embedding_index_1_1_1",
+                "unique": False
             }
         ]
     
@@ -0,0 +1,29 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from bson.objectid import ObjectId
+from datetime import datetime
+
+class Embedding(BaseModel):
+    """Cached vector of a text, for one embedding model, size and task type."""
+    id: Optional[ObjectId] = Field(None, alias="_id")
+    embedding_model_id: str = Field(..., min_length=1)
+    embedding_size: int = Field(..., gt=0)
+    embedding_task: str = Field(..., min_length=1)                         # document or query
+    embedding_text_hash: str = Field(..., min_length=64, max_length=64)    # sha256 of the text
+    embedding_dtype: str = Field(..., min_length=1)                        # float32 or float16
+    embedding_vector: bytes                                                # little-endian packed values
+    embedding_created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    @classmethod
+    def get_indexes(cls):
+        return [
+            {
+                "key": [("embedding_model_id", 1), ("embedding_size", 1),
+                        ("embedding_task", 1), ("embedding_text_hash", 1)],
+                "name": "embedding_model_size_task_text_hash_index_1_1_1_1",
+                "unique": True
+            }
+        ]
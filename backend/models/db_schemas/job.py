@@ -0,0 +1,41 @@
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any
+from bson.objectid import ObjectId
+from datetime import datetime
+
+class Job(BaseModel):
+    id: Optional[ObjectId] = Field(None, alias="_id")
+    job_type: str = Field(..., min_length=1)
+    job_project_id: ObjectId
+    job_paper_id: Optional[ObjectId] = None
+    job_status: str = Field(..., min_length=1)
+    job_stage: Optional[str] = None
+    job_progress: float = Field(0.0, ge=0, le=1)
+    job_attempts: int = Field(0, ge=0)
+    job_max_attempts: int = Field(1, ge=1)
+    job_error: Optional[str] = None
+    job_payload: Dict[str, Any] = Field(default_factory=dict)
+    job_result: Dict[str, Any] = Field(default_factory=dict)
+    job_timings: Dict[str, float] = Field(default_factory=dict)   # seconds spent per stage
+    job_created_at: datetime = Field(default_factory=datetime.utcnow)
+    job_updated_at: datetime = Field(default_factory=datetime.utcnow)
+    job_started_at: Optional[datetime] = None
+    job_finished_at: Optional[datetime] = None
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    @classmethod
+    def get_indexes(cls):
+        return [
+            {
+                "key": [("job_status", 1), ("job_type", 1)],
+                "name": "job_status_type_index_1_1",
+                "unique": False
+            },
+            {
+                "key": [("job_project_id", 1), ("job_paper_id", 1)],
+                "name": "job_project_paper_index_1_1",
+                "unique": False
+            }
+        ]
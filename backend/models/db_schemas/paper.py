@@ -9,6 +9,10 @@ class Paper(BaseModel):
     paper_name: str = Field(..., min_length=1)
     paper_type: str = Field(..., min_length=1)
     paper_size: int = Field(ge=0, default=None)
+    paper_hash: Optional[str] = None     # sha256 of the PDF bytes
+    paper_chunks_count: Optional[int] = Field(ge=0, default=None)
+    paper_chunk_size: Optional[int] = Field(gt=0, default=None)
+    paper_chunk_overlap: Optional[int] = Field(ge=0, default=None)
     paper_created_at: datetime = Field(default_factory=datetime.utcnow)
     
     class Config:
@@ -27,6 +31,10 @@ class Paper(BaseModel):
                 "key": [("paper_name", 1), ("paper_project_id", 1)],
                 "name": "paper_project_id_name_index_1",
                 "unique": True
+            },
+            {
+                "key": [("paper_hash", 1)],
+                "name": "paper_hash_index_1",
+                "unique": False
             }
-            
         ]
\ No newline at end of file
@@ -0,0 +1,27 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from bson.objectid import ObjectId
+from datetime import datetime
+
+class ReviewNode(BaseModel):
+    """Cached node of a project review: a group of paper summaries or partial reviews merged into one text."""
+    id: Optional[ObjectId] = Field(None, alias="_id")
+    review_node_model_id: str = Field(..., min_length=1)
+    review_node_prompt_hash: str = Field(..., min_length=64, max_length=64)   # sha256 of the prompt templates
+    review_node_input_hash: str = Field(..., min_length=64, max_length=64)    # sha256 of the merged texts
+    review_node_text: str = Field(..., min_length=1)
+    review_node_created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    @classmethod
+    def get_indexes(cls):
+        return [
+            {
+                "key": [("review_node_model_id", 1), ("review_node_prompt_hash", 1),
+                        ("review_node_input_hash", 1)],
+                "name": "review_node_model_prompt_hash_input_hash_index_1_1_1",
+                "unique": True
+            }
+        ]
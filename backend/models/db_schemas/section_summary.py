@@ -0,0 +1,27 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from bson.objectid import ObjectId
+from datetime import datetime
+
+class SectionSummary(BaseModel):
+    """Cached summary of a section text, for one summary model and version of the summary prompts."""
+    id: Optional[ObjectId] = Field(None, alias="_id")
+    section_summary_model_id: str = Field(..., min_length=1)
+    section_summary_prompt_hash: str = Field(..., min_length=64, max_length=64)   # sha256 of the prompt templates
+    section_summary_text_hash: str = Field(..., min_length=64, max_length=64)     # sha256 of the summarized text
+    section_summary_text: str = Field(..., min_length=1)
+    section_summary_created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    @classmethod
+    def get_indexes(cls):
+        return [
+            {
+                "key": [("section_summary_model_id", 1), ("section_summary_prompt_hash", 1),
+                        ("section_summary_text_hash", 1)],
+                "name": "section_summary_model_prompt_hash_text_hash_index_1_1_1",
+                "unique": True
+            }
+        ]
@@ -0,0 +1,65 @@
+from .base_model import BaseModel
+from .db_schemas import Embedding
+from pymongo import UpdateOne
+from typing import List
+from utils.enums import DatabaseEnums
+from utils import get_logger
+logger = get_logger(__name__)
+
+class EmbeddingCacheModel(BaseModel):
+    def __init__(self, db_client):
+        super().__init__(db_client=db_client)
+        self.collection = self.db_client[DatabaseEnums.EMBEDDING_COLLECTION_NAME.value]
+
+    @classmethod
+    async def get_instance(cls, db_client: object):
+        instance = cls(db_client=db_client)
+        await instance.ensure_indexes()
+        logger.info("EmbeddingCacheModel instance created and indexes ensured.")
+        return instance
+
+    async def ensure_indexes(self):
+        await self.create_indexes(self.collection, Embedding.get_indexes())
+
+    async def get_embeddings(self, embedding_model_id: str, embedding_size: int, embedding_task: str,
+                             text_hashes: List[str]):
+        """Cached embeddings of the given text hashes, keyed by text hash."""
+        try:
+            records = await self.collection.find({
+                "embedding_model_id": embedding_model_id,
+                "embedding_size": embedding_size,
+                "embedding_task": embedding_task,
+                "embedding_text_hash": {"$in": list(text_hashes)}
+            }).to_list(length=None)
+            return {record["embedding_text_hash"]: Embedding(**record) for record in records}
+        except Exception as e:
+            logger.error(f"Error retrieving {len(text_hashes)} cached embeddings: {e}")
+            raise
+
+    async def insert_embeddings(self, embeddings: List[Embedding]):
+        """Store embeddings; a text already cached for the same model, size and task is left as is."""
+        if not embeddings:
+            return
+        try:
+            await self.collection.bulk_write([
+                UpdateOne(
+                    {"embedding_model_id": e.embedding_model_id,
+                     "embedding_size": e.embedding_size,
+                     "embedding_task": e.embedding_task,
+                     "embedding_text_hash": e.embedding_text_hash},
+                    {"$setOnInsert": e.dict(by_alias=True, exclude={"id"})},
+                    upsert=True
+                ) for e in embeddings
+            ], ordered=False)
+            logger.info(f"Cached {len(embeddings)} embeddings.")
+        except Exception as e:
+            logger.error(f"Error caching {len(embeddings)} embeddings: {e}")
+            raise
+
+    async def delete_all_embeddings(self):
+        try:
+            result = await self.collection.delete_many({})
+            logger.info(f"All cached embeddings deleted successfully. Count: {result.deleted_count}")
+        except Exception as e:
+            logger.error(f"Error deleting all cached embeddings: {e}")
+            raise
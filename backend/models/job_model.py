@@ -0,0 +1,157 @@
+from .base_model import BaseModel
+from .db_schemas import Job
+from bson import ObjectId
+from datetime import datetime
+from pymongo import ReturnDocument
+from utils.enums import DatabaseEnums, JobStatusEnums
+from utils import get_logger
+logger = get_logger(__name__)
+
+class JobModel(BaseModel):
+    def __init__(self, db_client):
+        super().__init__(db_client=db_client)
+        self.collection = self.db_client[DatabaseEnums.JOB_COLLECTION_NAME.value]
+
+    @classmethod
+    async def get_instance(cls, db_client: object):
+        instance = cls(db_client=db_client)
+        await instance.ensure_indexes()
+        logger.info("JobModel instance created and indexes ensured.")
+        return instance
+
+    async def ensure_indexes(self):
+        await self.create_indexes(self.collection, Job.get_indexes())
+
+    async def create_job(self, job: Job) -> Job:
+        try:
+            res = await self.collection.insert_one(job.dict(by_alias=True, exclude_none=True))
+            job.id = res.inserted_id
+            logger.info(f"Job created with ID: {str(job.id)} and type: {job.job_type}")
+            return job
+        except Exception as e:
+            logger.error(f"Error creating {job.job_type} job: {e}")
+            raise
+
+    async def get_job_by_id(self, job_id: str, job_project_id: str = None):
+        try:
+            query = {"_id": ObjectId(job_id)}
+            if job_project_id:
+                query["job_project_id"] = ObjectId(job_project_id)
+
+            record = await self.collection.find_one(query)
+            if not record:
+                logger.warning(f"Job not found with ID: {job_id}")
+                return None
+            return Job(**record)
+        except Exception as e:
+            logger.error(f"Error retrieving job by ID '{job_id}': {e}")
+            raise
+
+    async def get_unfinished_jobs(self, job_type: str, job_project_id: str = None):
+        """Queued and running jobs of a type, oldest first; only those of one project when given."""
+        try:
+            query = {
+                "job_type": job_type,
+                "job_status": {"$in": [JobStatusEnums.QUEUED.value, JobStatusEnums.RUNNING.value]}
+            }
+            if job_project_id:
+                query["job_project_id"] = ObjectId(job_project_id)
+            records = await self.collection.find(query).sort("job_created_at", 1).to_list(length=None)
+            return [Job(**record) for record in records]
+        except Exception as e:
+            logger.error(f"Error fetching unfinished {job_type} jobs: {e}")
+            raise
+
+    async def get_unfinished_paper_job(self, job_type: str, job_project_id: str, job_paper_id: str):
+        try:
+            record = await self.collection.find_one({
+                "job_type": job_type,
+                "job_project_id": ObjectId(job_project_id),
+                "job_paper_id": ObjectId(job_paper_id),
+                "job_status": {"$in": [JobStatusEnums.QUEUED.value, JobStatusEnums.RUNNING.value]}
+            })
+            return Job(**record) if record else None
+        except Exception as e:
+            logger.error(f"Error fetching unfinished {job_type} job of paper {job_paper_id}: {e}")
+            raise
+
+    async def get_project_jobs(self, job_project_id: str, job_type: str, batch_id: str = None):
+        """Jobs of a type in a project, oldest first; only those queued together under `batch_id` when given."""
+        try:
+            query = {"job_project_id": ObjectId(job_project_id), "job_type": job_type}
+            if batch_id:
+                query["job_payload.batch_id"] = batch_id
+            records = await self.collection.find(query).sort("job_created_at", 1).to_list(length=None)
+            return [Job(**record) for record in records]
+        except Exception as e:
+            logger.error(f"Error fetching {job_type} jobs of project {job_project_id}: {e}")
+            raise
+
+    async def claim_job(self, job_id: ObjectId):
+        """
+        Atomically move a queued job to running, so a job is never executed twice,
+        nor more than its `job_max_attempts` times.
+        """
+        try:
+            now = datetime.utcnow()
+            record = await self.collection.find_one_and_update(
+                {"_id": job_id, "job_status": JobStatusEnums.QUEUED.value,
+                 "$expr": {"$lt": ["$job_attempts", "$job_max_attempts"]}},
+                {"$set": {"job_status": JobStatusEnums.RUNNING.value, "job_started_at": now, "job_updated_at": now},
+                 "$inc": {"job_attempts": 1}},
+                return_document=ReturnDocument.AFTER
+            )
+            return Job(**record) if record else None
+        except Exception as e:
+            logger.error(f"Error claiming job {str(job_id)}: {e}")
+            raise
+
+    async def update_job(self, job_id: ObjectId, fields: dict):
+        try:
+            fields = {**fields, "job_updated_at": datetime.utcnow()}
+            await self.collection.update_one({"_id": job_id}, {"$set": fields})
+        except Exception as e:
+            logger.error(f"Error updating job {str(job_id)}: {e}")
+            raise
+
+    async def requeue_running_jobs(self, job_type: str):
+        """
+        Jobs left running by a previous process were interrupted; queue them again. A job interrupted
+        on its last attempt may well be what took the process down: it is failed instead, so it cannot
+        crash every restart.
+        """
+        try:
+            now = datetime.utcnow()
+            running = {"job_type": job_type, "job_status": JobStatusEnums.RUNNING.value}
+            failed = await self.collection.update_many(
+                {**running, "$expr": {"$gte": ["$job_attempts", "$job_max_attempts"]}},
+                {"$set": {"job_status": JobStatusEnums.FAILED.value, "job_updated_at": now, "job_finished_at": now,
+                          "job_error": "Interrupted on its last attempt"}}
+            )
+            if failed.modified_count:
+                logger.warning(f"Failed {failed.modified_count} {job_type} jobs interrupted on their last attempt.")
+            result = await self.collection.update_many(
+                running,
+                {"$set": {"job_status": JobStatusEnums.QUEUED.value, "job_updated_at": now}}
+            )
+            if result.modified_count:
+                logger.info(f"Requeued {result.modified_count} interrupted {job_type} jobs.")
+        except Exception as e:
+            logger.error(f"Error requeuing interrupted {job_type} jobs: {e}")
+            raise
+
+    async def delete_project_jobs(self, job_project_id: str):
+        try:
+            result = await self.collection.delete_many({"job_project_id": ObjectId(job_project_id)})
+            logger.info(f"Deleted {result.deleted_count} jobs from project {job_project_id}.")
+        except Exception as e:
+            logger.error(f"Error deleting jobs for project {job_project_id}: {e}")
+            raise
+
+    async def delete_all_jobs(self):
+        try:
+            result = await self.collection.delete_many({})
+            logger.info(f"All jobs deleted successfully. Count: {result.deleted_count}")
+        except Exception as e:
+            logger.error(f"Error deleting all jobs: {e}")
+            raise
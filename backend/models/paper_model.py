@@ -72,6 +72,24 @@ class PaperModel(BaseModel):
             logger.error(f"Error in get_or_create_paper for {Paper.paper_name}: {e}")
             raise
 
+    async def get_ingested_paper_by_hash(self, paper_hash: str, chunk_size: int, chunk_overlap: int,
+                                         exclude_paper_id: str = None):
+        """Get a paper with the given content hash whose chunks, split with the same settings, are already in the database"""
+        try:
+            query = {"paper_hash": paper_hash,
+                     "paper_chunks_count": {"$gt": 0},
+                     "paper_chunk_size": chunk_size,
+                     "paper_chunk_overlap": chunk_overlap}
+            if exclude_paper_id:
+                query["_id"] = {"$ne": ObjectId(exclude_paper_id)}
+            record = await self.collection.find_one(query)
+            if not record:
+                return None
+            return Paper(**record)
+        except Exception as e:
+            logger.error(f"Error retrieving paper by hash '{paper_hash}': {e}")
+            raise
+
     async def get_project_papers(self, papers_project_id: str):
         try:    
             query = {"paper_project_id": ObjectId(papers_project_id)}
@@ -0,0 +1,56 @@
+from .base_model import BaseModel
+from .db_schemas import ReviewNode
+from typing import List
+from utils.enums import DatabaseEnums
+from utils import get_logger
+logger = get_logger(__name__)
+
+class ReviewNodeModel(BaseModel):
+    def __init__(self, db_client):
+        super().__init__(db_client=db_client)
+        self.collection = self.db_client[DatabaseEnums.REVIEW_NODE_COLLECTION_NAME.value]
+
+    @classmethod
+    async def get_instance(cls, db_client: object):
+        instance = cls(db_client=db_client)
+        await instance.ensure_indexes()
+        logger.info("ReviewNodeModel instance created and indexes ensured.")
+        return instance
+
+    async def ensure_indexes(self):
+        await self.create_indexes(self.collection, ReviewNode.get_indexes())
+
+    async def get_review_nodes(self, review_node_model_id: str, review_node_prompt_hash: str, input_hashes: List[str]):
+        """Cached review nodes of the given input hashes, keyed by input hash."""
+        try:
+            records = await self.collection.find({
+                "review_node_model_id": review_node_model_id,
+                "review_node_prompt_hash": review_node_prompt_hash,
+                "review_node_input_hash": {"$in": list(input_hashes)}
+            }).to_list(length=None)
+            return {record["review_node_input_hash"]: record["review_node_text"] for record in records}
+        except Exception as e:
+            logger.error(f"Error retrieving {len(input_hashes)} cached review nodes: {e}")
+            raise
+
+    async def save_review_node(self, review_node: ReviewNode):
+        """Cache a review node; a newer node of the same inputs, model and prompts replaces it."""
+        try:
+            await self.collection.update_one(
+                {"review_node_model_id": review_node.review_node_model_id,
+                 "review_node_prompt_hash": review_node.review_node_prompt_hash,
+                 "review_node_input_hash": review_node.review_node_input_hash},
+                {"$set": review_node.dict(by_alias=True, exclude={"id"})},
+                upsert=True
+            )
+        except Exception as e:
+            logger.error(f"Error caching review node {review_node.review_node_input_hash}: {e}")
+            raise
+
+    async def delete_all_review_nodes(self):
+        try:
+            result = await self.collection.delete_many({})
+            logger.info(f"All cached review nodes deleted successfully. Count: {result.deleted_count}")
+        except Exception as e:
+            logger.error(f"Error deleting all cached review nodes: {e}")
+            raise
@@ -0,0 +1,57 @@
+from .base_model import BaseModel
+from .db_schemas import SectionSummary
+from typing import List
+from utils.enums import DatabaseEnums
+from utils import get_logger
+logger = get_logger(__name__)
+
+class SectionSummaryModel(BaseModel):
+    def __init__(self, db_client):
+        super().__init__(db_client=db_client)
+        self.collection = self.db_client[DatabaseEnums.SECTION_SUMMARY_COLLECTION_NAME.value]
+
+    @classmethod
+    async def get_instance(cls, db_client: object):
+        instance = cls(db_client=db_client)
+        await instance.ensure_indexes()
+        logger.info("SectionSummaryModel instance created and indexes ensured.")
+        return instance
+
+    async def ensure_indexes(self):
+        await self.create_indexes(self.collection, SectionSummary.get_indexes())
+
+    async def get_section_summaries(self, section_summary_model_id: str, section_summary_prompt_hash: str,
+                                    text_hashes: List[str]):
+        """Cached summaries of the given section text hashes, keyed by text hash."""
+        try:
+            records = await self.collection.find({
+                "section_summary_model_id": section_summary_model_id,
+                "section_summary_prompt_hash": section_summary_prompt_hash,
+                "section_summary_text_hash": {"$in": list(text_hashes)}
+            }).to_list(length=None)
+            return {record["section_summary_text_hash"]: record["section_summary_text"] for record in records}
+        except Exception as e:
+            logger.error(f"Error retrieving {len(text_hashes)} cached section summaries: {e}")
+            raise
+
+    async def save_section_summary(self, section_summary: SectionSummary):
+        """Cache a section summary; a newer summary of the same text, model and prompts replaces it."""
+        try:
+            await self.collection.update_one(
+                {"section_summary_model_id": section_summary.section_summary_model_id,
+                 "section_summary_prompt_hash": section_summary.section_summary_prompt_hash,
+                 "section_summary_text_hash": section_summary.section_summary_text_hash},
+                {"$set": section_summary.dict(by_alias=True, exclude={"id"})},
+                upsert=True
+            )
+        except Exception as e:
+            logger.error(f"Error caching the summary of section {section_summary.section_summary_text_hash}: {e}")
+            raise
+
+    async def delete_all_section_summaries(self):
+        try:
+            result = await self.collection.delete_many({})
+            logger.info(f"All cached section summaries deleted successfully. Count: {result.deleted_count}")
+        except Exception as e:
+            logger.error(f"Error deleting all cached section summaries: {e}")
+            raise
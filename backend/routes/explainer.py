@@ -1,12 +1,14 @@
-from fastapi import APIRouter, Request, status, HTTPException
+from fastapi import APIRouter, Request, Depends, status, HTTPException
 from fastapi.responses import JSONResponse
 from .schema import ExplainRequest 
 from controllers import ExplainController    
 from utils.enums import ResponseSignals
-from utils import get_logger
+from AI.LLM import interactive_priority
+from utils import get_logger, EventStreamResponse, sse_stream
 logger = get_logger(__name__)
 
-explainer_router = APIRouter()
+# Every call of a user waiting on the answer goes ahead of the bulk work
+explainer_router = APIRouter(dependencies=[Depends(interactive_priority)])
 
 @explainer_router.post("/explain")
 async def explain_text(request: Request, explain_request: ExplainRequest):
@@ -39,3 +41,18 @@ async def explain_text(request: Request, explain_request: ExplainRequest):
                 "error": str(e)
             }
         )
+
+@explainer_router.post("/explain/stream")
+async def explain_text_stream(request: Request, explain_request: ExplainRequest):
+    """Explanation as Server-Sent Events: `token` events as it is generated, then `done` (or `error`)."""
+    logger.info(f"Incoming request to stream an explanation")
+
+    explain_controller = ExplainController(
+        generation_client=request.app.generation_client,
+        template_parser=request.app.template_parser,
+    )
+    events = explain_controller.explain_text_stream(
+        text=explain_request.text,
+        context=explain_request.context,
+    )
+    return EventStreamResponse(sse_stream(events, error_signal=ResponseSignals.EXPLANATION_ERROR.value))
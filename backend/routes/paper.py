@@ -1,13 +1,13 @@
 from fastapi import APIRouter, UploadFile, File, Depends, status, Request, HTTPException, Response
 from fastapi.responses import JSONResponse, StreamingResponse
-from controllers import PaperController
-from models import ProjectModel, PaperModel, ChunkModel
-from models.db_schemas import Paper, Chunk
-from utils.enums import ResponseSignals, AssetTypeEnums
-from routes.schema.requests import RenameRequest
+from controllers import PaperController, IngestionController, BulkUploadController
+from models import ProjectModel, PaperModel, ChunkModel, JobModel
+from models.db_schemas import Paper, Job
+from utils.enums import ResponseSignals, AssetTypeEnums, JobTypeEnums, JobStatusEnums
+from routes.schema.requests import RenameRequest, RechunkRequest
 import aiofiles
 from pathlib import Path
-from bson import ObjectId
+from typing import List
 from urllib.parse import quote
 import os
 from utils import get_settings, AppSettings
@@ -20,6 +20,15 @@ def _serialize_paper(paper):
     paper_dict["paper_project_id"] = str(paper_dict["paper_project_id"])
     return paper_dict
 
+def _serialize_job(job):
+    job_dict = job.dict(by_alias=True)
+    job_dict["_id"] = str(job_dict["_id"])
+    job_dict["job_project_id"] = str(job_dict["job_project_id"])
+    job_dict["job_paper_id"] = str(job_dict["job_paper_id"]) if job_dict["job_paper_id"] else None
+    for key in ("job_created_at", "job_updated_at", "job_started_at", "job_finished_at"):
+        job_dict[key] = job_dict[key].isoformat() if job_dict[key] else None
+    return job_dict
+
 paper_router = APIRouter()
 
 @paper_router.post("/upload-paper")
@@ -29,16 +38,14 @@ async def upload_paper(request: Request, project_id: str, file: UploadFile = Fil
     """
     Upload a file to a project.
     - Validates file type and size
-    - Saves file to the project directory
+    - Saves file to the project directory, hashing its content
     - Creates an paper record in the database
-    - Generates chunks from the file 
-    - saves chunks to the database
+    - Queues an ingestion job that generates the chunks and saves them to the database
     """
     logger.info(f"Incoming request to upload file for project id: {project_id}")
 
     project_model = await ProjectModel.get_instance(db_client=request.app.mongodb_client)
     paper_model = await PaperModel.get_instance(db_client=request.app.mongodb_client)
-    chunk_model = await ChunkModel.get_instance(db_client=request.app.mongodb_client)
 
     # Check if project exists
     project = await project_model.get_project_by_id(project_id=project_id)
@@ -48,7 +55,7 @@ async def upload_paper(request: Request, project_id: str, file: UploadFile = Fil
             detail=ResponseSignals.PROJECT_NOT_FOUND.value
         )
     
-    paper_controller = PaperController()
+    paper_controller = PaperController(conversion_pool=request.app.conversion_pool)
     isvalid, message = await paper_controller.validfile(file=file)
     if not isvalid:
         raise HTTPException(
@@ -60,12 +67,11 @@ async def upload_paper(request: Request, project_id: str, file: UploadFile = Fil
     paper_path = await paper_controller.paper_path(project_title=project.project_title, paper_name=paper_name)
     try:
         if not Path(paper_path).exists():
-            async with aiofiles.open(paper_path, "wb") as f:
-                while chunk:= await file.read(app_settings.CHUNK_SIZE):
-                    await f.write(chunk)
+            paper_hash = await paper_controller.save_paper_file(file, paper_path, app_settings.CHUNK_SIZE)
             logger.info(f"File saved at {paper_path}")
         else:
             logger.warning(f"File already exists at {paper_path}, skipping save.")
+            paper_hash = await paper_controller.hash_file(paper_path)
     except Exception as e:
         logger.error(f"Error saving file: {e}")
         return JSONResponse(
@@ -78,39 +84,86 @@ async def upload_paper(request: Request, project_id: str, file: UploadFile = Fil
             paper_project_id=project.id,
             paper_name=paper_name,
             paper_type=AssetTypeEnums.PDF.value,
-            paper_size=os.path.getsize(paper_path)
+            paper_size=os.path.getsize(paper_path),
+            paper_hash=paper_hash
+        )
+    )
+    if paper.paper_hash != paper_hash:
+        paper.paper_hash = paper_hash
+        await paper_model.update_paper(paper)
+
+    job = await request.app.ingestion_queue.submit(
+        Job(
+            job_type=JobTypeEnums.INGESTION.value,
+            job_project_id=project.id,
+            job_paper_id=paper.id,
+            job_status=JobStatusEnums.QUEUED.value,
+            job_max_attempts=app_settings.INGESTION_MAX_ATTEMPTS,
+            job_payload={"chunk_size": app_settings.PAPER_CHUNK_SIZE,
+                         "chunk_overlap": app_settings.PAPER_CHUNK_OVERLAP},
         )
     )
-    chunks = await paper_controller.create_chunks(
-        project_title=project.project_title,
-        paper_name=paper.paper_name,
-        paper_path=paper_path,
-        chunk_size=1000,
-        chunk_overlap=150
+
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={
+            "message": ResponseSignals.UPLOAD_ACCEPTED.value,
+            "paper": _serialize_paper(paper),
+            "job_id": str(job.id)
+        }
     )
-    if not chunks or len(chunks) == 0:
+
+@paper_router.post("/upload-papers")
+async def upload_papers(request: Request, project_id: str, files: List[UploadFile] = File(...)):
+    """
+    Upload many papers at once, as PDFs and/or zip and tar archives of PDFs.
+    - Archives are extracted one member at a time
+    - Papers already in the project (same name or same content) are skipped
+    - Each accepted paper gets an ingestion job, see GET /jobs/{job_id}
+    - Returns one result per PDF
+    """
+    logger.info(f"Incoming bulk upload of {len(files)} files for project id: {project_id}")
+
+    project_model = await ProjectModel.get_instance(db_client=request.app.mongodb_client)
+    project = await project_model.get_project_by_id(project_id=project_id)
+    if not project:
         raise HTTPException(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, 
-            detail=ResponseSignals.NO_CHUNKS_CREATED.value
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ResponseSignals.PROJECT_NOT_FOUND.value
         )
-    inserted_chunks = [
-        Chunk(
-            chunk_project_id=project.id,
-            chunk_paper_id=paper.id,
-            chunk_section_id=ObjectId(chunk['chunk_section_id']),
-            chunk_text=chunk['chunk'],
-            chunk_metadata=chunk['chunk_metadata'],
-            chunk_index_in_paper=i
-        ) for i, chunk in enumerate(chunks)
-    ]
-    chunks_ids = await chunk_model.insert_chunks(inserted_chunks)
+
+    bulk_upload_controller = BulkUploadController(
+        db_client=request.app.mongodb_client,
+        ingestion_queue=request.app.ingestion_queue,
+        project=project,
+    )
+    results = await bulk_upload_controller.upload(files)
 
     return JSONResponse(
-        status_code=status.HTTP_201_CREATED,
+        status_code=status.HTTP_202_ACCEPTED,
         content={
-            "message": ResponseSignals.SUCCESS_UPLOAD.value,
-            "paper": _serialize_paper(paper),
-            "inserted_chunks_count": len(chunks_ids)
+            "accepted_count": sum(1 for r in results if r["signal"] == ResponseSignals.UPLOAD_ACCEPTED.value),
+            "skipped_count": sum(1 for r in results if r["signal"] in (ResponseSignals.PAPER_EXISTS.value,
+                                                                     ResponseSignals.DUPLICATE_PAPER_CONTENT.value)),
+            "files": results
+        }
+    )
+
+# Get the status of an ingestion job
+@paper_router.get("/jobs/{job_id}")
+async def get_job(request: Request, project_id: str, job_id: str):
+    job_model = await JobModel.get_instance(db_client=request.app.mongodb_client)
+    job = await job_model.get_job_by_id(job_id=job_id, job_project_id=project_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ResponseSignals.JOB_NOT_FOUND.value
+        )
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "signal": ResponseSignals.JOB_RETRIEVED_SUCCESS.value,
+            "job": _serialize_job(job)
         }
     )
 
@@ -282,4 +335,115 @@ async def rename_paper(request: Request, project_id: str, paper_id: str, rename_
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=ResponseSignals.PAPER_RENAME_ERROR.value
-        )
\ No newline at end of file
+        )
+
+def _chunking_params(rechunk_request: RechunkRequest, app_settings: AppSettings):
+    chunk_size = rechunk_request.chunk_size or app_settings.PAPER_CHUNK_SIZE
+    chunk_overlap = rechunk_request.chunk_overlap
+    if chunk_overlap is None:
+        chunk_overlap = app_settings.PAPER_CHUNK_OVERLAP
+    if chunk_overlap >= chunk_size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ResponseSignals.INVALID_CHUNK_OVERLAP.value
+        )
+    return chunk_size, chunk_overlap
+
+# Rebuild the chunks of all papers of a project from their cached parsed documents
+@paper_router.post("/rechunk")
+async def rechunk_project_papers(request: Request, project_id: str, rechunk_request: RechunkRequest,
+                                 app_settings: AppSettings = Depends(get_settings)):
+    logger.info(f"Incoming request to rechunk all papers of project: {project_id}")
+
+    project_model = await ProjectModel.get_instance(db_client=request.app.mongodb_client)
+    paper_model = await PaperModel.get_instance(db_client=request.app.mongodb_client)
+
+    project = await project_model.get_project_by_id(project_id=project_id)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ResponseSignals.PROJECT_NOT_FOUND.value
+        )
+    chunk_size, chunk_overlap = _chunking_params(rechunk_request, app_settings)
+
+    ingestion_controller = IngestionController(
+        db_client=request.app.mongodb_client,
+        conversion_pool=request.app.conversion_pool,
+        vectordb_client=request.app.vectordb_client,
+        indexing_queue=request.app.indexing_queue,
+    )
+    results = []
+    for paper in await paper_model.get_project_papers(papers_project_id=project_id):
+        try:
+            chunks_count = await ingestion_controller.rechunk_paper(project, paper, chunk_size, chunk_overlap)
+            signal = ResponseSignals.RECHUNK_SUCCESS if chunks_count is not None else ResponseSignals.PARSED_DOCUMENT_NOT_FOUND
+        except Exception as e:
+            logger.error(f"Error rechunking paper {str(paper.id)}: {e}")
+            chunks_count, signal = None, ResponseSignals.RECHUNK_ERROR
+        results.append({
+            "paper_id": str(paper.id),
+            "paper_name": paper.paper_name,
+            "signal": signal.value,
+            "inserted_chunks_count": chunks_count,
+        })
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "chunk_size": chunk_size,
+            "chunk_overlap": chunk_overlap,
+            "papers": results
+        }
+    )
+
+# Rebuild the chunks of a paper from its cached parsed document
+@paper_router.post("/{paper_id}/rechunk")
+async def rechunk_paper(request: Request, project_id: str, paper_id: str, rechunk_request: RechunkRequest,
+                        app_settings: AppSettings = Depends(get_settings)):
+    logger.info(f"Incoming request to rechunk paper: {paper_id}")
+
+    project_model = await ProjectModel.get_instance(db_client=request.app.mongodb_client)
+    paper_model = await PaperModel.get_instance(db_client=request.app.mongodb_client)
+
+    project = await project_model.get_project_by_id(project_id=project_id)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ResponseSignals.PROJECT_NOT_FOUND.value
+        )
+    paper = await paper_model.get_paper_by_id(paper_project_id=project_id, paper_id=paper_id)
+    if not paper:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ResponseSignals.PAPER_NOT_FOUND.value
+        )
+    chunk_size, chunk_overlap = _chunking_params(rechunk_request, app_settings)
+
+    ingestion_controller = IngestionController(
+        db_client=request.app.mongodb_client,
+        conversion_pool=request.app.conversion_pool,
+        vectordb_client=request.app.vectordb_client,
+        indexing_queue=request.app.indexing_queue,
+    )
+    try:
+        chunks_count = await ingestion_controller.rechunk_paper(project, paper, chunk_size, chunk_overlap)
+    except Exception as e:
+        logger.error(f"Error rechunking paper {paper_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=ResponseSignals.RECHUNK_ERROR.value
+        )
+    if chunks_count is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=ResponseSignals.PARSED_DOCUMENT_NOT_FOUND.value
+        )
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "message": ResponseSignals.RECHUNK_SUCCESS.value,
+            "paper": _serialize_paper(paper),
+            "inserted_chunks_count": chunks_count
+        }
+    )
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, status, Request, HTTPException, Response
 from fastapi.responses import JSONResponse
-from models import ProjectModel, PaperModel, ChunkModel, SummaryModel
+from models import ProjectModel, PaperModel, ChunkModel, SummaryModel, JobModel, ArtifactModel, EmbeddingCacheModel, SectionSummaryModel, ReviewNodeModel
 from models.db_schemas import Project
 from .schema import ProjectRequest
 from .schema.requests import RenameRequest
@@ -125,12 +125,22 @@ async def delete_all_projects(request: Request):
     paper_model = await PaperModel.get_instance(db_client=request.app.mongodb_client)
     chunk_model = await ChunkModel.get_instance(db_client=request.app.mongodb_client)
     summary_model = await SummaryModel.get_instance(db_client=request.app.mongodb_client)
+    job_model = await JobModel.get_instance(db_client=request.app.mongodb_client)
+    artifact_model = await ArtifactModel.get_instance(db_client=request.app.mongodb_client)
+    embedding_cache_model = await EmbeddingCacheModel.get_instance(db_client=request.app.mongodb_client)
+    section_summary_model = await SectionSummaryModel.get_instance(db_client=request.app.mongodb_client)
+    review_node_model = await ReviewNodeModel.get_instance(db_client=request.app.mongodb_client)
 
-    # Delete all projects, papers, chunks, and summaries
+    # Delete all projects, papers, chunks, summaries, jobs, parsed artifacts, cached embeddings, section summaries and review nodes
     await project_model.delete_all_projects()
     await paper_model.delete_all_papers()
     await chunk_model.delete_all_chunks()
     await summary_model.delete_all_summaries()
+    await job_model.delete_all_jobs()
+    await section_summary_model.delete_all_section_summaries()
+    await review_node_model.delete_all_review_nodes()
+    await artifact_model.delete_all_artifacts()
+    await embedding_cache_model.delete_all_embeddings()
 
     # Delete all collections in the vector database
     await request.app.vectordb_client.delete_all_collections()
@@ -143,6 +153,12 @@ async def delete_all_projects(request: Request):
         logger.info(f"Deleting library directory: {library_folder}")
         await asyncio.to_thread(shutil.rmtree, library_folder, ignore_errors=True)
 
+    # Delete parsed artifacts directory
+    artifacts_folder = path_utils.artifacts_dir    # assets/artifacts/
+    if Path(artifacts_folder).exists():
+        logger.info(f"Deleting artifacts directory: {artifacts_folder}")
+        await asyncio.to_thread(shutil.rmtree, artifacts_folder, ignore_errors=True)
+
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 # Delete a project.
@@ -154,6 +170,7 @@ async def delete_project(request: Request, project_id: str):
     paper_model = await PaperModel.get_instance(db_client=request.app.mongodb_client)
     chunk_model = await ChunkModel.get_instance(db_client=request.app.mongodb_client)
     summary_model = await SummaryModel.get_instance(db_client=request.app.mongodb_client)
+    job_model = await JobModel.get_instance(db_client=request.app.mongodb_client)
 
     project = await project_model.get_project_by_id(project_id=project_id)
     if not project:
@@ -162,11 +179,12 @@ async def delete_project(request: Request, project_id: str):
             detail=ResponseSignals.PROJECT_NOT_FOUND.value
         )
     
-    # Delete the project, its papers, chunks, and summaries
+    # Delete the project, its papers, chunks, summaries and jobs
     await project_model.delete_project(project_id=project_id)
     await paper_model.delete_project_papers(papers_project_id=project_id)
     await chunk_model.delete_project_chunks(chunks_project_id=project_id)
     await summary_model.delete_project_summaries(summaries_project_id=project_id)
+    await job_model.delete_project_jobs(job_project_id=project_id)
 
     # Delete the corresponding collection in the vdb
     collection_name = f"collection_{project_id}".strip()
@@ -1,20 +1,25 @@
-from fastapi import APIRouter, Request, Body, status, HTTPException
+from fastapi import APIRouter, Request, Body, Depends, status, HTTPException
 from fastapi.responses import JSONResponse
-from controllers import RAGController
-from models import ProjectModel, ChunkModel
+from controllers import RAGController, IndexingController
+from AI.LLM import interactive_priority
+from models import ProjectModel
 from .schema import PushRequest, SearchRequest
 from utils.enums import ResponseSignals
-from utils import get_logger
+from utils import get_logger, EventStreamResponse, sse_stream
 logger = get_logger(__name__)
 
 rag_router = APIRouter()
 
 @rag_router.post("/vdb/index/")
 async def index_project(request: Request, project_id: str, push_request: PushRequest):
+    """
+    Index the chunks of a project into the vector DB.
+    Only chunks that are not indexed yet, or were embedded with another model, are embedded;
+    do_reset drops the collection and embeds every chunk again.
+    """
     logger.info(f"Incoming request to index project: {project_id} into vector DB")
 
     project_model = await ProjectModel.get_instance(db_client=request.app.mongodb_client)
-    chunk_model = await ChunkModel.get_instance(db_client=request.app.mongodb_client)
 
     project = await project_model.get_project_by_id(project_id=project_id)
     if not project:
@@ -22,38 +27,16 @@ async def index_project(request: Request, project_id: str, push_request: PushReq
             status_code=status.HTTP_404_NOT_FOUND, 
             detail=ResponseSignals.PROJECT_NOT_FOUND.value
         )
-    rag_controller = RAGController(
+    indexing_controller = IndexingController(
+        db_client=request.app.mongodb_client,
         vectordb_client=request.app.vectordb_client,
-        generation_client=request.app.generation_client,
         embedding_client=request.app.embedding_client,
-        template_parser=request.app.template_parser,
     )
-    has_records = True
-    page_no = 1
-    inserted_items_count = 0
-
-    collection_name = rag_controller.create_collection_name(project_id=project_id)
-    await request.app.vectordb_client.create_collection(
-        collection_name=collection_name,
-        embedding_size=request.app.embedding_client.embedding_size,
-        do_reset=push_request.do_reset,
+    inserted_items_count = await indexing_controller.index_stale_chunks(
+        project_id=project_id,
+        do_reset=bool(push_request.do_reset),
     )
 
-    while has_records:
-        page_chunks = await chunk_model.get_project_chunks(chunks_project_id=project_id, page_no=page_no)
-        if len(page_chunks):
-            page_no += 1
-        
-        if not page_chunks or len(page_chunks) == 0:
-            has_records = False
-            break
-        
-        await rag_controller.index_into_vdb(
-            collection_name=collection_name,
-            chunks=page_chunks
-        )   
-        inserted_items_count += len(page_chunks)
-        
     return JSONResponse(
         status_code=status.HTTP_200_OK,
         content={
@@ -62,6 +45,34 @@ async def index_project(request: Request, project_id: str, push_request: PushReq
         }
     )
 
+@rag_router.post("/vdb/rebuild")
+async def rebuild_project_index(request: Request, project_id: str):
+    """Recreate the vector DB collection of a project from cached embeddings, without calling the embedding API."""
+    logger.info(f"Incoming request to rebuild the vector DB index of project: {project_id} from cache")
+
+    project_model = await ProjectModel.get_instance(db_client=request.app.mongodb_client)
+    project = await project_model.get_project_by_id(project_id=project_id)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ResponseSignals.PROJECT_NOT_FOUND.value
+        )
+    indexing_controller = IndexingController(
+        db_client=request.app.mongodb_client,
+        vectordb_client=request.app.vectordb_client,
+        embedding_client=request.app.embedding_client,
+    )
+    restored_count, missing_count = await indexing_controller.rebuild_from_cache(project_id=project_id)
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "signal": ResponseSignals.VDB_REBUILD_SUCCESS.value,
+            "restored_items_count": restored_count,
+            "missing_items_count": missing_count
+        }
+    )
+
 @rag_router.get("/vdb/info")
 async def get_project_index_info(request: Request, project_id: str):
     logger.info(f"Incoming request to get index info for project: {project_id}")
@@ -93,7 +104,7 @@ async def get_project_index_info(request: Request, project_id: str):
         }
     )
 
-@rag_router.post("/vdb/search")
+@rag_router.post("/vdb/search", dependencies=[Depends(interactive_priority)])
 async def search_index(request: Request, project_id: str, search_request: SearchRequest):
     logger.info(f"Incoming request to search index for project_id: {project_id} with query: {search_request.query} and limit: {search_request.limit}")
 
@@ -131,7 +142,7 @@ async def search_index(request: Request, project_id: str, search_request: Search
         }
     )
 
-@rag_router.post("/chat/answer")
+@rag_router.post("/chat/answer", dependencies=[Depends(interactive_priority)])
 async def answer_rag(request: Request, project_id: str, search_request: SearchRequest):
     logger.info(f"Incoming request to answer RAG query: {search_request.query} for project_id: {project_id} with limit: {search_request.limit}")
 
@@ -166,3 +177,32 @@ async def answer_rag(request: Request, project_id: str, search_request: SearchRe
             "answer": answer,
         }
     )
+
+@rag_router.post("/chat/answer/stream", dependencies=[Depends(interactive_priority)])
+async def answer_rag_stream(request: Request, project_id: str, search_request: SearchRequest):
+    """
+    Answer as Server-Sent Events: a `documents` event with the retrieved documents once the search
+    is done, `token` events with the answer text as it is generated, then `done` (or `error`).
+    """
+    logger.info(f"Incoming request to stream RAG answer: {search_request.query} for project_id: {project_id} with limit: {search_request.limit}")
+
+    project_model = await ProjectModel.get_instance(db_client=request.app.mongodb_client)
+    project = await project_model.get_project_by_id(project_id=project_id)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ResponseSignals.PROJECT_NOT_FOUND.value
+        )
+    rag_controller = RAGController(
+        vectordb_client=request.app.vectordb_client,
+        generation_client=request.app.generation_client,
+        embedding_client=request.app.embedding_client,
+        template_parser=request.app.template_parser,
+    )
+    events = rag_controller.answer_stream(
+        project=project,
+        query=search_request.query,
+        limit=search_request.limit,
+        RAGFusion=search_request.RAGFusion
+    )
+    return EventStreamResponse(sse_stream(events, error_signal=ResponseSignals.RAG_ANSWER_ERROR.value))
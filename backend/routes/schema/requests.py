@@ -24,6 +24,9 @@ class ProjectRequest(BaseModel):
 class SummaryRequest(BaseModel):
     summary_name: str
 
+class BatchSummaryRequest(BaseModel):
+    summary_name_suffix: Optional[str] = " summary"   # each summary is named after its paper
+
 class PushRequest(BaseModel):
     do_reset: Optional[int] = 0
 
@@ -40,5 +43,9 @@ class ExplainRequest(BaseModel):
     text: str
     context : str = None
 
+class RechunkRequest(BaseModel):
+    chunk_size: Optional[int] = Field(None, gt=0)
+    chunk_overlap: Optional[int] = Field(None, ge=0)
+
 class RenameRequest(BaseModel):
     new_name: str
@@ -1,10 +1,13 @@
-from fastapi import APIRouter, status, Request, HTTPException, Body, Response
+from fastapi import APIRouter, status, Request, HTTPException, Body, Response, Depends
 from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
-from controllers import SummaryController
-from models import ProjectModel, PaperModel, SummaryModel, ChunkModel
-from models.db_schemas import Summary
-from utils.enums import ResponseSignals, AssetTypeEnums
-from routes.schema.requests import RenameRequest, SummaryRequest
+from controllers import SummaryController, ReviewController
+from models import ProjectModel, PaperModel, SummaryModel, JobModel
+from models.db_schemas import Job
+from utils.enums import ResponseSignals, JobTypeEnums, JobStatusEnums
+from utils import get_settings, AppSettings
+from routes.schema.requests import RenameRequest, SummaryRequest, BatchSummaryRequest
+from bson import ObjectId
+from datetime import datetime
 from pathlib import Path
 import aiofiles
 import os
@@ -19,17 +22,274 @@ def _serialize_summary(summary):
     summary_dict["summary_paper_id"] = str(summary_dict["summary_paper_id"])
     return summary_dict
 
+def _serialize_summary_job(job):
+    # Elapsed since the job was queued, up to now or to its end
+    finished_at = job.job_finished_at or datetime.utcnow()
+    return {
+        "job_id": str(job.id),
+        "status": job.job_status,
+        "stage": job.job_stage,
+        "progress": job.job_progress,
+        "attempts": job.job_attempts,
+        "sections_done": job.job_result.get("sections_done", 0),
+        "sections_total": job.job_result.get("sections_total"),
+        "elapsed_seconds": round((finished_at - job.job_created_at).total_seconds(), 3),
+        "summary_id": job.job_result.get("summary_id"),
+        "error": job.job_error,
+    }
+
+def _summary_batch_progress(batch_id: str, jobs: list):
+    papers = [{"paper_id": str(job.job_paper_id), **_serialize_summary_job(job)} for job in jobs]
+    statuses = [job.job_status for job in jobs]
+    return {
+        "batch_id": batch_id,
+        "papers_total": len(jobs),
+        "papers_completed": statuses.count(JobStatusEnums.COMPLETED.value),
+        "papers_failed": statuses.count(JobStatusEnums.FAILED.value),
+        "papers_running": statuses.count(JobStatusEnums.RUNNING.value),
+        "papers_queued": statuses.count(JobStatusEnums.QUEUED.value),
+        # Sections are counted once a paper's job has started
+        "sections_done": sum(p["sections_done"] for p in papers),
+        "sections_total": sum(p["sections_total"] or 0 for p in papers),
+        "progress": round(sum(job.job_progress for job in jobs) / len(jobs), 4) if jobs else 1.0,
+        "elapsed_seconds": max((p["elapsed_seconds"] for p in papers), default=0.0),
+        "papers": papers,
+    }
+
 summary_router = APIRouter()
+project_summary_router = APIRouter()
+
+# Queue the summaries of every paper of a project that has none yet.
+@project_summary_router.post("/batch")
+async def create_project_summaries(request: Request, project_id: str, batch_request: BatchSummaryRequest = None,
+                                   app_settings: AppSettings = Depends(get_settings)):
+    """
+    Queue a summary job for every ingested paper of the project that has no summary and none in
+    progress, each named after its paper. The jobs share the summary queue, and their map and
+    reduce requests one concurrency budget and the rate limiter, so a whole project keeps the
+    quota busy without exceeding it. See GET /batch/{batch_id} for the progress.
+    """
+    logger.info(f"Incoming request to summarize all the papers of project_id: {project_id}")
+    batch_request = batch_request or BatchSummaryRequest()
+
+    project_model = await ProjectModel.get_instance(db_client=request.app.mongodb_client)
+    paper_model = await PaperModel.get_instance(db_client=request.app.mongodb_client)
+    summary_model = await SummaryModel.get_instance(db_client=request.app.mongodb_client)
+    job_model = await JobModel.get_instance(db_client=request.app.mongodb_client)
+
+    project = await project_model.get_project_by_id(project_id=project_id)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ResponseSignals.PROJECT_NOT_FOUND.value
+        )
+
+    papers = await paper_model.get_project_papers(papers_project_id=project_id)
+    summaries = await summary_model.get_project_summaries(summaries_project_id=project_id)
+    summarized_paper_ids = {str(summary.summary_paper_id) for summary in summaries}
+    summary_names = {summary.summary_name for summary in summaries}
+    in_progress_paper_ids = {str(job.job_paper_id) for job in await job_model.get_unfinished_jobs(
+        JobTypeEnums.SUMMARY.value, job_project_id=project_id
+    )}
+
+    summary_controller = SummaryController(
+        summary_client=request.app.summary_client,
+        template_parser=request.app.template_parser
+    )
+    batch_id = str(ObjectId())
+    results = []
+    for paper in papers:
+        result = {"paper_id": str(paper.id), "paper_name": paper.paper_name}
+        summary_name = f"{paper.paper_name}{batch_request.summary_name_suffix or ''}"
+        summary_path = await summary_controller.summary_path(project.project_title, summary_name)
+
+        if str(paper.id) in summarized_paper_ids:
+            results.append({**result, "signal": ResponseSignals.SUMMARY_EXISTS.value})
+        elif str(paper.id) in in_progress_paper_ids:
+            results.append({**result, "signal": ResponseSignals.SUMMARY_GENERATION_IN_PROGRESS.value})
+        elif not paper.paper_chunks_count:
+            results.append({**result, "signal": ResponseSignals.PAPER_NOT_INGESTED.value})
+        elif summary_name in summary_names or Path(summary_path).exists():
+            results.append({**result, "signal": ResponseSignals.SUMMARY_NAME_EXISTS.value})
+        else:
+            job = await request.app.summary_queue.submit(
+                Job(
+                    job_type=JobTypeEnums.SUMMARY.value,
+                    job_project_id=project.id,
+                    job_paper_id=paper.id,
+                    job_status=JobStatusEnums.QUEUED.value,
+                    job_max_attempts=app_settings.SUMMARY_MAX_ATTEMPTS,
+                    job_payload={"summary_name": summary_name, "batch_id": batch_id},
+                )
+            )
+            summary_names.add(summary_name)
+            results.append({**result, "signal": ResponseSignals.SUMMARY_GENERATION_ACCEPTED.value,
+                            "job_id": str(job.id)})
+
+    queued_count = sum(1 for r in results if "job_id" in r)
+    logger.info(f"Queued {queued_count} of {len(papers)} paper summaries in batch {batch_id}")
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={
+            "message": ResponseSignals.SUMMARY_BATCH_ACCEPTED.value,
+            "batch_id": batch_id if queued_count else None,
+            "queued_count": queued_count,
+            "skipped_count": len(results) - queued_count,
+            "papers": results
+        }
+    )
+
+# Queue the literature review of a project, built from its paper summaries
+@project_summary_router.post("/review")
+async def create_project_review(request: Request, project_id: str, app_settings: AppSettings = Depends(get_settings)):
+    """
+    Queue the literature review of the project, see GET /review/jobs/{job_id} for its progress
+    and GET /review for the result. The paper summaries are reduced hierarchically, and the parts
+    of the review whose papers did not change since the last run come from the cache.
+    """
+    logger.info(f"Incoming request to review the papers of project_id: {project_id}")
+
+    project_model = await ProjectModel.get_instance(db_client=request.app.mongodb_client)
+    summary_model = await SummaryModel.get_instance(db_client=request.app.mongodb_client)
+    job_model = await JobModel.get_instance(db_client=request.app.mongodb_client)
+
+    project = await project_model.get_project_by_id(project_id=project_id)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ResponseSignals.PROJECT_NOT_FOUND.value
+        )
+    if not await summary_model.get_project_summaries(summaries_project_id=project_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ResponseSignals.NO_PROJECT_SUMMARIES.value
+        )
+
+    unfinished = await job_model.get_unfinished_jobs(JobTypeEnums.REVIEW.value, job_project_id=project_id)
+    if unfinished:
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content={
+                "message": ResponseSignals.REVIEW_GENERATION_IN_PROGRESS.value,
+                "job_id": str(unfinished[0].id)
+            }
+        )
+
+    job = await request.app.review_queue.submit(
+        Job(
+            job_type=JobTypeEnums.REVIEW.value,
+            job_project_id=project.id,
+            job_status=JobStatusEnums.QUEUED.value,
+            job_max_attempts=app_settings.SUMMARY_MAX_ATTEMPTS,
+        )
+    )
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={
+            "message": ResponseSignals.REVIEW_GENERATION_ACCEPTED.value,
+            "job_id": str(job.id)
+        }
+    )
+
+# Get the progress of a review job
+@project_summary_router.get("/review/jobs/{job_id}")
+async def get_project_review_job(request: Request, project_id: str, job_id: str):
+    job_model = await JobModel.get_instance(db_client=request.app.mongodb_client)
+    job = await job_model.get_job_by_id(job_id=job_id, job_project_id=project_id)
+    if not job or job.job_type != JobTypeEnums.REVIEW.value:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ResponseSignals.JOB_NOT_FOUND.value
+        )
+    finished_at = job.job_finished_at or datetime.utcnow()
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "signal": ResponseSignals.JOB_RETRIEVED_SUCCESS.value,
+            "job": {
+                "job_id": str(job.id),
+                "status": job.job_status,
+                "stage": job.job_stage,
+                "progress": job.job_progress,
+                "attempts": job.job_attempts,
+                "elapsed_seconds": round((finished_at - job.job_created_at).total_seconds(), 3),
+                "error": job.job_error,
+                **job.job_result,
+            }
+        }
+    )
+
+# Serve the literature review of a project
+@project_summary_router.get("/review")
+async def serve_project_review(request: Request, project_id: str):
+    project_model = await ProjectModel.get_instance(db_client=request.app.mongodb_client)
+    project = await project_model.get_project_by_id(project_id=project_id)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ResponseSignals.PROJECT_NOT_FOUND.value
+        )
+
+    review_controller = ReviewController(
+        summary_client=request.app.summary_client,
+        template_parser=request.app.template_parser,
+        db_client=request.app.mongodb_client
+    )
+    review_path = review_controller.review_path(project.project_title)
+    if not Path(review_path).exists():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ResponseSignals.REVIEW_NOT_FOUND.value
+        )
+    try:
+        async with aiofiles.open(review_path, 'r', encoding='utf-8') as f:
+            review = await f.read()
+        return PlainTextResponse(
+            review,
+            media_type="text/markdown",
+            headers={"Content-Disposition": f'inline; filename="{project.project_title} review.md"'}
+        )
+    except Exception as e:
+        logger.error(f"Error displaying review {review_path}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=ResponseSignals.REVIEW_DISPLAY_ERROR.value
+        )
+
+# Progress of a batch of project summaries, per paper and in aggregate
+@project_summary_router.get("/batch/{batch_id}")
+async def get_project_summaries_progress(request: Request, project_id: str, batch_id: str):
+    job_model = await JobModel.get_instance(db_client=request.app.mongodb_client)
+    jobs = await job_model.get_project_jobs(job_project_id=project_id, job_type=JobTypeEnums.SUMMARY.value,
+                                            batch_id=batch_id)
+    if not jobs:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ResponseSignals.SUMMARY_BATCH_NOT_FOUND.value
+        )
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "signal": ResponseSignals.JOB_RETRIEVED_SUCCESS.value,
+            "batch": _summary_batch_progress(batch_id, jobs)
+        }
+    )
 
 # Create a summary.
 @summary_router.post("/create")
-async def create_summary(request: Request, project_id: str, paper_id: str, summary_request: SummaryRequest):
+async def create_summary(request: Request, project_id: str, paper_id: str, summary_request: SummaryRequest,
+                         app_settings: AppSettings = Depends(get_settings)):
+    """
+    Queue the summary of a paper, see GET /jobs/{job_id} for its progress.
+    Section summaries are checkpointed as they complete, so a failed or interrupted job
+    resumes from the sections it already summarized.
+    """
     logger.info(f"Incoming request to create summary for project_id: {project_id} and paper_id: {paper_id}")
 
     project_model = await ProjectModel.get_instance(db_client=request.app.mongodb_client)
     paper_model = await PaperModel.get_instance(db_client=request.app.mongodb_client)
     summary_model = await SummaryModel.get_instance(db_client=request.app.mongodb_client)
-    chunk_model = await ChunkModel.get_instance(db_client=request.app.mongodb_client)
+    job_model = await JobModel.get_instance(db_client=request.app.mongodb_client)
 
     # Check if the project exists
     project = await project_model.get_project_by_id(project_id=project_id)
@@ -56,6 +316,30 @@ async def create_summary(request: Request, project_id: str, paper_id: str, summa
                 "message": f"A summary for this paper already exists. Please delete the existing summary or choose a different paper."
             }
         )
+    # Check if a summary of this paper is already being generated
+    job = await job_model.get_unfinished_paper_job(job_type=JobTypeEnums.SUMMARY.value,
+                                                   job_project_id=project_id, job_paper_id=paper_id)
+    if job:
+        logger.warning(f"Summary job {str(job.id)} is already running for paper_id: {paper_id}")
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content={
+                "message": ResponseSignals.SUMMARY_GENERATION_IN_PROGRESS.value,
+                "job_id": str(job.id)
+            }
+        )
+    # Check that the paper is ingested: an upload is accepted before its chunks exist
+    if not paper.paper_chunks_count:
+        ingestion_job = await job_model.get_unfinished_paper_job(job_type=JobTypeEnums.INGESTION.value,
+                                                                 job_project_id=project_id, job_paper_id=paper_id)
+        logger.warning(f"Paper {paper_id} is not ingested yet, not queuing its summary")
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content={
+                "message": ResponseSignals.PAPER_NOT_INGESTED.value,
+                "job_id": str(ingestion_job.id) if ingestion_job else None
+            }
+        )
     # Check if there is a summary with the new name
     summary = await summary_model.get_summary_by_name(summary_project_id=project_id, summary_name=summary_request.summary_name)
     if summary:
@@ -80,34 +364,40 @@ async def create_summary(request: Request, project_id: str, paper_id: str, summa
                 "message": f"Summary file already exists at path: {summary_path}. Please choose another name."
             }
         )
-        
-    try:
-        summary_content = await summary_controller.generate_summary(chunk_model=chunk_model, paper_id=paper_id, paper_name=paper.paper_name)
-        await summary_controller.save_summary(summary_path, summary_content)
-
-        summary = await summary_model.get_or_create_summary(
-            Summary(
-                summary_project_id=project.id,
-                summary_paper_id=paper.id,
-                summary_name=summary_request.summary_name,
-                summary_type=AssetTypeEnums.MD.value,
-                summary_size=os.path.getsize(summary_path),
-            )
+
+    job = await request.app.summary_queue.submit(
+        Job(
+            job_type=JobTypeEnums.SUMMARY.value,
+            job_project_id=project.id,
+            job_paper_id=paper.id,
+            job_status=JobStatusEnums.QUEUED.value,
+            job_max_attempts=app_settings.SUMMARY_MAX_ATTEMPTS,
+            job_payload={"summary_name": summary_request.summary_name},
         )
-        logger.info(f"Summary created successfully for paper: {paper.paper_name}")
-    except Exception as e:
-        logger.error(f"Failed to create summary: {e}")
-        if Path(summary_path).exists():
-            Path(summary_path).unlink()
+    )
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={
+            "message": ResponseSignals.SUMMARY_GENERATION_ACCEPTED.value,
+            "job": _serialize_summary_job(job)
+        }
+    )
+
+# Get the progress of a summary job
+@summary_router.get("/jobs/{job_id}")
+async def get_summary_job(request: Request, project_id: str, paper_id: str, job_id: str):
+    job_model = await JobModel.get_instance(db_client=request.app.mongodb_client)
+    job = await job_model.get_job_by_id(job_id=job_id, job_project_id=project_id)
+    if not job or job.job_type != JobTypeEnums.SUMMARY.value or str(job.job_paper_id) != paper_id:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,         
-            detail=ResponseSignals.SUMMARY_GENERATION_FAILED.value
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ResponseSignals.JOB_NOT_FOUND.value
         )
     return JSONResponse(
-        status_code=status.HTTP_201_CREATED,
+        status_code=status.HTTP_200_OK,
         content={
-            "message": ResponseSignals.SUMMARY_GENERATION_SUCCESS.value,
-            "summary": _serialize_summary(summary)
+            "signal": ResponseSignals.JOB_RETRIEVED_SUCCESS.value,
+            "job": _serialize_summary_job(job)
         }
     )
 
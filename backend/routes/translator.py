@@ -1,13 +1,15 @@
-from fastapi import APIRouter, Request, status, HTTPException
+from fastapi import APIRouter, Request, Depends, status, HTTPException
 from fastapi.responses import JSONResponse
 from controllers import TranslatorController
 from .schema import TranslateRequest
 from utils.enums import ResponseSignals
-from utils import get_logger
+from AI.LLM import interactive_priority
+from utils import get_logger, EventStreamResponse, sse_stream
 
 logger = get_logger(__name__)
 
-translator_router = APIRouter()
+# Every call of a user waiting on the answer goes ahead of the bulk work
+translator_router = APIRouter(dependencies=[Depends(interactive_priority)])
 
 @translator_router.post("/translate")
 async def translate_text(request: Request, translate_request: TranslateRequest):
@@ -45,4 +47,26 @@ async def translate_text(request: Request, translate_request: TranslateRequest):
             status_code= status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail= ResponseSignals.TRANSLATION_ERROR.value
         )
-   
\ No newline at end of file
+
+@translator_router.post("/translate/stream")
+async def translate_text_stream(request: Request, translate_request: TranslateRequest):
+    """Translation as Server-Sent Events: `token` events as it is generated, then `done` (or `error`)."""
+    logger.info("Incoming request to stream a translation")
+
+    translator_controller = TranslatorController(
+        generation_client=request.app.generation_client,
+        template_parser=request.app.template_parser,
+    )
+    isvalid, message = translator_controller.validtext(translate_request.text, translate_request.target_language)
+    if not isvalid:
+        logger.error(f"Invalid translation request: {message}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=message
+        )
+
+    events = translator_controller.translate_text_stream(
+        text=translate_request.text,
+        target_language=translate_request.target_language,
+    )
+    return EventStreamResponse(sse_stream(events, error_signal=ResponseSignals.TRANSLATION_ERROR.value))
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from fastapi.responses import JSONResponse
 from utils import AppSettings, get_settings
 
@@ -10,4 +10,9 @@ async def welcome(app_settings : AppSettings = Depends(get_settings)):
     project_name = app_settings.APP_NAME
     version = app_settings.APP_VERSION
 
-    return JSONResponse(content={"message": f"Welcome to {project_name} {version}"})
\ No newline at end of file
+    return JSONResponse(content={"message": f"Welcome to {project_name} {version}"})
+
+@welcome_router.get("/metrics/llm")
+async def llm_metrics(request: Request):
+    """Queue depth, waits and reserved capacity of every LLM priority class."""
+    return JSONResponse(content=request.app.llm_rate_limiter.metrics())
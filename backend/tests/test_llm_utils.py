@@ -0,0 +1,61 @@
+import math
+import random
+import pytest
+from AI.LLM.LLMUtils import estimate_tokens, group_by_tokens, mark_sections, split_marked_sections
+
+
+def merge_rounds(texts, max_tokens):
+    """Merge each group into one text until a single text is left, as the summary reduce does."""
+    rounds = 0
+    while len(texts) > 1:
+        groups = group_by_tokens(texts, max_tokens)
+        assert all(len(group) >= 2 for group in groups[:-1])
+        assert sorted(i for group in groups for i in group) == list(range(len(texts)))
+        texts = ["\n\n".join(texts[i] for i in group) for group in groups]
+        rounds += 1
+    return rounds
+
+
+@pytest.mark.parametrize("count", [2, 3, 17, 100, 1000])
+def test_group_by_tokens_ends_in_logarithmic_rounds(count):
+    rng = random.Random(count)
+    texts = ["word " * rng.randint(1, 400) for _ in range(count)]
+    assert merge_rounds(texts, max_tokens=300) <= math.ceil(math.log2(count))
+
+
+def test_group_by_tokens_pairs_texts_larger_than_the_budget():
+    texts = ["x" * 4000] * 9   # about 1000 tokens each, a budget of 100
+    groups = group_by_tokens(texts, max_tokens=100)
+    assert groups == [[0, 1], [2, 3], [4, 5], [6, 7], [8]]
+    assert merge_rounds(texts, max_tokens=100) == math.ceil(math.log2(len(texts)))
+
+
+def test_group_by_tokens_fills_groups_up_to_the_budget():
+    texts = ["word " * 40] * 10
+    groups = group_by_tokens(texts, max_tokens=4 * estimate_tokens(texts[0]))
+    assert groups == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+
+
+def test_split_marked_sections_reads_back_mark_sections():
+    assert split_marked_sections(mark_sections(["first", "second", "third"])) == {1: "first", 2: "second", 3: "third"}
+
+
+def test_split_marked_sections_leaves_out_missing_and_empty_sections():
+    text = "=== SECTION 1 ===\nfirst\n\n=== SECTION 2 ===\n\n=== SECTION 4 ===\nfourth"
+    assert split_marked_sections(text) == {1: "first", 4: "fourth"}
+
+
+def test_split_marked_sections_keeps_the_first_of_repeated_markers():
+    text = "=== SECTION 1 ===\nfirst\n=== SECTION 2 ===\nsecond\n=== SECTION 1 ===\nfirst again"
+    assert split_marked_sections(text) == {1: "first", 2: "second"}
+
+
+def test_split_marked_sections_ignores_text_without_markers():
+    assert split_marked_sections("a summary without any marker") == {}
+    assert split_marked_sections("") == {}
+    assert split_marked_sections(None) == {}
+
+
+def test_split_marked_sections_ignores_markers_inside_a_line():
+    text = "=== SECTION 1 ===\nas said in === SECTION 2 === above\n  === SECTION 2 ===  \nsecond"
+    assert split_marked_sections(text) == {1: "as said in === SECTION 2 === above", 2: "second"}
@@ -0,0 +1,113 @@
+import asyncio
+import pytest
+from AI.LLM.LLMEnums import PriorityEnum
+from AI.LLM.RateLimiter import RateLimiter, RateLimitExceeded
+
+INTERACTIVE, BULK = PriorityEnum.INTERACTIVE.value, PriorityEnum.BULK.value
+
+
+class RateLimitError(Exception):
+    code = 429
+
+
+async def acquire_in_order(limiter, priorities):
+    """Queue one call per priority, in this order, and return the labels in the order they were let through."""
+    order = []
+
+    async def call(label, priority):
+        await limiter.acquire(priority=priority)
+        order.append(label)
+        await limiter.release()
+
+    tasks = []
+    for label, priority in priorities:
+        tasks.append(asyncio.create_task(call(label, priority)))
+        await asyncio.sleep(0.001)   # enqueued in this order
+    await asyncio.gather(*tasks)
+    return order
+
+
+def test_interactive_calls_overtake_queued_bulk_calls():
+    async def run():
+        # 20 requests per second, starting empty: every call waits for the refill
+        limiter = RateLimiter(requests_per_minute=1200, tokens_per_minute=10 ** 9, interactive_reserved_share=0.0)
+        limiter.requests.level = 0
+        return await acquire_in_order(limiter, [
+            ("bulk 1", BULK), ("bulk 2", BULK), ("bulk 3", BULK), ("interactive", INTERACTIVE),
+        ])
+
+    assert asyncio.run(run()) == ["interactive", "bulk 1", "bulk 2", "bulk 3"]
+
+
+def test_interactive_calls_overtake_bulk_calls_waiting_for_a_slot():
+    async def run():
+        limiter = RateLimiter(requests_per_minute=None, tokens_per_minute=None, max_in_flight=1)
+        await limiter.acquire(priority=BULK)
+        waiting = asyncio.create_task(acquire_in_order(limiter, [
+            ("bulk 1", BULK), ("bulk 2", BULK), ("interactive", INTERACTIVE),
+        ]))
+        await asyncio.sleep(0.05)
+        await limiter.release()
+        return await waiting
+
+    assert asyncio.run(run()) == ["interactive", "bulk 1", "bulk 2"]
+
+
+def test_bulk_calls_leave_the_reserved_slots_to_interactive_calls():
+    async def run():
+        limiter = RateLimiter(requests_per_minute=None, tokens_per_minute=None,
+                              interactive_reserved_share=0.25, max_in_flight=4)
+        for _ in range(3):
+            await limiter.acquire(priority=BULK)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(limiter.acquire(priority=BULK), 0.05)
+        await asyncio.wait_for(limiter.acquire(priority=INTERACTIVE), 0.05)
+        return limiter.in_flight
+
+    assert asyncio.run(run()) == 4
+
+
+def test_rate_limited_calls_halve_the_rate():
+    limiter = RateLimiter(requests_per_minute=600, min_rate_factor=0.1)
+    limiter.on_rate_limited()
+    assert limiter.rate_factor == 0.5
+    assert limiter.requests.level <= 0
+    limiter.on_rate_limited()
+    assert limiter.rate_factor == 0.25
+    for _ in range(5):
+        limiter.on_rate_limited()
+    assert limiter.rate_factor == 0.1
+
+
+def test_a_429_is_retried_at_half_the_rate_then_the_rate_grows_back():
+    async def run():
+        limiter = RateLimiter(requests_per_minute=6000, base_delay=0.0, rate_increase=0.1,
+                              interactive_reserved_share=0.0)
+        attempts = []
+
+        async def request():
+            attempts.append(limiter.rate_factor)
+            if len(attempts) == 1:
+                raise RateLimitError("429 Too Many Requests")
+            return "ok"
+
+        return await limiter.call(request), attempts, limiter.rate_factor
+
+    result, attempts, rate_factor = asyncio.run(run())
+    assert result == "ok"
+    assert attempts == [1.0, 0.5]
+    assert rate_factor == pytest.approx(0.6)
+
+
+def test_a_call_still_rate_limited_after_every_retry_raises():
+    async def run():
+        limiter = RateLimiter(requests_per_minute=60000, max_retries=2, base_delay=0.0,
+                              interactive_reserved_share=0.0)
+
+        async def request():
+            raise RateLimitError("429 Too Many Requests")
+
+        await limiter.call(request)
+
+    with pytest.raises(RateLimitExceeded):
+        asyncio.run(run())
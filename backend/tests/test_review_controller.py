@@ -0,0 +1,38 @@
+import math
+import pytest
+from controllers.review_controller import ReviewController
+
+
+def review_levels(keys, fanout):
+    """Group the keys level by level as the review tree does, until one group fits in a final merge."""
+    levels = 0
+    while len(keys) > fanout:
+        groups = ReviewController.group_by_anchors(keys, levels, fanout)
+        assert all(2 <= len(group) <= fanout for group in groups[:-1])
+        assert 1 <= len(groups[-1]) <= fanout
+        assert sorted(i for group in groups for i in group) == list(range(len(keys)))
+        keys = [keys[group[-1]] for group in groups]
+        levels += 1
+    return levels
+
+
+@pytest.mark.parametrize("count", [1, 8, 9, 40, 500, 5000])
+@pytest.mark.parametrize("fanout", [2, 3, 8, 16])
+def test_group_by_anchors_ends_in_logarithmic_levels(count, fanout):
+    keys = [f"paper-{i}" for i in range(count)]
+    # Groups of at least 2: the count at least halves at each level, until it fits in one final merge
+    assert review_levels(keys, fanout) <= max(0, math.ceil(math.log2(count / fanout)))
+
+
+def test_group_by_anchors_keeps_the_groups_away_from_an_insertion():
+    keys = [f"paper-{i}" for i in range(200)]
+    before = [[keys[i] for i in group] for group in ReviewController.group_by_anchors(keys, 0, 8)]
+    inserted = keys[:50] + ["new-paper"] + keys[50:]
+    after = [[inserted[i] for i in group] for group in ReviewController.group_by_anchors(inserted, 0, 8)]
+    changed = [group for group in after if group not in before]
+    assert 1 <= len(changed) <= 3
+
+
+def test_estimate_nodes_counts_the_final_merge():
+    assert ReviewController.estimate_nodes(5, 8) == 1
+    assert ReviewController.estimate_nodes(40, 8) == 1 + 10 + 3
@@ -2,3 +2,7 @@ from .path_utils import PathUtils
 from .app_settings import AppSettings, get_settings
 from .app_logging import get_logger
 from .auth_utils import get_password_hash, verify_password, create_access_token, verify_token, get_current_user
+
+from .conversion_pool import ConversionPool, ConversionError, converter_version
+from .job_queue import JobQueue, JobContext
+from .sse import SSE_HEADERS, EventStreamResponse, sse_event, sse_stream
@@ -0,0 +1,273 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from .app_logging import get_logger
+logger = get_logger(__name__)
+
+
+class ConversionError(Exception):
+    """Raised when a worker fails to convert a document."""
+
+
+def converter_version() -> str:
+    """Version tag of the installed converter, part of the key of every cached parse."""
+    try:
+        from importlib.metadata import version
+        return f"docling-{version('docling')}"
+    except Exception:
+        return "docling-unknown"
+
+
+def _current_rss_bytes() -> int:
+    """Resident set size of the calling process (current, not peak, when /proc is available)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _worker_main(conn):
+    """
+    Entry point of a conversion worker process.
+    The docling converter (and its layout/table models) is created once and reused for every job.
+    """
+    from docling.document_converter import DocumentConverter
+    from docling.datamodel.base_models import InputFormat
+
+    converter = DocumentConverter()
+    try:
+        converter.initialize_pipeline(InputFormat.PDF)
+    except Exception:
+        # Older docling versions load the pipeline lazily on the first convert call
+        pass
+    conn.send(("ready", None, _current_rss_bytes()))
+
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if job is None:
+            break
+
+        try:
+            if job.get("page_range"):
+                doc = converter.convert(job["file_path"], page_range=tuple(job["page_range"])).document
+            else:
+                doc = converter.convert(job["file_path"]).document
+            conn.send(("ok", doc.export_to_markdown(), _current_rss_bytes()))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}", _current_rss_bytes()))
+
+    conn.close()
+
+
+class _Worker:
+    def __init__(self, ctx, worker_id: int):
+        self.worker_id = worker_id
+        self.conn, child_conn = ctx.Pipe(duplex=True)
+        self.process = ctx.Process(target=_worker_main, args=(child_conn,), daemon=True,
+                                   name=f"docling-worker-{worker_id}")
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+        self.jobs_done = 0
+        self.rss_bytes = 0
+
+    async def _receive(self, timeout: float):
+        has_data = await asyncio.to_thread(self.conn.poll, timeout)
+        if not has_data:
+            raise asyncio.TimeoutError()
+        try:
+            return self.conn.recv()
+        except EOFError:
+            raise ConversionError(f"Conversion worker {self.worker_id} exited unexpectedly")
+
+    async def wait_ready(self, timeout: float):
+        if self.ready:
+            return
+        status, _, rss = await self._receive(timeout)
+        self.ready = status == "ready"
+        self.rss_bytes = rss
+
+    async def run(self, job: dict, timeout: float):
+        self.conn.send(job)
+        status, payload, rss = await self._receive(timeout)
+        self.jobs_done += 1
+        self.rss_bytes = rss
+        if status != "ok":
+            raise ConversionError(payload)
+        return payload
+
+    def stop(self, graceful: bool = True):
+        if graceful and self.process.is_alive():
+            try:
+                self.conn.send(None)
+            except (OSError, BrokenPipeError):
+                pass
+            self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(timeout=5)
+        self.conn.close()
+
+
+def count_pdf_pages(file_path: str):
+    """Number of pages of a PDF, or None when it cannot be read cheaply."""
+    try:
+        import pypdfium2
+        pdf = pypdfium2.PdfDocument(str(file_path))
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+    except Exception as e:
+        logger.warning(f"Could not count pages of {file_path}: {e}")
+        return None
+
+
+class ConversionPool:
+    """
+    Pool of long-lived processes, each holding one preloaded docling converter.
+    - PDF conversion runs off the event loop, on other cores
+    - Documents of at least `parallel_min_pages` pages are split into page ranges converted
+      by several workers at once, then merged back in page order
+    - A job exceeding `job_timeout` seconds kills and replaces its worker
+    - A worker whose RSS grows beyond `max_worker_rss_mb` is recycled after its current job
+    """
+
+    def __init__(self, pool_size: int = 2, job_timeout: float = 600, max_worker_rss_mb: int = 3072,
+                 parallel_min_pages: int = 40, min_pages_per_range: int = 10, startup_timeout: float = 300):
+        self.pool_size = max(1, pool_size)
+        self.job_timeout = job_timeout
+        self.max_worker_rss_bytes = max_worker_rss_mb * 1024 * 1024
+        self.parallel_min_pages = parallel_min_pages
+        self.min_pages_per_range = max(1, min_pages_per_range)
+        self.startup_timeout = startup_timeout
+
+        self._ctx = multiprocessing.get_context("spawn")
+        self._idle = None
+        self._workers = []
+        self._next_worker_id = 0
+        self._closing = False
+        self._pending_replacements = set()
+
+    def _spawn(self) -> _Worker:
+        worker = _Worker(self._ctx, self._next_worker_id)
+        self._next_worker_id += 1
+        self._workers.append(worker)
+        logger.info(f"Started conversion worker {worker.worker_id} (pid {worker.process.pid})")
+        return worker
+
+    def _replace(self, worker: _Worker, graceful: bool):
+        """Stop a worker and start its replacement, or only stop it once the pool is closing."""
+        if worker in self._workers:
+            self._workers.remove(worker)
+        worker.stop(graceful=graceful)
+        if self._closing:
+            return None
+        return self._spawn()
+
+    def _replace_in_background(self, worker: _Worker):
+        """Replace a worker without waiting for it, returning its replacement to the idle queue once started."""
+        future = asyncio.get_running_loop().run_in_executor(None, self._replace, worker, False)
+        self._pending_replacements.add(future)
+
+        def on_replaced(future):
+            self._pending_replacements.discard(future)
+            if future.cancelled() or future.exception() is not None:
+                return
+            replacement = future.result()
+            if replacement is not None:
+                self._idle.put_nowait(replacement)
+
+        future.add_done_callback(on_replaced)
+
+    async def start(self):
+        self._idle = asyncio.Queue()
+        for _ in range(self.pool_size):
+            self._idle.put_nowait(self._spawn())
+        logger.info(f"Conversion pool started with {self.pool_size} workers")
+
+    def close(self):
+        """Stop replacing workers, ahead of a shutdown that cancels the conversions in progress."""
+        self._closing = True
+
+    async def shutdown(self):
+        self.close()
+        if self._pending_replacements:
+            await asyncio.gather(*self._pending_replacements, return_exceptions=True)
+        workers, self._workers = self._workers, []
+        await asyncio.gather(*[asyncio.to_thread(w.stop) for w in workers])
+        logger.info("Conversion pool stopped")
+
+    def page_ranges(self, num_pages: int):
+        """1-based inclusive page ranges, one per worker, none smaller than `min_pages_per_range`."""
+        if not num_pages or num_pages < self.parallel_min_pages or self.pool_size < 2:
+            return []
+        range_size = max(self.min_pages_per_range, -(-num_pages // self.pool_size))
+        return [(start, min(start + range_size - 1, num_pages)) for start in range(1, num_pages + 1, range_size)]
+
+    async def convert(self, file_path: str) -> str:
+        """Convert a PDF to markdown in the pool, splitting long documents across workers."""
+        if self._idle is None:
+            raise RuntimeError("Conversion pool is not started")
+
+        num_pages = await asyncio.to_thread(count_pdf_pages, file_path)
+        ranges = self.page_ranges(num_pages)
+        if len(ranges) < 2:
+            return await self._run_job({"file_path": str(file_path)})
+
+        logger.info(f"Converting {file_path} ({num_pages} pages) as {len(ranges)} page ranges")
+        start = time.perf_counter()
+        parts = await asyncio.gather(*[
+            self._run_job({"file_path": str(file_path), "page_range": page_range}) for page_range in ranges
+        ])
+        logger.info(f"Converted {file_path} in {time.perf_counter() - start:.1f}s across {len(ranges)} workers")
+
+        # Each part starts where the previous one stopped: text before the first header of a part
+        # continues the last section of the previous part, exactly as in a serial conversion
+        return "\n\n".join(part.strip() for part in parts if part and part.strip())
+
+    async def _run_job(self, job: dict) -> str:
+        worker = await self._idle.get()
+        label = f"{job['file_path']} pages {job['page_range']}" if job.get("page_range") else job["file_path"]
+        timed_out = f"did not start within {self.startup_timeout}s"
+        try:
+            await worker.wait_ready(self.startup_timeout)
+            timed_out = f"timed out after {self.job_timeout}s"
+            start = time.perf_counter()
+            md_text = await worker.run(job, self.job_timeout)
+            logger.info(f"Worker {worker.worker_id} converted {label} in {time.perf_counter() - start:.1f}s")
+
+            if worker.rss_bytes > self.max_worker_rss_bytes:
+                logger.warning(f"Recycling conversion worker {worker.worker_id}: RSS "
+                               f"{worker.rss_bytes // (1024 * 1024)} MB exceeds the ceiling")
+                worker = await asyncio.to_thread(self._replace, worker, True)
+            return md_text
+
+        except ConversionError as e:
+            logger.error(f"Worker {worker.worker_id} failed to convert {label}: {e}")
+            if not worker.process.is_alive():
+                worker = await asyncio.to_thread(self._replace, worker, False)
+            raise
+
+        except asyncio.TimeoutError:
+            # Either the worker never loaded its converter, or the conversion itself overran
+            logger.error(f"Conversion of {label} {timed_out}, killing worker {worker.worker_id}")
+            worker = await asyncio.to_thread(self._replace, worker, False)
+            raise ConversionError(f"Conversion {timed_out}")
+
+        except BaseException:
+            # Cancelled mid-job: the worker may still be busy, so it cannot be reused.
+            # It is stopped off the event loop, and only replaced while the pool is not closing
+            self._replace_in_background(worker)
+            worker = None
+            raise
+
+        finally:
+            if worker is not None:
+                self._idle.put_nowait(worker)
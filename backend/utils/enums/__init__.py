@@ -1,3 +1,5 @@
 from .response_enums import ResponseSignals
 from .assets_enums import AssetTypeEnums
-from .database_enums import DatabaseEnums
\ No newline at end of file
+from .database_enums import DatabaseEnums
+from .job_enums import JobTypeEnums, JobStatusEnums, IngestionStageEnums, IndexingStageEnums, SummaryStageEnums, ReviewStageEnums
+from .stream_enums import StreamEventEnums
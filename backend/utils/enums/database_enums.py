@@ -6,4 +6,9 @@ class DatabaseEnums(Enum):
     CHUNK_COLLECTION_NAME = "chunks"
     PAPER_COLLECTION_NAME = "papers"
     SUMMARY_COLLECTION_NAME = "summaries"
-    USER_COLLECTION_NAME = "users"
\ No newline at end of file
+    USER_COLLECTION_NAME = "users"
+    JOB_COLLECTION_NAME = "jobs"
+    ARTIFACT_COLLECTION_NAME = "artifacts"
+    EMBEDDING_COLLECTION_NAME = "embeddings"
+    SECTION_SUMMARY_COLLECTION_NAME = "section_summaries"
+    REVIEW_NODE_COLLECTION_NAME = "review_nodes"
\ No newline at end of file
@@ -0,0 +1,32 @@
+from enum import Enum
+
+class JobTypeEnums(Enum):
+    INGESTION = "ingestion"
+    INDEXING = "indexing"
+    SUMMARY = "summary"
+    REVIEW = "review"
+
+class JobStatusEnums(Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class IngestionStageEnums(Enum):
+    CONVERT = "convert"
+    CLEAN = "clean"
+    CHUNK = "chunk"     # splitting and insertion are streamed together
+    REUSE = "reuse"
+
+class IndexingStageEnums(Enum):
+    EMBED = "embed"
+
+class SummaryStageEnums(Enum):
+    MAP = "map"         # section summaries, checkpointed one by one
+    REDUCE = "reduce"
+    SAVE = "save"
+
+class ReviewStageEnums(Enum):
+    LOAD = "load"
+    REDUCE = "reduce"   # tree of paper summaries, cached node by node
+    SAVE = "save"
@@ -13,23 +13,35 @@ class ResponseSignals(Enum):
 
     # General Responses
     SUCCESS_UPLOAD = 'File Uploaded Successfully'
+    UPLOAD_ACCEPTED = 'File Uploaded, Processing Queued'
     FAILED_UPLOAD = 'Failed to Upload File'
     FAILED_SAVING = 'Failed to save file'
     PAPER_FILE_NOT_FOUND = 'Paper File Not Found'
+    INVALID_ARCHIVE = 'Invalid Or Corrupted Archive'
+    BULK_UPLOAD_LIMIT_REACHED = 'Bulk Upload File Limit Reached'
     SUMMARY_FILE_NOT_FOUND = 'Summary File Not Found'
 
     # Paper Responses
     PAPER_NOT_FOUND = "Paper Not Found"
     PAPER_EXISTS = 'Paper Already Exists'
+    DUPLICATE_PAPER_CONTENT = 'Paper With The Same Content Already Exists'
     PAPER_DISPLAY_ERROR = 'Failed To Display Paper'
     PAPER_UPDATE_SUCCESS = 'Paper Updated Successfully'
     PAPER_UPDATE_ERROR = 'Failed to Update Paper'
     PAPER_RENAME_SUCCESS = 'Paper Renamed Successfully'
     PAPER_RENAME_ERROR = 'Failed to Rename Paper'
 
+    # Job Responses
+    JOB_NOT_FOUND = 'Job Not Found'
+    JOB_RETRIEVED_SUCCESS = 'Job Retrieved Successfully'
+
     # Chunk Responses
     NO_CHUNKS_CREATED = 'No Chunks Created'
     NO_PAPER_CHUNKS = "No Paper Chunks Founded"
+    RECHUNK_SUCCESS = 'Paper Chunks Rebuilt Successfully'
+    RECHUNK_ERROR = 'Failed to Rebuild Paper Chunks'
+    INVALID_CHUNK_OVERLAP = 'Chunk Overlap Must Be Smaller Than Chunk Size'
+    PARSED_DOCUMENT_NOT_FOUND = 'No Cached Parsed Document For This Paper'
 
     # Project Responses
     PROJECT_CREATED_SUCCESS = 'Project Created Successfully'
@@ -42,6 +54,7 @@ class ResponseSignals(Enum):
     VDB_CONNECTION_ERROR = 'Failed to Connect to Vector DB'
     VDB_INSERT_ERROR = 'Failed to Insert Into Vector DB'
     VDB_INSERT_SUCCESS = 'Inserted Into Vector DB Successfully'
+    VDB_REBUILD_SUCCESS = 'Vector DB Collection Rebuilt From Cached Embeddings'
     VDB_INFO_RETRIEVED_SUCCESS = 'Vector DB Collection Retrieved Successfully'
     VDB_INFO_RETRIEVED_ERROR = 'Failed to Retrieve Vector DB Collection Info'
     VDB_SEARCH_ERROR = 'Failed to Search Vector DB'
@@ -59,6 +72,19 @@ class ResponseSignals(Enum):
     SUMMARY_NOT_FOUND = 'Summary Not Found'
     SUMMARY_GENERATION_FAILED = 'Failed to Generate Summary'
     SUMMARY_GENERATION_SUCCESS = 'Summary Generated Successfully'
+    SUMMARY_GENERATION_ACCEPTED = 'Summary Generation Queued'
+    SUMMARY_GENERATION_IN_PROGRESS = 'A Summary of this Paper Is Already Being Generated'
+    SUMMARY_BATCH_ACCEPTED = 'Project Summaries Queued'
+    SUMMARY_BATCH_NOT_FOUND = 'Summary Batch Not Found'
+    SUMMARY_NAME_EXISTS = 'A Summary With This Name Already Exists'
+    PAPER_NOT_INGESTED = 'Paper Not Ingested Yet'
+
+    # Review Responses
+    REVIEW_NOT_FOUND = 'Review Not Found'
+    REVIEW_GENERATION_ACCEPTED = 'Review Generation Queued'
+    REVIEW_GENERATION_IN_PROGRESS = 'A Review of this Project Is Already Being Generated'
+    REVIEW_DISPLAY_ERROR = 'Failed to Display Review'
+    NO_PROJECT_SUMMARIES = 'No Paper Summaries in this Project'
     SUMMARY_EXISTS = 'Summary Already Exists for this Paper'
     SUMMARY_DISPLAY_ERROR = 'Failed to Display Summary'
     SUMMARY_UPDATE_ERROR = 'Failed to Update Summary'
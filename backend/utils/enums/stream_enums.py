@@ -0,0 +1,7 @@
+from enum import Enum
+
+class StreamEventEnums(Enum):
+    DOCUMENTS = 'documents'
+    TOKEN = 'token'
+    DONE = 'done'
+    ERROR = 'error'
@@ -0,0 +1,136 @@
+import asyncio
+import time
+import traceback
+from contextlib import asynccontextmanager
+from datetime import datetime
+from .enums import JobStatusEnums
+from .app_logging import get_logger
+logger = get_logger(__name__)
+
+
+class JobContext:
+    """Handed to a job handler to report its current stage, progress and per-stage timings."""
+
+    def __init__(self, job_model, job):
+        self.job_model = job_model
+        self.job = job
+
+    async def set_progress(self, progress: float, partial_result: dict = None):
+        """Report the progress, with the partial result of the job so far when given."""
+        self.job.job_progress = round(min(max(progress, 0.0), 1.0), 4)
+        fields = {"job_progress": self.job.job_progress}
+        if partial_result is not None:
+            self.job.job_result = partial_result
+            fields["job_result"] = partial_result
+        await self.job_model.update_job(self.job.id, fields)
+
+    @asynccontextmanager
+    async def stage(self, stage: str, progress_after: float = None):
+        self.job.job_stage = stage
+        await self.job_model.update_job(self.job.id, {"job_stage": stage})
+
+        start = time.perf_counter()
+        yield
+        self.job.job_timings[stage] = round(time.perf_counter() - start, 3)
+
+        fields = {"job_timings": self.job.job_timings}
+        if progress_after is not None:
+            self.job.job_progress = progress_after
+            fields["job_progress"] = progress_after
+        await self.job_model.update_job(self.job.id, fields)
+
+
+class JobQueue:
+    """
+    In-process worker pool for jobs persisted in mongo.
+    - At most `concurrency` jobs of the queue's type run at the same time
+    - A failing job is retried with exponential backoff until it reaches its `job_max_attempts`
+    - On start, queued jobs and jobs interrupted by a previous shutdown are picked up again;
+      a job whose process died during its last attempt is failed instead
+    """
+
+    def __init__(self, job_model, job_type: str, handler, concurrency: int = 2, retry_delay: float = 5):
+        self.job_model = job_model
+        self.job_type = job_type
+        self.handler = handler
+        self.concurrency = max(1, concurrency)
+        self.retry_delay = retry_delay
+
+        self._queue = asyncio.Queue()
+        self._workers = []
+
+    async def start(self):
+        await self.job_model.requeue_running_jobs(self.job_type)
+        for job in await self.job_model.get_unfinished_jobs(self.job_type):
+            self._queue.put_nowait(job.id)
+
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        logger.info(f"{self.job_type} queue started with {self.concurrency} workers "
+                    f"and {self._queue.qsize()} pending jobs")
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(self, job):
+        job = await self.job_model.create_job(job)
+        self._queue.put_nowait(job.id)
+        return job
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                job = await self.job_model.claim_job(job_id)
+                if job:
+                    await self._run(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Unexpected error while running job {str(job_id)}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job):
+        logger.info(f"Running {job.job_type} job {str(job.id)} (attempt {job.job_attempts}/{job.job_max_attempts})")
+        try:
+            result = await self.handler(job, JobContext(self.job_model, job))
+            await self.job_model.update_job(job.id, {
+                "job_status": JobStatusEnums.COMPLETED.value,
+                "job_progress": 1.0,
+                "job_result": result or {},
+                "job_error": None,
+                "job_finished_at": datetime.utcnow(),
+            })
+            logger.info(f"{job.job_type} job {str(job.id)} completed")
+
+        except asyncio.CancelledError:
+            # Stopped by a shutdown, not by the job itself: queued again without using up an attempt
+            try:
+                await self.job_model.update_job(job.id, {
+                    "job_status": JobStatusEnums.QUEUED.value,
+                    "job_attempts": job.job_attempts - 1,
+                })
+            except Exception as e:
+                # Left as running: it is requeued, or failed on its last attempt, when the app starts again
+                logger.error(f"Could not requeue cancelled job {str(job.id)}: {e}")
+            raise
+
+        except Exception as e:
+            logger.error(f"{job.job_type} job {str(job.id)} failed: {e}\n{traceback.format_exc()}")
+            if job.job_attempts < job.job_max_attempts:
+                await self.job_model.update_job(job.id, {
+                    "job_status": JobStatusEnums.QUEUED.value,
+                    "job_error": str(e),
+                })
+                delay = self.retry_delay * 2 ** (job.job_attempts - 1)
+                asyncio.get_running_loop().call_later(delay, self._queue.put_nowait, job.id)
+                logger.info(f"Retrying job {str(job.id)} in {delay:.0f}s")
+            else:
+                await self.job_model.update_job(job.id, {
+                    "job_status": JobStatusEnums.FAILED.value,
+                    "job_error": str(e),
+                    "job_finished_at": datetime.utcnow(),
+                })
@@ -6,10 +6,12 @@ class PathUtils:
         self.base_dir = Path(__file__).resolve().parent.parent
         self.assets_dir = self.base_dir / "assets"
         self.library_dir = self.assets_dir / "library"
+        self.artifacts_dir = self.assets_dir / "artifacts"
         
         # Ensure base directories exist
         os.makedirs(self.assets_dir, exist_ok=True)
         os.makedirs(self.library_dir, exist_ok=True)
+        os.makedirs(self.artifacts_dir, exist_ok=True)
 
     def get_project_dir(self, project_title: str):
         
@@ -31,10 +33,21 @@ class PathUtils:
         project_dir, _, summaries_dir = self.get_project_dir(project_title=project_title)    
         return summaries_dir / summary_filename
 
+    def get_review_path(self, project_title: str) -> Path:
+        """Literature review of a project, next to its papers and summaries folders."""
+        project_dir, _, _ = self.get_project_dir(project_title=project_title)
+        return project_dir / "review.md"
+
     def get_project_files(self, project_title: str):
         _, papers_dir, summaries_dir = self.get_project_dir(project_title)
         
         paper_files = [f.name for f in papers_dir.glob('*') if f.is_file()]
         summary_files = [f.name for f in summaries_dir.glob('*') if f.is_file()]
         
-        return paper_files, summary_files
\ No newline at end of file
+        return paper_files, summary_files
+
+    def get_artifact_dir(self, content_hash: str, converter_version: str) -> Path:
+        """Content-addressed directory for the parsed outputs of a file: assets/artifacts/ab/abcdef.../<converter_version>/"""
+        artifact_dir = self.artifacts_dir / content_hash[:2] / content_hash / converter_version
+        os.makedirs(artifact_dir, exist_ok=True)
+        return artifact_dir
\ No newline at end of file
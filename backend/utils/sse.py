@@ -0,0 +1,51 @@
+import asyncio
+import json
+from fastapi.responses import StreamingResponse
+from .enums import StreamEventEnums
+from .app_logging import get_logger
+logger = get_logger(__name__)
+
+# Keep proxies (nginx) from buffering the stream, and clients from caching it
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def sse_event(event: str, data) -> str:
+    """One Server-Sent Event; the data is sent as json, so multi-line text stays a single data line."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+async def sse_stream(events, error_signal: str):
+    """
+    Format an async generator of (event, data) pairs as Server-Sent Events.
+    Once the response has started its status cannot change, so a failure becomes an error event.
+    """
+    try:
+        async for event, data in events:
+            yield sse_event(event, data)
+    except (asyncio.CancelledError, GeneratorExit):
+        logger.info("Client disconnected, stream cancelled")
+        raise
+    except Exception as e:
+        logger.error(f"Error while streaming events: {e}")
+        yield sse_event(StreamEventEnums.ERROR.value, {"signal": error_signal})
+    finally:
+        await events.aclose()
+
+
+class EventStreamResponse(StreamingResponse):
+    """
+    Server-Sent Events response that closes its event generator as soon as the response ends.
+    When the client disconnects, Starlette stops iterating but leaves the generator suspended;
+    closing it at once closes the provider stream underneath, so the generation is aborted
+    instead of running on and consuming quota.
+    """
+    media_type = "text/event-stream"
+
+    def __init__(self, content, headers: dict = None, **kwargs):
+        super().__init__(content, headers={**SSE_HEADERS, **(headers or {})}, **kwargs)
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.body_iterator.aclose()
@@ -1,4 +1,6 @@
 import re, os
+import hashlib
+import heapq
 
 class Cleaner:
     def __init__(self):
@@ -17,3 +19,35 @@ class Cleaner:
     def text_cleaner(self, text: str) -> str:
         text = re.sub(r'(?im)^#{1,4}\s*(references)\b.*[\s\S]*', '',text)
         return text.strip()
+
+class MinHasher:
+    """
+    Bottom-k MinHash over word shingles: every shingle is hashed once and the k smallest
+    hashes form the signature. Similar texts keep most of their smallest hashes in common.
+    """
+    WORD_PATTERN = re.compile(r'\w+')
+
+    def __init__(self, num_hashes: int = 128, shingle_size: int = 5):
+        self.num_hashes = num_hashes
+        self.shingle_size = shingle_size
+
+    def _hash(self, shingle: str) -> int:
+        # 63 bits so every value fits in a signed 64-bit mongo integer
+        return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big") >> 1
+
+    def signature(self, text: str) -> list:
+        words = self.WORD_PATTERN.findall(text.lower())
+        if len(words) < self.shingle_size:
+            shingles = {" ".join(words)} if words else set()
+        else:
+            shingles = {" ".join(words[i:i + self.shingle_size]) for i in range(len(words) - self.shingle_size + 1)}
+        return heapq.nsmallest(self.num_hashes, {self._hash(s) for s in shingles})
+
+    def similarity(self, signature_a: list, signature_b: list) -> float:
+        """Estimate the Jaccard similarity of two texts from their signatures."""
+        if not signature_a or not signature_b:
+            return 0.0
+        set_a, set_b = set(signature_a), set(signature_b)
+        union_sketch = heapq.nsmallest(self.num_hashes, set_a | set_b)
+        shared = sum(1 for h in union_sketch if h in set_a and h in set_b)
+        return shared / len(union_sketch)
@@ -11,11 +11,14 @@ export const API_ENDPOINTS = {
     papers: (projectId: string) => `/projects/${projectId}/papers`,
     paperById: (projectId: string, paperId: string) => `/projects/${projectId}/papers/${paperId}`,
     paperUpload: (projectId: string) => `/projects/${projectId}/papers/upload-paper`,
+    paperJob: (projectId: string, jobId: string) => `/projects/${projectId}/papers/jobs/${jobId}`,
 
     // Summaries
     summaries: (projectId: string, paperId: string) => `/projects/${projectId}/papers/${paperId}/summaries`,
     summaryById: (projectId: string, paperId: string, summaryId: string) =>
         `/projects/${projectId}/papers/${paperId}/summaries/${summaryId}`,
+    summaryJob: (projectId: string, paperId: string, jobId: string) =>
+        `/projects/${projectId}/papers/${paperId}/summaries/jobs/${jobId}`,
 
     // RAG/Chat
     chatAnswer: (projectId: string) => `/projects/${projectId}/chat/answer`,
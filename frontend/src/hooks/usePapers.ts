@@ -1,5 +1,6 @@
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import { paperService } from '@/services';
+import type { Paper, IngestionJob } from '@/types/api';
 
 export const usePapers = (projectId: string) => {
     return useQuery({
@@ -17,13 +18,24 @@ export const usePaper = (projectId: string, paperId: string) => {
     });
 };
 
-export const useUploadPaper = (projectId: string) => {
+interface UploadPaperOptions {
+    // Called once the ingestion job of an uploaded paper has finished
+    onIngested?: (paper: Paper, job: IngestionJob) => void;
+    onIngestionFailed?: (paper: Paper, error: Error) => void;
+}
+
+export const useUploadPaper = (projectId: string, options: UploadPaperOptions = {}) => {
     const queryClient = useQueryClient();
 
     return useMutation({
         mutationFn: (file: File) => paperService.upload(projectId, file),
-        onSuccess: () => {
+        onSuccess: (response) => {
             queryClient.invalidateQueries({ queryKey: ['projects', projectId, 'papers'] });
+            // The paper is listed at once, but only usable for summaries and chat once ingested
+            paperService.waitForIngestion(projectId, response.job_id)
+                .then((job) => options.onIngested?.(response.paper, job))
+                .catch((error) => options.onIngestionFailed?.(response.paper, error))
+                .finally(() => queryClient.invalidateQueries({ queryKey: ['projects', projectId, 'papers'] }));
         },
     });
 };
@@ -57,7 +57,17 @@ const Workspace = () => {
     // Fetch papers and summaries from API
     const { data: papers, isLoading: loadingPapers, error: papersError } = usePapers(workspaceId || "");
     const { data: summaries, isLoading: loadingSummaries } = useSummaries(workspaceId || "");
-    const uploadPaper = useUploadPaper(workspaceId || "");
+    const uploadPaper = useUploadPaper(workspaceId || "", {
+        onIngested: (paper) => toast({
+            title: "Paper ready",
+            description: `${paper.paper_name} is processed and ready for summaries and chat.`,
+        }),
+        onIngestionFailed: (paper, error) => toast({
+            title: "Processing failed",
+            description: `${paper.paper_name}: ${error.message}`,
+            variant: "destructive",
+        }),
+    });
     const deletePaper = useDeletePaper(workspaceId || "");
     const renamePaper = useRenamePaper(workspaceId || "");
 
@@ -323,7 +333,7 @@ const Workspace = () => {
             await uploadPaper.mutateAsync(file);
             toast({
                 title: "Success",
-                description: `${file.name} uploaded successfully!`,
+                description: `${file.name} uploaded, processing it in the background...`,
             });
             // Reset file input
             if (fileInputRef.current) {
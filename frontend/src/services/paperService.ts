@@ -1,6 +1,11 @@
 import { apiClient } from './api';
 import { API_ENDPOINTS, API_BASE_URL } from '@/config/api';
-import type { Paper, UploadPaperResponse } from '@/types/api';
+import type { Paper, IngestionJob, UploadPaperResponse } from '@/types/api';
+
+// How often a queued ingestion job is polled until it finishes
+const INGESTION_JOB_POLL_INTERVAL_MS = 3000;
+
+const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
 
 /**
  * Paper Service
@@ -25,6 +30,7 @@ export const paperService = {
 
     /**
      * Upload a new paper
+     * The backend accepts it (202) and converts and chunks it in an ingestion job, see waitForIngestion
      */
     async upload(projectId: string, file: File): Promise<UploadPaperResponse> {
         return apiClient.uploadFile<UploadPaperResponse>(
@@ -33,6 +39,31 @@ export const paperService = {
         );
     },
 
+    /**
+     * Get the status of an ingestion job
+     */
+    async getJob(projectId: string, jobId: string): Promise<IngestionJob> {
+        const response = await apiClient.get<{ signal: string; job: IngestionJob }>(
+            API_ENDPOINTS.paperJob(projectId, jobId)
+        );
+        return response.job;
+    },
+
+    /**
+     * Poll an ingestion job until it completes or fails
+     */
+    async waitForIngestion(projectId: string, jobId: string): Promise<IngestionJob> {
+        let job = await paperService.getJob(projectId, jobId);
+        while (job.job_status === 'queued' || job.job_status === 'running') {
+            await sleep(INGESTION_JOB_POLL_INTERVAL_MS);
+            job = await paperService.getJob(projectId, jobId);
+        }
+        if (job.job_status === 'failed') {
+            throw new Error(job.job_error || 'Paper processing failed');
+        }
+        return job;
+    },
+
     /**
      * Delete a paper
      */
@@ -1,6 +1,11 @@
 import { apiClient } from './api';
 import { API_ENDPOINTS } from '@/config/api';
-import type { Summary, GenerateSummaryRequest, UpdateSummaryRequest } from '@/types/api';
+import type { Summary, SummaryJob, GenerateSummaryRequest, UpdateSummaryRequest } from '@/types/api';
+
+// How often a queued summary job is polled until it finishes
+const SUMMARY_JOB_POLL_INTERVAL_MS = 2000;
+
+const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
 
 /**
  * Summary Service
@@ -27,13 +32,38 @@ export const summaryService = {
 
     /**
      * Generate a new summary
+     * The backend queues a summary job (202); it is polled until it completes or fails
      */
-    async generate(projectId: string, paperId: string, request: GenerateSummaryRequest): Promise<any> {
-        const response = await apiClient.post<any>(
+    async generate(
+        projectId: string,
+        paperId: string,
+        request: GenerateSummaryRequest,
+        onProgress?: (job: SummaryJob) => void
+    ): Promise<SummaryJob> {
+        const response = await apiClient.post<{ message: string; job: SummaryJob }>(
             `/projects/${projectId}/papers/${paperId}/summaries/create`,
             request
         );
-        return response.summary || response;
+        let job = response.job;
+        while (job.status === 'queued' || job.status === 'running') {
+            onProgress?.(job);
+            await sleep(SUMMARY_JOB_POLL_INTERVAL_MS);
+            job = await summaryService.getJob(projectId, paperId, job.job_id);
+        }
+        if (job.status === 'failed') {
+            throw new Error(job.error || 'Summary generation failed');
+        }
+        return job;
+    },
+
+    /**
+     * Get the progress of a summary job
+     */
+    async getJob(projectId: string, paperId: string, jobId: string): Promise<SummaryJob> {
+        const response = await apiClient.get<{ signal: string; job: SummaryJob }>(
+            API_ENDPOINTS.summaryJob(projectId, paperId, jobId)
+        );
+        return response.job;
     },
 
     /**
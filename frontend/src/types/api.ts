@@ -32,10 +32,25 @@ export interface Paper {
     upload_date?: string;
 }
 
+// Upload is accepted (202) before the paper is converted and chunked, by its ingestion job
 export interface UploadPaperResponse {
     message: string;
     paper: Paper;
-    inserted_chunks_count: number;
+    job_id: string;
+}
+
+export interface IngestionJob {
+    _id: string;
+    job_type: string;
+    job_project_id: string;
+    job_paper_id?: string | null;
+    job_status: 'queued' | 'running' | 'completed' | 'failed';
+    job_stage?: string | null;
+    job_progress: number;
+    job_attempts: number;
+    job_max_attempts: number;
+    job_result: Record<string, unknown>;
+    job_error?: string | null;
 }
 
 // Summary Types
@@ -54,6 +69,21 @@ export interface GenerateSummaryRequest {
     summary_name: string;
 }
 
+export type JobStatus = 'queued' | 'running' | 'completed' | 'failed';
+
+export interface SummaryJob {
+    job_id: string;
+    status: JobStatus;
+    stage?: string | null;
+    progress: number;
+    attempts: number;
+    sections_done: number;
+    sections_total?: number | null;
+    elapsed_seconds: number;
+    summary_id?: string | null;
+    error?: string | null;
+}
+
 export interface UpdateSummaryRequest {
     content: string;
 }